@@ -23,4 +23,17 @@ app.conf.beat_schedule = {
         "schedule": crontab(hour=21, minute=0),  # every day at 09:00 PM
         "schedule": crontab(minute="*/1"),
     },
+    "optimize-sqlite-database": {
+        "task": "tracker.tasks.optimize_sqlite_database",
+        "schedule": crontab(hour=3, minute=0),  # every day at 03:00 AM
+    },
+    "analyze-sqlite-database": {
+        "task": "tracker.tasks.optimize_sqlite_database",
+        "schedule": crontab(hour=3, minute=30, day_of_week=0),  # every Sunday
+        "kwargs": {"analyze": True},
+    },
+    "archive-old-transactions": {
+        "task": "tracker.tasks.archive_old_transactions",
+        "schedule": crontab(hour=4, minute=0, day_of_month=1),  # every month
+    },
 }
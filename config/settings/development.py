@@ -9,6 +9,16 @@ MIDDLEWARE += [
     "debug_toolbar.middleware.DebugToolbarMiddleware",
 ]
 
+# a stand-in read replica: another connection to the default database, and a
+# database of its own in the tests, to see where the reads go. Reads only go
+# to it with DATABASE_REPLICAS = ["replica"].
+DATABASES["replica"] = {**DATABASES["default"]}
+if "sqlite" not in DATABASES["replica"]["ENGINE"]:
+    # in-memory SQLite test databases are already separate
+    DATABASES["replica"]["TEST"] = {
+        "NAME": f"test_{DATABASES['default']['NAME']}_replica"
+    }
+
 # Email backend configuration
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
@@ -1,7 +1,26 @@
+import json
+import logging
 import os
 
 from config.env import BASE_DIR
 
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as a JSON object of its message and its metrics."""
+
+    def format(self, record):
+        return json.dumps(
+            {
+                "time": self.formatTime(record),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+                **getattr(record, "metrics", {}),
+            },
+            default=str,
+        )
+
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -14,6 +33,9 @@ LOGGING = {
             "format": "{asctime}:{levelname} {message}",
             "style": "{",
         },
+        "json": {
+            "()": JsonFormatter,
+        },
     },
     "handlers": {
         "file": {
@@ -22,6 +44,12 @@ LOGGING = {
             "filename": os.path.join(BASE_DIR, "django-log.log"),
             "formatter": "verbose",
         },
+        "metrics_file": {
+            "level": "INFO",
+            "class": "logging.FileHandler",
+            "filename": os.path.join(BASE_DIR, "metrics.log"),
+            "formatter": "json",
+        },
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
@@ -45,6 +73,12 @@ LOGGING = {
             "level": "INFO",
             "handlers": ["file"],
         },
+        # one JSON line per request and Celery task
+        "tracker.instrumentation": {
+            "level": "INFO",
+            "handlers": ["metrics_file"],
+            "propagate": False,
+        },
         "import_export": {
             "level": "INFO",
             "handlers": ["console"],
@@ -1 +1,17 @@
+from config.env import env
+
 from .base import *
+
+# Database
+# PostgreSQL, shared by the daphne and Celery processes
+DATABASES["default"] = env.db("DATABASE_URL")
+for database in DATABASES.values():
+    # reuse the connection of a process across requests and tasks, checking
+    # that it still works before reusing it
+    database["CONN_MAX_AGE"] = env.int("DATABASE_CONN_MAX_AGE", default=60)
+    database["CONN_HEALTH_CHECKS"] = True
+    # a transaction pooler like PgBouncer can give each transaction of a
+    # connection to another server connection, which a server-side cursor
+    # can't span
+    if env.bool("DATABASE_POOLER", default=False):
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
@@ -0,0 +1,11 @@
+from .development import *
+
+# the tests run in a single process, without a Redis server
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# a single process shares its local memory cache
+SILENCED_SYSTEM_CHECKS = ["tracker.W001"]
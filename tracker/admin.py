@@ -1,7 +1,13 @@
 from django.contrib import admin
 from import_export.admin import ImportExportModelAdmin
 
-from .models import Category, Transaction
+from .models import (
+    Category,
+    ExportJob,
+    MonthlyCategoryTotal,
+    Transaction,
+    TransactionArchive,
+)
 
 
 @admin.register(Category)
@@ -23,3 +29,20 @@ class TransactionAdmin(ImportExportModelAdmin):
         "updated_at",
     ]
     list_filter = ["type"]
+
+
+@admin.register(MonthlyCategoryTotal)
+class MonthlyCategoryTotalAdmin(admin.ModelAdmin):
+    list_display = ["month", "category", "user", "type", "total", "count"]
+    list_filter = ["type"]
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ["user", "format", "status", "progress", "created_at", "finished_at"]
+    list_filter = ["status", "format"]
+
+
+@admin.register(TransactionArchive)
+class TransactionArchiveAdmin(admin.ModelAdmin):
+    list_display = ["user", "year", "end", "count", "created_at", "updated_at"]
@@ -0,0 +1,370 @@
+"""
+In-memory analytics of the active users, an optional engine of the statistics.
+
+With ``ANALYTICS_ENGINE`` set, the statistics views load all the transactions
+of a user, archived ones included, once into NumPy column arrays: dates as
+day numbers, amounts as integer cents, categories and types as small codes.
+Their sums by period, category, type or weekday are then vectorized group-bys
+over these arrays, without a query.
+
+The columns of a process are kept current by the writes of the process, and
+are loaded again once the statistics version of their user shows a write they
+did not see, like a write of another process or a bulk write. The least
+recently used columns are evicted to stay within ``ANALYTICS_MEMORY_BUDGET``
+bytes.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from .archive import archived_transactions
+from .cache import cached_categories, get_category_version, get_statistics_version
+from .choices import TransactionTextChoices
+from .models import Transaction
+from .money import from_cents, to_cents
+from .periods import get_period_range
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# transaction fields of a row of the columns
+ROW_FIELDS = ["id", "date", "amount", "category_id", "type"]
+EPOCH = date(1970, 1, 1)
+# 1970-01-01 was a Thursday
+EPOCH_WEEKDAY = 3
+# code of a type -> the type
+TYPES = list(TransactionTextChoices.values)
+EXPENSE = TYPES.index(TransactionTextChoices.EXPENSE)
+# keys of the group-bys -> function of the columns returning their codes, and
+# function turning a code back into a value
+GROUP_KEYS = {
+    "day": (lambda columns: columns.days, lambda code: EPOCH + timedelta(days=code)),
+    "month": (
+        lambda columns: columns.months(),
+        lambda code: date(1970 + code // 12, code % 12 + 1, 1),
+    ),
+    "weekday": (lambda columns: (columns.days + EPOCH_WEEKDAY) % 7, int),
+    "category": (lambda columns: columns.categories, None),
+    "type": (lambda columns: columns.types, TYPES.__getitem__),
+}
+
+
+def is_enabled():
+    return settings.ANALYTICS_ENGINE
+
+
+def to_day(day):
+    return (day - EPOCH).days
+
+
+class TransactionColumns:
+    """
+    The transactions of a user as column arrays, in no particular order.
+
+    The columns are never changed, a write returns new columns, so they can be
+    read while another thread applies a write.
+    """
+
+    def __init__(self, user_id, ids, days, cents, categories, types, category_ids):
+        self.user_id = user_id
+        self.ids = ids
+        self.days = days
+        self.cents = cents
+        # codes of the categories in category_ids
+        self.categories = categories
+        self.types = types
+        self.category_ids = category_ids
+        self.version = None
+
+    @classmethod
+    def from_rows(cls, user_id, rows, category_ids=()):
+        """Build the columns of ``(id, date, amount, category_id, type)`` rows."""
+        category_ids = list(category_ids)
+        codes = {category_id: code for code, category_id in enumerate(category_ids)}
+        ids, days, cents, categories, types = [], [], [], [], []
+        for id, day, amount, category_id, type in rows:
+            if category_id not in codes:
+                codes[category_id] = len(category_ids)
+                category_ids.append(category_id)
+            ids.append(id)
+            days.append(to_day(day))
+            cents.append(to_cents(amount))
+            categories.append(codes[category_id])
+            types.append(TYPES.index(type))
+        return cls(
+            user_id,
+            np.array(ids, dtype=np.int64),
+            np.array(days, dtype=np.int32),
+            np.array(cents, dtype=np.int64),
+            np.array(categories, dtype=np.int32),
+            np.array(types, dtype=np.int8),
+            category_ids,
+        )
+
+    @classmethod
+    def load(cls, user_id):
+        """Read the transactions of a user, archived ones included."""
+        # read first, a write in the meantime is seen by the next version check
+        version = get_statistics_version(user_id)
+        rows = Transaction.objects.filter(user_id=user_id).values_list(*ROW_FIELDS)
+        archived = (
+            [getattr(row, name) for name in ROW_FIELDS]
+            for row in archived_transactions(user_id)
+        )
+        columns = cls.from_rows(user_id, [*rows.iterator(), *archived])
+        columns.version = version
+        return columns
+
+    def _arrays(self):
+        return (self.ids, self.days, self.cents, self.categories, self.types)
+
+    def _select(self, mask):
+        return TransactionColumns(
+            self.user_id,
+            *(array[mask] for array in self._arrays()),
+            self.category_ids,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self._arrays())
+
+    def months(self):
+        """Return the months since 1970 of the transactions."""
+        return (
+            self.days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+        )
+
+    def signed_cents(self):
+        """Return the amounts in cents, negative for the expenses."""
+        return np.where(self.types == EXPENSE, -self.cents, self.cents)
+
+    def without(self, ids):
+        """Return the columns without the transactions of ``ids``."""
+        return self._select(~np.isin(self.ids, list(ids)))
+
+    def with_rows(self, rows):
+        """Return the columns with ``rows`` added, replacing the same ids."""
+        rows = list(rows)
+        added = TransactionColumns.from_rows(self.user_id, rows, self.category_ids)
+        kept = self.without(row[0] for row in rows)
+        return TransactionColumns(
+            self.user_id,
+            *(
+                np.concatenate([old, new])
+                for old, new in zip(kept._arrays(), added._arrays())
+            ),
+            added.category_ids,
+        )
+
+    def in_range(self, start=None, end=None):
+        """Return the columns of the transactions from ``start`` to before ``end``."""
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.days >= to_day(start)
+        if end is not None:
+            mask &= self.days < to_day(end)
+        return self._select(mask)
+
+    def in_period(self, year, month=None):
+        return self.in_range(*get_period_range(year, month))
+
+    def group_sums(self, *keys):
+        """
+        Return the sums of the amounts in cents, by the values of ``keys`` of
+        ``GROUP_KEYS``, as ``{(value, ...): cents}``.
+        """
+        if not keys:
+            return {(): int(self.cents.sum())}
+        if not len(self):
+            return {}
+        codes = np.stack([GROUP_KEYS[key][0](self).astype(np.int64) for key in keys])
+        groups, inverse = np.unique(codes, axis=1, return_inverse=True)
+        sums = np.zeros(groups.shape[1], dtype=np.int64)
+        np.add.at(sums, inverse.reshape(-1), self.cents)
+        decoders = [GROUP_KEYS[key][1] or self.category_ids.__getitem__ for key in keys]
+        sums_by_group = {}
+        for group, total in zip(groups.T, sums):
+            values = tuple(decode(int(code)) for decode, code in zip(decoders, group))
+            sums_by_group[values] = int(total)
+        return sums_by_group
+
+    # the statistics, like the ones of the monthly category totals
+
+    def total_balance(self):
+        return from_cents(self.cents.sum())
+
+    def get_total_income_and_expense(self):
+        sums = self.group_sums("type")
+        return {
+            "total_income": from_cents(sums.get((TransactionTextChoices.INCOME,), 0)),
+            "total_expense": from_cents(sums.get((TransactionTextChoices.EXPENSE,), 0)),
+        }
+
+    def get_monthly_totals(self):
+        months = {}
+        for (month, type), cents in sorted(self.group_sums("month", "type").items()):
+            row = months.setdefault(
+                month,
+                {
+                    "month": month,
+                    "total_income": from_cents(0),
+                    "total_expense": from_cents(0),
+                },
+            )
+            key = (
+                "total_income"
+                if type == TransactionTextChoices.INCOME
+                else "total_expense"
+            )
+            row[key] = from_cents(cents)
+        return list(months.values())
+
+    def get_category_breakdown(self):
+        categories = cached_categories(self.user_id, get_category_version(self.user_id))
+        names = {
+            category["id"]: category["name"]
+            for type_categories in categories.values()
+            for category in type_categories
+        }
+        # largest first, then by name
+        rows = sorted(
+            (-cents, names[category_id], category_id, type)
+            for (category_id, type), cents in self.group_sums(
+                "category", "type"
+            ).items()
+            if category_id in names
+        )
+        breakdown = {"income": [], "expense": []}
+        for cents, name, category_id, type in rows:
+            key = "income" if type == TransactionTextChoices.INCOME else "expense"
+            breakdown[key].append(
+                {
+                    "category_id": category_id,
+                    "category": name,
+                    "total": from_cents(-cents),
+                }
+            )
+        return breakdown
+
+    def get_daily_balances(self, start, end):
+        """Like ``tracker.balances.get_daily_balances``."""
+        first, last = to_day(start), to_day(end)
+        if last <= first:
+            return []
+        signed = self.signed_cents()
+        opening = int(signed[self.days < first].sum())
+        in_range = (self.days >= first) & (self.days < last)
+        daily = np.zeros(last - first, dtype=np.int64)
+        np.add.at(daily, self.days[in_range] - first, signed[in_range])
+        balances = opening + np.cumsum(daily)
+        return [
+            (start + timedelta(days=offset), from_cents(cents))
+            for offset, cents in enumerate(balances)
+        ]
+
+
+class AnalyticsEngine:
+    """The columns of the active users of a process, least recently used first."""
+
+    def __init__(self):
+        self._columns = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_columns(self, user_id):
+        """Return the current columns of a user, loading them if needed."""
+        if np is None:
+            raise ImproperlyConfigured("ANALYTICS_ENGINE requires numpy.")
+        version = get_statistics_version(user_id)
+        with self._lock:
+            columns = self._columns.get(user_id)
+            if columns is not None and columns.version == version:
+                self._columns.move_to_end(user_id)
+                return columns
+
+        columns = TransactionColumns.load(user_id)
+        with self._lock:
+            self._columns[user_id] = columns
+            self._columns.move_to_end(user_id)
+            self._evict()
+        return columns
+
+    def apply(self, user_id, version, change):
+        """
+        Apply ``change`` to the columns of a user after a write that bumped
+        the statistics version to ``version`` before its commit, and once more
+        on commit.
+
+        Any other write in the meantime shows in the version, and the columns
+        are then dropped, to be loaded again.
+        """
+        with self._lock:
+            columns = self._columns.get(user_id)
+            if columns is None:
+                return
+            if (
+                columns.version == version - 1
+                and get_statistics_version(user_id) == version + 1
+            ):
+                columns = self._columns[user_id] = change(columns)
+                columns.version = version + 1
+                self._evict()
+            else:
+                del self._columns[user_id]
+
+    def _evict(self):
+        # the most recently used columns are kept, even over the budget
+        while (
+            len(self._columns) > 1
+            and sum(columns.nbytes for columns in self._columns.values())
+            > settings.ANALYTICS_MEMORY_BUDGET
+        ):
+            self._columns.popitem(last=False)
+
+    def __contains__(self, user_id):
+        return user_id in self._columns
+
+    def clear(self):
+        with self._lock:
+            self._columns.clear()
+
+
+engine = AnalyticsEngine()
+
+
+def get_columns(user_id):
+    return engine.get_columns(user_id)
+
+
+def _record_write(instance, change):
+    if instance.user_id not in engine:
+        return
+    user_id = instance.user_id
+    # after the bump of the invalidate_statistics_cache receiver
+    version = get_statistics_version(user_id)
+    transaction.on_commit(lambda: engine.apply(user_id, version, change))
+
+
+def record_save(instance):
+    """Add a saved transaction to the columns of its user once committed."""
+    row = [
+        field.to_python(getattr(instance, field.attname))
+        for field in map(Transaction._meta.get_field, ROW_FIELDS)
+    ]
+    _record_write(instance, lambda columns: columns.with_rows([row]))
+
+
+def record_delete(instance):
+    """Remove a deleted transaction from the columns of its user once committed."""
+    pk = instance.pk
+    _record_write(instance, lambda columns: columns.without([pk]))
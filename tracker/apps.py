@@ -6,4 +6,5 @@ class TrackerConfig(AppConfig):
     name = "tracker"
 
     def ready(self):
+        import tracker.checks
         import tracker.signals
@@ -0,0 +1,199 @@
+"""
+Archival of the old transactions out of the transaction table.
+
+The transactions of a user older than a horizon are moved to one archive per
+year, a gzip compressed file of JSON lines, so the transaction table and its
+indexes only hold the recent history. The monthly category totals are left in
+place, so the statistics still cover the archived months, and the exports read
+the archives back.
+"""
+
+import gzip
+import json
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .cache import bump_statistics_version
+from .models import Category, Transaction, TransactionArchive
+
+# transaction fields of an archived row, and how to read their JSON value back
+ARCHIVE_FIELDS = {
+    "id": int,
+    "note": str,
+    "description": str,
+    "category_id": int,
+    "type": str,
+    "amount": Decimal,
+    "date": date.fromisoformat,
+    "created_at": datetime.fromisoformat,
+    "updated_at": datetime.fromisoformat,
+}
+# archived transactions deleted from the table per statement
+DELETE_BATCH_SIZE = 500
+
+
+def archive_horizon(today=None):
+    """
+    Return the first day of the month ``TRANSACTION_ARCHIVE_AFTER_MONTHS``
+    months ago, the transactions before it are archived.
+    """
+    today = today or timezone.localdate()
+    months = (
+        today.year * 12 + today.month - 1 - settings.TRANSACTION_ARCHIVE_AFTER_MONTHS
+    )
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _encode(row):
+    row = {
+        name: value.isoformat() if isinstance(value, (date, datetime)) else value
+        for name, value in row.items()
+    }
+    row["amount"] = str(row["amount"])
+    return json.dumps(row) + "\n"
+
+
+def _decode(line):
+    row = json.loads(line)
+    return {
+        name: None if row[name] is None else parse(row[name])
+        for name, parse in ARCHIVE_FIELDS.items()
+    }
+
+
+def read_archive(archive):
+    """Yield the rows of an archive, newest first."""
+    with archive.file.open("rb") as file, gzip.open(file, "rt") as lines:
+        for line in lines:
+            yield _decode(line)
+
+
+def _write_archive(archive, rows):
+    with tempfile.TemporaryFile() as buffer:
+        with gzip.open(buffer, "wt") as file:
+            file.writelines(_encode(row) for row in rows)
+        buffer.seek(0)
+        archive.file.save(f"{archive.year}.ndjson.gz", File(buffer), save=False)
+
+
+def _delete_transactions(ids):
+    """Delete transactions without the signals removing them from their totals."""
+    quote_name = connection.ops.quote_name
+    table = quote_name(Transaction._meta.db_table)
+    ids = iter(ids)
+    with connection.cursor() as cursor:
+        while batch := list(islice(ids, DELETE_BATCH_SIZE)):
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", batch)
+
+
+def _archive_year(user_id, year, end):
+    with transaction.atomic():
+        rows = list(
+            Transaction.objects.select_for_update()
+            .filter(user_id=user_id, date__gte=date(year, 1, 1), date__lt=end)
+            .order_by("-date", "-id")
+            .values(*ARCHIVE_FIELDS)
+        )
+        archive = (
+            TransactionArchive.objects.select_for_update()
+            .filter(user_id=user_id, year=year)
+            .first()
+        ) or TransactionArchive(user_id=user_id, year=year, end=end)
+        previous_file = archive.file.name
+        archived = rows
+        if previous_file:
+            # merged in the order of the table, transactions may be backdated
+            archived = sorted(
+                [*rows, *read_archive(archive)],
+                key=lambda row: (row["date"], row["id"]),
+                reverse=True,
+            )
+
+        _write_archive(archive, archived)
+        try:
+            archive.end = max(archive.end, end)
+            archive.count = len(archived)
+            archive.save()
+            _delete_transactions(row["id"] for row in rows)
+        except Exception:
+            archive.file.delete(save=False)
+            raise
+        if previous_file:
+            transaction.on_commit(partial(archive.file.storage.delete, previous_file))
+    return len(rows)
+
+
+def archive_transactions(user_id, before):
+    """
+    Move the transactions of a user dated before the month of ``before`` to
+    the archives of their years, and return their number.
+    """
+    before = before.replace(day=1)
+    years = Transaction.objects.filter(user_id=user_id, date__lt=before).dates(
+        "date", "year"
+    )
+    archived = sum(
+        _archive_year(user_id, year.year, min(before, date(year.year + 1, 1, 1)))
+        for year in years
+    )
+    if archived:
+        # the totals of the transaction list no longer include them
+        bump_statistics_version(user_id)
+    return archived
+
+
+def archived_transactions(user_id, start=None, end=None, using=None):
+    """
+    Yield the archived transactions of a user from ``start`` to before ``end``,
+    newest first, as ``Transaction`` instances that are not in the database.
+
+    Like the cascade from the table, the transactions of deleted categories
+    are left out, and the others get the current name of their category.
+    """
+    archives = TransactionArchive.objects.using(using).filter(user_id=user_id)
+    if start is not None:
+        archives = archives.filter(year__gte=start.year)
+    if end is not None:
+        archives = archives.filter(year__lte=end.year)
+    categories = Category.objects.using(using).filter(user_id=user_id).in_bulk()
+    for archive in archives.order_by("-year"):
+        for row in read_archive(archive):
+            category = categories.get(row.pop("category_id"))
+            if category is None:
+                continue
+            if start is not None and row["date"] < start:
+                continue
+            if end is not None and row["date"] >= end:
+                continue
+            yield Transaction(**row, user_id=user_id, category=category)
+
+
+def archive_ends(user_ids):
+    """Return the end of the archived months of these users, by user."""
+    return dict(
+        TransactionArchive.objects.filter(user_id__in=user_ids)
+        .order_by()
+        .values_list("user_id")
+        .annotate(end=Max("end"))
+    )
+
+
+def archived_before(ends, field="date"):
+    """
+    Return a condition on the date ``field`` matching the archived months of
+    ``archive_ends``, to leave them out of a rebuild of their totals.
+    """
+    condition = Q(pk__in=[])
+    for user_id, end in ends.items():
+        condition |= Q(user_id=user_id, **{f"{field}__lt": end})
+    return condition
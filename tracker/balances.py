@@ -0,0 +1,49 @@
+"""
+Running balance of a user, the incomes less the expenses of every transaction
+up to a day.
+
+The balance on the first day of a range is read from the monthly category
+totals before it, which the signals keep up to date, and the balances of the
+following days are accumulated from the transactions of the range alone. The
+cost of a range depends on its days, not on the whole history of the user.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from .archive import archived_transactions
+from .choices import TransactionTextChoices
+from .models import MonthlyCategoryTotal, Transaction
+
+
+def get_daily_balances(user_id, start, end):
+    """
+    Return the balance of a user at the end of each day from ``start``, the
+    first day of a month, to before ``end``, as a list of ``(day, balance)``.
+    """
+    opening = MonthlyCategoryTotal.objects.filter(
+        user_id=user_id, month__lt=start
+    ).get_net_income()
+    # running sums from start, only for the days with transactions
+    balances = dict(
+        Transaction.objects.filter(
+            user_id=user_id, date__gte=start, date__lt=end
+        ).get_daily_balances()
+    )
+    archived = defaultdict(Decimal)
+    for transaction in archived_transactions(user_id, start, end):
+        amount = transaction.amount
+        if transaction.type == TransactionTextChoices.EXPENSE:
+            amount = -amount
+        archived[transaction.date] += amount
+
+    timeline = []
+    balance = archived_balance = 0
+    day = start
+    while day < end:
+        balance = balances.get(day, balance)
+        archived_balance += archived.get(day, 0)
+        timeline.append((day, opening + balance + archived_balance))
+        day += timedelta(days=1)
+    return timeline
@@ -0,0 +1,16 @@
+"""
+Performance benchmarks of the tracker hot paths.
+
+Scenarios are registered with ``register`` and run by the ``benchmark``
+management command against a temporary test database.
+"""
+
+from . import concurrency, export, imports, querysets, search, views  # noqa: F401
+from .base import (  # noqa: F401
+    SCENARIOS,
+    Measurement,
+    compare,
+    peak_memory_kb,
+    register,
+    seed_transactions,
+)
@@ -0,0 +1,127 @@
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tracker.generators import generate_transactions, insert_transactions
+from tracker.models import Category, MonthlyCategoryTotal, Transaction
+
+User = get_user_model()
+
+# scenario name -> function(options) returning a list of result dicts
+SCENARIOS = {}
+# metrics compared against a baseline, lower is better
+COMPARED_METRICS = ("seconds", "ttfb", "queries", "peak_memory_kb")
+MIN_SECONDS = 0.01
+
+
+def register(name):
+    """Register a benchmark scenario run by the ``benchmark`` command."""
+
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+
+    return decorator
+
+
+class Measurement:
+    """
+    Measure the wall time and the number of SQL queries of a block.
+
+    ``mark`` records the time elapsed since the start of the block, e.g. the
+    time to the first byte of a response.
+    """
+
+    def __init__(self, name, **extra):
+        self.result = {"name": name, **extra}
+        self._queries = CaptureQueriesContext(connection)
+
+    def __enter__(self):
+        self._queries.__enter__()
+        self._start = time.perf_counter()
+        return self
+
+    def mark(self, metric):
+        self.result[metric] = round(time.perf_counter() - self._start, 4)
+
+    def __exit__(self, *exc_info):
+        self.mark("seconds")
+        self._queries.__exit__(*exc_info)
+        self.result["queries"] = len(self._queries)
+
+
+def peak_memory_kb(func, *args, **kwargs):
+    """
+    Return the peak memory allocated while calling ``func``, in KiB.
+
+    Measured separately from the timings, since tracing the allocations
+    slows the traced code down several times.
+    """
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak // 1024
+
+
+def compare(results, baseline, threshold):
+    """
+    Return a description of each metric of ``results`` that regressed by more
+    than ``threshold``, a fraction, from the matching ``baseline`` result.
+
+    Results are matched by name and number of rows. Timings below
+    ``MIN_SECONDS`` are too noisy to compare, and the number of queries is
+    deterministic, so any increase is a regression.
+    """
+    baseline = {(result["name"], result.get("rows")): result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["name"], result.get("rows")))
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric not in result or metric not in previous:
+                continue
+            old, new = previous[metric], result[metric]
+            if metric == "queries":
+                regressed = new > old
+            elif metric in ("seconds", "ttfb") and max(old, new) < MIN_SECONDS:
+                regressed = False
+            else:
+                regressed = new > old * (1 + threshold)
+            if regressed:
+                regressions.append(
+                    f"{result['name']} ({result.get('rows')} rows): "
+                    f"{metric} {old} -> {new}"
+                )
+    return regressions
+
+
+def seed_transactions(rows, seed=0):
+    """Create a user with ``rows`` transactions spread over the last two years."""
+    user = User.objects.create_user(
+        username=f"benchmark{seed}",
+        email=f"benchmark{seed}@example.com",
+        password="benchmark",
+    )
+    categories = list(
+        Category.objects.filter(user=user)
+        .order_by("pk")
+        .values_list("pk", "name", "type")
+    )
+    today = date.today()
+    transactions = generate_transactions(
+        user.pk, categories, rows, random.Random(seed), today - timedelta(729), today
+    )
+    insert_transactions(transactions, batch_size=5000)
+    MonthlyCategoryTotal.objects.filter(user=user).rebuild(
+        Transaction.objects.filter(user=user)
+    )
+    return user
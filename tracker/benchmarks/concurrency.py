@@ -0,0 +1,166 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+
+from django.db import OperationalError, connection, connections
+from django.test import override_settings
+
+from tracker.models import Category, Transaction
+from tracker.pagination import paginate_transactions
+
+from .base import register, seed_transactions
+
+WRITERS = 4
+READERS = 4
+# operations of each writer and reader
+OPERATIONS = 25
+
+
+def _schema(source):
+    """Return the statements creating the tables, indexes and triggers."""
+    with source.cursor() as cursor:
+        # shadow tables, like those of the FTS5 index, are created with theirs
+        cursor.execute("SELECT name FROM pragma_table_list WHERE type = 'shadow'")
+        shadow = {name for (name,) in cursor.fetchall()}
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+        )
+        return [sql for name, sql in cursor.fetchall() if name not in shadow]
+
+
+@contextmanager
+def _database_file(path):
+    """Connect the new connections of other threads to the SQLite file ``path``."""
+    settings_dict = connection.settings_dict
+    name = settings_dict["NAME"]
+    settings_dict["NAME"] = path
+    try:
+        yield
+    finally:
+        settings_dict["NAME"] = name
+
+
+def _in_thread(func, *args):
+    """Call ``func`` in a thread with its own database connection."""
+    result = {}
+
+    def run():
+        try:
+            result["value"] = func(*args)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return result.get("value")
+
+
+def _create_database(schema, rows):
+    with connection.cursor() as cursor:
+        for sql in schema:
+            cursor.execute(sql)
+    user = seed_transactions(rows)
+    return user, list(Category.objects.filter(user=user))
+
+
+class _Worker(threading.Thread):
+    """Run an operation ``OPERATIONS`` times, counting the queries and errors."""
+
+    def __init__(self, operation, barrier):
+        super().__init__()
+        self.operation = operation
+        self.barrier = barrier
+        self.queries = self.errors = 0
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def run(self):
+        try:
+            with connection.execute_wrapper(self.count_query):
+                self.barrier.wait()
+                for number in range(OPERATIONS):
+                    try:
+                        self.operation(number)
+                    except OperationalError:
+                        # "database is locked"
+                        self.errors += 1
+        finally:
+            connections.close_all()
+
+
+def _run_workers(user, categories):
+    queryset = Transaction.objects.filter(user=user)
+
+    def write(number):
+        category = categories[number % len(categories)]
+        Transaction.objects.create(
+            user=user,
+            category=category,
+            type=category.type,
+            amount=Decimal("12.50"),
+            date=date.today(),
+            note=f"Concurrent {number}",
+        )
+
+    def read(number):
+        paginate_transactions(queryset)
+        queryset.get_total_income_and_expense()
+
+    barrier = threading.Barrier(WRITERS + READERS + 1, timeout=60)
+    workers = [_Worker(write, barrier) for _ in range(WRITERS)]
+    workers += [_Worker(read, barrier) for _ in range(READERS)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    seconds = time.perf_counter() - start
+    return workers, seconds
+
+
+@register("concurrency")
+def concurrency_benchmark(options):
+    """
+    Run writers and readers of the transactions in parallel on a SQLite
+    database file, with the default settings and the ``SQLITE_PRAGMAS``.
+
+    The file is created in other threads, so the benchmark doesn't depend on
+    the transaction of the test database. Only SQLite is benchmarked.
+    """
+    if connection.vendor != "sqlite":
+        return []
+    rows = options["rows"]
+    schema = _schema(connection)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for profile, tuned in (("default", False), ("tuned", True)):
+            path = os.path.join(directory, f"{profile}.sqlite3")
+            with _database_file(path), override_settings(SQLITE_TUNING=tuned):
+                user, categories = _in_thread(_create_database, schema, rows)
+                workers, seconds = _run_workers(user, categories)
+            writes = sum(OPERATIONS - w.errors for w in workers[:WRITERS])
+            reads = sum(OPERATIONS - w.errors for w in workers[WRITERS:])
+            results.append(
+                {
+                    "name": f"concurrency.sqlite.{profile}",
+                    "rows": rows,
+                    "writers": WRITERS,
+                    "readers": READERS,
+                    "seconds": round(seconds, 4),
+                    "queries": sum(worker.queries for worker in workers),
+                    "writes_per_second": round(writes / seconds),
+                    "reads_per_second": round(reads / seconds),
+                    "errors": sum(worker.errors for worker in workers),
+                }
+            )
+    return results
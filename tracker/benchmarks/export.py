@@ -0,0 +1,43 @@
+from tracker.exports import STREAMING_FORMATS
+from tracker.models import Transaction
+from tracker.resources import TransactionResource
+
+from .base import Measurement, peak_memory_kb, register, seed_transactions
+
+
+def _tablib_export(format):
+    """The in-memory export, nothing can be sent before the whole file is built."""
+
+    def export(queryset):
+        dataset = TransactionResource().export(queryset.select_related("category"))
+        yield getattr(dataset, format)
+
+    return export
+
+
+def _consume(content):
+    for _ in content:
+        pass
+
+
+@register("export")
+def export_benchmark(options):
+    """Compare the streaming and the tablib export paths of each format."""
+    rows = options["rows"]
+    user = seed_transactions(rows)
+    queryset = Transaction.objects.filter(user=user)
+
+    results = []
+    for format in ("csv", "json"):
+        stream, _ = STREAMING_FORMATS[format]
+        for path, export in (("streaming", stream), ("tablib", _tablib_export(format))):
+            with Measurement(f"export.{format}.{path}", rows=rows) as measurement:
+                content = iter(export(queryset))
+                next(content, None)
+                measurement.mark("ttfb")
+                _consume(content)
+            measurement.result["peak_memory_kb"] = peak_memory_kb(
+                _consume, export(queryset)
+            )
+            results.append(measurement.result)
+    return results
@@ -0,0 +1,69 @@
+import csv
+import io
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+
+from tracker.choices import TransactionTextChoices
+from tracker.importers import TransactionImporter, read_csv
+from tracker.models import Category, Transaction
+
+from .base import Measurement, register
+
+User = get_user_model()
+
+
+def _csv_file(user, rows, seed=0):
+    """Return a CSV file of ``rows`` transactions of the user's categories."""
+    rng = random.Random(seed)
+    categories = list(Category.objects.filter(user=user).values_list("name", "type"))
+    type_labels = dict(TransactionTextChoices.choices)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["note", "description", "category", "type", "amount", "date"])
+    for i in range(rows):
+        name, type = rng.choice(categories)
+        amount = f"{rng.randint(100, 500_000) / 100:.2f}"
+        day = date.today() - timedelta(days=rng.randrange(730))
+        writer.writerow([f"Transaction {i}", "", name, type_labels[type], amount, day])
+    return io.BytesIO(buffer.getvalue().encode())
+
+
+def _row_by_row_import(user, file):
+    """One category lookup and one save per row, like the admin resource import."""
+    for _, row in read_csv(file):
+        type = TransactionTextChoices.EXPENSE
+        if row["type"] == TransactionTextChoices.INCOME.label:
+            type = TransactionTextChoices.INCOME
+        Transaction.objects.create(
+            note=row["note"],
+            description=row["description"],
+            category=Category.objects.get(user=user, name=row["category"], type=type),
+            user=user,
+            type=type,
+            amount=row["amount"],
+            date=row["date"],
+        )
+
+
+@register("import")
+def import_benchmark(options):
+    """Compare the throughput of the bulk importer with row by row inserts."""
+    rows = options["rows"]
+    results = []
+    for path in ("bulk", "row_by_row"):
+        user = User.objects.create_user(
+            username=f"import-{path}", email=f"import-{path}@example.com"
+        )
+        file = _csv_file(user, rows)
+        with Measurement(f"import.csv.{path}", rows=rows) as measurement:
+            if path == "bulk":
+                TransactionImporter(user).import_file(file, "csv")
+            else:
+                _row_by_row_import(user, file)
+        measurement.result["rows_per_second"] = round(
+            rows / measurement.result["seconds"]
+        )
+        results.append(measurement.result)
+    return results
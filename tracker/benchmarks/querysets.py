@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from django.db.models import FloatField, Sum
+
+from tracker.models import MonthlyCategoryTotal, Transaction
+from tracker.money import MoneySum
+
+from .base import Measurement, peak_memory_kb, register, seed_transactions
+
+# queryset -> aggregate methods
+AGGREGATES = {
+    "transaction": (
+        "get_total_income_and_expense",
+        "total_balance",
+        "get_monthly_totals",
+        "get_monthly_category_totals",
+    ),
+    "rollup": (
+        "get_total_income_and_expense",
+        "total_balance",
+        "get_monthly_totals",
+        "get_category_totals",
+    ),
+}
+# sum of the amounts -> its aggregate, the float cast the aggregates used
+# before the exact sums in cents
+SUMS = {
+    "float": lambda: Sum("amount", output_field=FloatField()),
+    "cents": lambda: MoneySum("amount"),
+}
+
+
+def _evaluate(queryset, method):
+    result = getattr(queryset, method)()
+    # querysets are lazy, the values are what the views use
+    return list(result) if hasattr(result, "query") else result
+
+
+@register("aggregates")
+def aggregates_benchmark(options):
+    """Compare the aggregates of the transactions with those of the rollups."""
+    rows = options["rows"]
+    user = seed_transactions(rows)
+    querysets = {
+        "transaction": Transaction.objects.filter(user=user),
+        "rollup": MonthlyCategoryTotal.objects.filter(user=user),
+    }
+
+    results = []
+    for source, methods in AGGREGATES.items():
+        queryset = querysets[source]
+        for method in methods:
+            with Measurement(f"aggregate.{source}.{method}", rows=rows) as measurement:
+                _evaluate(queryset, method)
+            measurement.result["peak_memory_kb"] = peak_memory_kb(
+                _evaluate, queryset, method
+            )
+            results.append(measurement.result)
+
+    queryset = querysets["transaction"]
+    sums, measurements = {}, {}
+    for path, total in SUMS.items():
+        name = f"aggregate.transaction.sum.{path}"
+        with Measurement(name, rows=rows) as measurements[path]:
+            sums[path] = queryset.aggregate(total=total())["total"]
+        results.append(measurements[path].result)
+    # how far the float sum drifted from the exact one
+    measurements["float"].result["error"] = float(
+        abs(Decimal(sums["float"]) - sums["cents"])
+    )
+    return results
@@ -0,0 +1,45 @@
+from django.db.models import Q
+
+from tracker.models import Transaction
+from tracker.pagination import paginate_transactions
+
+from .base import Measurement, register, seed_transactions
+
+# words of the generated notes "<category> <number>", from rare to frequent
+SEARCH_TERMS = ("4242", "rent", "foo")
+PAGE_SIZE = 50
+
+
+def _scan(queryset, term):
+    return queryset.filter(Q(note__icontains=term) | Q(description__icontains=term))
+
+
+@register("search")
+def search_benchmark(options):
+    """
+    Compare the full-text search of the transaction notes with a scan of the
+    table, for the first page of the transaction list and for ranked results.
+    """
+    rows = options["rows"]
+    user = seed_transactions(rows)
+    queryset = Transaction.objects.filter(user=user)
+
+    results = []
+    for term in SEARCH_TERMS:
+        searches = {
+            "index": lambda: paginate_transactions(
+                queryset.search(term), page_size=PAGE_SIZE
+            ),
+            "scan": lambda: paginate_transactions(
+                _scan(queryset, term), page_size=PAGE_SIZE
+            ),
+            "ranked": lambda: list(queryset.search(term, rank=True)[:PAGE_SIZE]),
+        }
+        matches = queryset.search(term).count()
+        for name, search in searches.items():
+            with Measurement(
+                f"search.{name}.{term}", rows=rows, matches=matches
+            ) as measurement:
+                search()
+            results.append(measurement.result)
+    return results
@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+from datetime import date
+
+from django.core.cache import cache
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from tracker.models import ExportJob
+from tracker.tasks import export_transactions_xlsx
+
+from .base import Measurement, peak_memory_kb, register, seed_transactions
+
+IN_MEMORY_CHANNEL_LAYERS = {
+    "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"},
+}
+
+
+def _get_views():
+    """Return the benchmarked views as name -> (url, query parameters)."""
+    today = date.today()
+    period = {"year": today.year, "month": today.month}
+    export = reverse("tracker:transaction_export")
+    return {
+        "transaction_list": (reverse("tracker:transaction_list"), period),
+        "transaction_statistics": (reverse("tracker:transaction_statistics"), period),
+        "transaction_total_statistics": (
+            reverse("tracker:transaction_total_statistics"),
+            {"year": today.year},
+        ),
+        "load_categories": (reverse("tracker:load_categories"), {"type": "EXP"}),
+        "export.csv": (export, {"format": "csv"}),
+        "export.json": (export, {"format": "json"}),
+        "export.ndjson": (export, {"format": "ndjson"}),
+    }
+
+
+def _fetch(client, url, params):
+    response = client.get(url, params)
+    if response.status_code != 200:
+        raise AssertionError(f"GET {url} returned {response.status_code}")
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+@register("views")
+def views_benchmark(options):
+    """
+    Request the tracker views with a cold and a warm statistics cache.
+
+    The XLSX export is built by a Celery task, which is run in process.
+    """
+    rows = options["rows"]
+    user = seed_transactions(rows)
+    client = Client()
+    client.force_login(user)
+
+    results = []
+    for name, (url, params) in _get_views().items():
+        for state in ("cold", "warm"):
+            if state == "cold":
+                cache.clear()
+            with Measurement(f"view.{name}.{state}", rows=rows) as measurement:
+                _fetch(client, url, params)
+            if state == "cold":
+                cache.clear()
+                # also warms the cache up for the next request
+                measurement.result["peak_memory_kb"] = peak_memory_kb(
+                    _fetch, client, url, params
+                )
+            results.append(measurement.result)
+
+    media_root = tempfile.mkdtemp()
+    try:
+        with override_settings(
+            MEDIA_ROOT=media_root, CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS
+        ):
+            job = ExportJob.objects.create(user=user)
+            with Measurement("task.export_transactions_xlsx", rows=rows) as measurement:
+                export_transactions_xlsx(job.pk)
+            job = ExportJob.objects.create(user=user)
+            measurement.result["peak_memory_kb"] = peak_memory_kb(
+                export_transactions_xlsx, job.pk
+            )
+            results.append(measurement.result)
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+    return results
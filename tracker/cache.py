@@ -0,0 +1,115 @@
+import time
+
+from django.core.cache import cache
+
+from .choices import TransactionTextChoices
+from .models import Category
+
+STATISTICS_TIMEOUT = 60 * 60
+# how long a computation holds the lock, and how long others wait for it
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 5
+LOCK_POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+
+# the versions are bumped by the web and Celery processes alike, so the
+# default cache must be shared by them, like RedisCache (tracker.W001)
+def _version_key(user_id):
+    return f"tracker:statistics-version:{user_id}"
+
+
+def _category_version_key(user_id):
+    return f"tracker:category-version:{user_id}"
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # a time based start never reuses the version of an evicted counter
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_statistics_version(user_id):
+    """Return the current version of the user's cached statistics."""
+    return _get_version(_version_key(user_id))
+
+
+def bump_statistics_version(user_id):
+    """Invalidate all cached statistics of the user."""
+    _bump_version(_version_key(user_id))
+
+
+def get_category_version(user_id):
+    """Return the current version of the user's categories."""
+    return _get_version(_category_version_key(user_id))
+
+
+def bump_category_version(user_id):
+    """Invalidate the cached categories of the user."""
+    _bump_version(_category_version_key(user_id))
+
+
+def cached_categories(user_id, version):
+    """
+    Return the ``id`` and ``name`` of the user's categories by type, for the
+    given version of the categories, reading them in one query on a miss.
+    """
+    key = f"tracker:categories:{user_id}:{version}"
+    categories = cache.get(key)
+    if categories is None:
+        categories = {type: [] for type in TransactionTextChoices.values}
+        for category in (
+            Category.objects.filter(user_id=user_id)
+            .order_by("name")
+            .values("id", "name", "type")
+        ):
+            categories[category.pop("type")].append(category)
+        cache.set(key, categories, timeout=STATISTICS_TIMEOUT)
+    return categories
+
+
+def cached_statistics(user_id, key_parts, compute, timeout=STATISTICS_TIMEOUT):
+    """
+    Return the cached result of ``compute`` for the user's current statistics
+    version, computing and caching it on a miss.
+
+    Concurrent misses of the same key compute the value only once; the others
+    wait for it to be cached, and only compute it themselves if that takes
+    longer than ``LOCK_WAIT`` seconds. ``compute`` must return a picklable
+    value, not a lazy queryset.
+    """
+    version = get_statistics_version(user_id)
+    key = ":".join(
+        ["tracker:statistics", str(user_id), str(version), *map(str, key_parts)]
+    )
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, timeout=timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+    return compute()
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core import checks
+
+# caches only seen by the process they are in
+PER_PROCESS_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Warn when the default cache is not shared by the processes.
+
+    The web and Celery processes read the statistics and category versions
+    bumped by each other, and the presence registry of the consumers, from
+    the default cache.
+    """
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in PER_PROCESS_CACHES:
+        return []
+    return [
+        checks.Warning(
+            f"The default cache {backend} is not shared by the processes.",
+            hint=(
+                "The web and Celery processes serve stale statistics and miss "
+                "the connected users with it, use a cache like RedisCache."
+            ),
+            id="tracker.W001",
+        )
+    ]
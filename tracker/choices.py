@@ -4,3 +4,10 @@ from django.db import models
 class TransactionTextChoices(models.TextChoices):
     INCOME = "INC", "Income"
     EXPENSE = "EXP", "Expense"
+
+
+class ExportJobStatusChoices(models.TextChoices):
+    PENDING = "PEN", "Pending"
+    RUNNING = "RUN", "Running"
+    DONE = "DON", "Done"
+    FAILED = "FAI", "Failed"
@@ -1,36 +1,77 @@
+import asyncio
 import json
 
-from asgiref.sync import async_to_sync
+from asgiref.sync import async_to_sync, sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.layers import get_channel_layer
+from django.conf import settings
+
+from . import presence
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.user = self.scope["user"]
         if self.user.is_authenticated:
-            self.group_name = f"user_notifications_{self.user.id}"
+            self.group_name = notification_group(self.user.id)
             await self.channel_layer.group_add(self.group_name, self.channel_name)
+            self.presence = presence.Connection(self.user.id, self.channel_name)
+            await sync_to_async(self.presence.open)()
             await self.accept()
+            self.heartbeat_task = asyncio.create_task(self.send_heartbeats())
         else:
             await self.close()
 
     async def disconnect(self, code):
         if self.user.is_authenticated:
+            self.heartbeat_task.cancel()
+            await sync_to_async(self.presence.close)()
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
+    async def send_heartbeats(self):
+        while True:
+            await asyncio.sleep(settings.PRESENCE_HEARTBEAT_INTERVAL)
+            await sync_to_async(self.presence.heartbeat)()
+
     async def send_notification(self, event):
-        message = event["message"]
-        await self.send(text_data=json.dumps({"message": message}))
+        # the message and any extra data sent with it
+        data = {key: value for key, value in event.items() if key != "type"}
+        await self.send(text_data=json.dumps(data))
+
 
+def notification_group(user_id):
+    return f"user_notifications_{user_id}"
 
-def notify_user(user_id, message):
+
+def notify_user(user_id, message, **data):
+    """Send a notification, with optional JSON serializable data, to the user."""
     channel_layer = get_channel_layer()
-    group_name = f"user_notifications_{user_id}"
     async_to_sync(channel_layer.group_send)(
-        group_name,
+        notification_group(user_id),
         {
             "type": "send_notification",
             "message": message,
+            **data,
         },
     )
+
+
+async def notify_users(user_ids, message, concurrency):
+    """
+    Send the same notification to many users, at most ``concurrency`` at once.
+
+    Return the number of sent and of failed notifications.
+    """
+    channel_layer = get_channel_layer()
+    semaphore = asyncio.Semaphore(concurrency)
+    event = {"type": "send_notification", "message": message}
+
+    async def send(user_id):
+        async with semaphore:
+            await channel_layer.group_send(notification_group(user_id), event)
+
+    results = await asyncio.gather(
+        *(send(user_id) for user_id in user_ids), return_exceptions=True
+    )
+    failed = sum(isinstance(result, Exception) for result in results)
+    return len(results) - failed, failed
@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+from itertools import chain
+
+from django.utils import timezone
+
+from .choices import TransactionTextChoices
+
+# exported column name -> queryset field, in the order of TransactionResource
+EXPORT_FIELDS = {
+    "note": "note",
+    "description": "description",
+    "category": "category__name",
+    "type": "type",
+    "amount": "amount",
+    "date": "date",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# rows fetched from the database at a time
+CHUNK_SIZE = 2000
+# rows serialized into each chunk of the response
+ROWS_PER_CHUNK = 500
+
+
+def export_rows(queryset, archived=(), chunk_size=CHUNK_SIZE):
+    """
+    Yield the transactions of ``queryset``, then the ``archived`` transactions,
+    as lists of strings, formatted like the ``TransactionResource`` export.
+
+    Only the exported columns are fetched and the rows are streamed from the
+    database, so memory use does not depend on the number of transactions.
+    """
+    type_labels = dict(TransactionTextChoices.choices)
+    # resolved once, timezone.localtime() looks it up on every call
+    tz = timezone.get_current_timezone()
+
+    def format_row(
+        note, description, category, type, amount, date, created_at, updated_at
+    ):
+        return [
+            note,
+            description or "",
+            category,
+            type_labels.get(type, type),
+            str(amount),
+            date.strftime(DATE_FORMAT),
+            created_at.astimezone(tz).strftime(DATETIME_FORMAT),
+            updated_at.astimezone(tz).strftime(DATETIME_FORMAT),
+        ]
+
+    rows = queryset.values_list(*EXPORT_FIELDS.values()).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield format_row(*row)
+    for transaction in archived:
+        yield format_row(
+            transaction.note,
+            transaction.description,
+            transaction.category.name,
+            transaction.type,
+            transaction.amount,
+            transaction.date,
+            transaction.created_at,
+            transaction.updated_at,
+        )
+
+
+def _chunked(pieces, size=ROWS_PER_CHUNK):
+    """Join the serialized rows into chunks of ``size`` rows."""
+    chunk = []
+    for piece in pieces:
+        chunk.append(piece)
+        if len(chunk) == size:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def stream_csv(queryset, archived=()):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def serialize(row):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        return buffer.getvalue()
+
+    yield serialize(EXPORT_FIELDS)
+    yield from _chunked(serialize(row) for row in export_rows(queryset, archived))
+
+
+def stream_json(queryset, archived=()):
+    """Stream the transactions as a JSON array of objects."""
+    yield "["
+    objects = (
+        json.dumps(dict(zip(EXPORT_FIELDS, row)))
+        for row in export_rows(queryset, archived)
+    )
+    first = next(objects, None)
+    if first is not None:
+        yield from _chunked(chain([first], (f", {obj}" for obj in objects)))
+    yield "]"
+
+
+def stream_ndjson(queryset, archived=()):
+    """Stream the transactions as newline delimited JSON objects."""
+    yield from _chunked(
+        json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n"
+        for row in export_rows(queryset, archived)
+    )
+
+
+# export format -> (streaming serializer, content type)
+STREAMING_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "json": (stream_json, "application/json"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
@@ -2,59 +2,90 @@ from datetime import datetime
 
 import django_filters
 
-from .models import Category, Transaction, TransactionTextChoices
+from .forms import CategoryChoiceField
+from .models import Transaction, TransactionTextChoices
+from .repositories import CategoryRepository
 from .utils import MONTH_CHOICES, YEAR_CHOICES
 
 
-class TransactionFilter(django_filters.FilterSet):
+class PeriodFilterSet(django_filters.FilterSet):
+    """
+    Base filterset for the year and month filters.
+
+    The selected period is applied as a single date range rather than
+    ``date__year``/``date__month`` lookups, so the date indexes can be used.
+    """
+
+    def filter_year(self, queryset, name, value):
+        # the month filter applies the narrower range of the selected year
+        if self.form.cleaned_data.get("month"):
+            return queryset
+        return queryset.in_period(value)
+
+    def filter_month(self, queryset, name, value):
+        year = self.form.cleaned_data.get("year") or datetime.now().year
+        return queryset.in_period(year, value)
+
+
+class CategoryFilter(django_filters.Filter):
+    """Filter by a category of the user of the request."""
+
+    field_class = CategoryChoiceField
+
+
+class TransactionFilter(PeriodFilterSet):
+    search = django_filters.CharFilter(method="filter_search", label="Search:")
     transaction_type = django_filters.ChoiceFilter(
         choices=TransactionTextChoices.choices,
         field_name="type",
         label="Type:",
         empty_label="All",
     )
-    category = django_filters.ModelChoiceFilter(
-        queryset=Category.objects.all(),
-        label="Category:",
-        empty_label="All",
-    )
+    category = CategoryFilter(label="Category:", empty_label="All")
     year = django_filters.ChoiceFilter(
         choices=YEAR_CHOICES,
         field_name="date",
-        lookup_expr="year",
+        method="filter_year",
         label="Year:",
         empty_label=None,
     )
     month = django_filters.ChoiceFilter(
         choices=MONTH_CHOICES,
         field_name="date",
-        lookup_expr="month",
+        method="filter_month",
         label="Month:",
         empty_label=None,
     )
 
     class Meta:
         model = Transaction
-        fields = ["transaction_type", "category", "year", "month"]
+        fields = ["search", "transaction_type", "category", "year", "month"]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        if self.request is not None:
+            categories = CategoryRepository.for_request(self.request).categories
+            self.filters["category"].extra["categories"] = categories
         self.form.initial["year"] = datetime.now().year
         self.form.initial["month"] = datetime.now().month
 
+    def filter_search(self, queryset, name, value):
+        # the list stays in date order for its keyset pagination
+        return queryset.search(value)
+
 
-class TransactionStasticsFilter(django_filters.FilterSet):
+class TransactionStasticsFilter(PeriodFilterSet):
     year = django_filters.ChoiceFilter(
         choices=YEAR_CHOICES,
         field_name="date",
-        lookup_expr="year",
+        method="filter_year",
         label="Year:",
         empty_label=None,
     )
     month = django_filters.ChoiceFilter(
         choices=MONTH_CHOICES,
         field_name="date",
-        lookup_expr="month",
+        method="filter_month",
         label="Month:",
         empty_label=None,
     )
@@ -69,11 +100,11 @@ class TransactionStasticsFilter(django_filters.FilterSet):
         self.form.initial["month"] = datetime.now().month
 
 
-class TransactionTotalStasticsFilter(django_filters.FilterSet):
+class TransactionTotalStasticsFilter(PeriodFilterSet):
     year = django_filters.ChoiceFilter(
         choices=YEAR_CHOICES,
         field_name="date",
-        lookup_expr="year",
+        method="filter_year",
         label="Year:",
         empty_label=None,
     )
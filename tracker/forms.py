@@ -2,12 +2,56 @@ from django import forms
 from django.core.exceptions import ValidationError
 
 from .models import Category, Transaction
+from .repositories import CategoryRepository
 
 EXPORT_FORMAT_CHOICES = (
     ("csv", "CSV"),
     ("json", "JSON"),
+    ("ndjson", "NDJSON"),
     ("xlsx", "XLSX"),
 )
+IMPORT_FORMAT_CHOICES = (
+    ("csv", "CSV"),
+    ("ndjson", "NDJSON"),
+)
+
+
+class CategoryChoiceField(forms.ModelChoiceField):
+    """
+    Choice of a category of an already read list, like those of a
+    ``CategoryRepository``, rather than of a queryset.
+    """
+
+    def __init__(self, categories=(), **kwargs):
+        super().__init__(queryset=Category.objects.none(), **kwargs)
+        self.categories = categories
+
+    @property
+    def categories(self):
+        return self._categories
+
+    @categories.setter
+    def categories(self, categories):
+        self._categories = list(categories)
+        choices = [
+            (category.pk, self.label_from_instance(category))
+            for category in self._categories
+        ]
+        if self.empty_label is not None:
+            choices.insert(0, ("", self.empty_label))
+        self.choices = choices
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        for category in self._categories:
+            if str(category.pk) == str(value):
+                return category
+        raise ValidationError(
+            self.error_messages["invalid_choice"],
+            code="invalid_choice",
+            params={"value": value},
+        )
 
 
 class CategoryForm(forms.ModelForm):
@@ -18,6 +62,9 @@ class CategoryForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         # access user from kwargs
         self.user = kwargs.pop("user", None)
+        self.categories = kwargs.pop("categories", None) or CategoryRepository(
+            self.user
+        )
         super().__init__(*args, **kwargs)
 
     def clean_name(self):
@@ -32,7 +79,7 @@ class CategoryForm(forms.ModelForm):
         type = cleaned_data.get("type")
 
         if self.user and name and type:
-            if Category.objects.filter(name=name, user=self.user, type=type).exists():
+            if self.categories.exists(name, type, exclude=self.instance.pk):
                 raise ValidationError(
                     "Category with this Name and Type already exists."
                 )
@@ -41,6 +88,8 @@ class CategoryForm(forms.ModelForm):
 
 
 class TransactionForm(forms.ModelForm):
+    category = CategoryChoiceField()
+
     class Meta:
         model = Transaction
         fields = ["note", "description", "type", "category", "amount", "date"]
@@ -48,20 +97,16 @@ class TransactionForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop("user", None)
+        categories = kwargs.pop("categories", None) or CategoryRepository(self.user)
         super().__init__(*args, **kwargs)
-        self.fields["category"].queryset = Category.objects.none()
 
         if "type" in self.data:
             # retrieve the type from the submitted data
             transaction_type = self.data.get("type")
-            self.fields["category"].queryset = Category.objects.filter(
-                user=self.user, type=transaction_type
-            )
+            self.fields["category"].categories = categories.of_type(transaction_type)
         # editing an existing instance
         elif self.instance.pk:
-            self.fields["category"].queryset = Category.objects.filter(
-                user=self.user, type=self.instance.type
-            )
+            self.fields["category"].categories = categories.of_type(self.instance.type)
 
     def clean_amount(self):
         """Check the amount field is non-negative."""
@@ -73,3 +118,10 @@ class TransactionForm(forms.ModelForm):
 
 class TransactionExportFormatForm(forms.Form):
     format = forms.ChoiceField(choices=EXPORT_FORMAT_CHOICES, widget=forms.Select())
+
+
+class TransactionImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="Columns: note, description, category, type, amount and date."
+    )
+    format = forms.ChoiceField(choices=IMPORT_FORMAT_CHOICES, widget=forms.Select())
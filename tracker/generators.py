@@ -0,0 +1,173 @@
+import math
+import random
+from bisect import bisect
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate, islice
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .choices import TransactionTextChoices
+from .models import Category, Transaction
+
+INCOME = TransactionTextChoices.INCOME
+EXPENSE = TransactionTextChoices.EXPENSE
+
+# columns of the generated transactions
+INSERT_FIELDS = (
+    "note",
+    "description",
+    "category",
+    "user",
+    "type",
+    "amount",
+    "date",
+    "created_at",
+    "updated_at",
+)
+
+
+@dataclass(frozen=True)
+class CategoryProfile:
+    """How often a category is used and how much its transactions amount to."""
+
+    type: str
+    # relative number of transactions of the category
+    weight: float
+    # median amount, the amounts are log-normally distributed around it
+    median: float
+    sigma: float
+
+
+CATEGORY_PROFILES = {
+    # income
+    "Salary": CategoryProfile(INCOME, 2, 3000, 0.15),
+    "Parents": CategoryProfile(INCOME, 1, 300, 0.5),
+    "Investment": CategoryProfile(INCOME, 1, 150, 1.0),
+    "Commissions": CategoryProfile(INCOME, 1, 400, 0.8),
+    "Interest": CategoryProfile(INCOME, 1, 20, 0.7),
+    # expense
+    "Foods": CategoryProfile(EXPENSE, 30, 12, 0.6),
+    "Groceries": CategoryProfile(EXPENSE, 20, 45, 0.7),
+    "Rent": CategoryProfile(EXPENSE, 2, 900, 0.2),
+    "Bills": CategoryProfile(EXPENSE, 6, 80, 0.5),
+    "Transport": CategoryProfile(EXPENSE, 15, 8, 0.8),
+    "Clothes": CategoryProfile(EXPENSE, 3, 60, 0.7),
+    "Medicine": CategoryProfile(EXPENSE, 2, 25, 0.9),
+    "Social": CategoryProfile(EXPENSE, 8, 30, 0.8),
+    "Vacation": CategoryProfile(EXPENSE, 1, 700, 0.6),
+}
+# profiles of the categories without one of their own, by type
+DEFAULT_PROFILES = {
+    INCOME: CategoryProfile(INCOME, 1, 200, 1.0),
+    EXPENSE: CategoryProfile(EXPENSE, 5, 30, 1.0),
+}
+
+
+def get_profile(name, type):
+    profile = CATEGORY_PROFILES.get(name)
+    if profile is None or profile.type != type:
+        return DEFAULT_PROFILES[type]
+    return profile
+
+
+def create_profile_categories(users):
+    """Give each user a category of every profile they do not have yet."""
+    Category.objects.bulk_create(
+        [
+            Category(name=name, user=user, type=profile.type)
+            for user in users
+            for name, profile in CATEGORY_PROFILES.items()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def generate_transactions(user_id, categories, count, rng, start, end):
+    """
+    Yield ``count`` transactions of the user dated from ``start`` to ``end``,
+    as tuples of the values of ``INSERT_FIELDS`` without the timestamps.
+
+    ``categories`` is a list of ``(pk, name, type)`` tuples. The categories are
+    picked with the frequencies of their profile and the amounts follow its
+    distribution, so the totals resemble those of a real user.
+    """
+    profiles = [get_profile(name, type) for _, name, type in categories]
+    weights = list(accumulate(profile.weight for profile in profiles))
+    mus = [math.log(profile.median) for profile in profiles]
+    dates = [start + timedelta(days=day) for day in range((end - start).days + 1)]
+    for i in range(count):
+        index = bisect(weights, rng.random() * weights[-1])
+        pk, name, type = categories[index]
+        cents = max(
+            1, round(rng.lognormvariate(mus[index], profiles[index].sigma) * 100)
+        )
+        yield (
+            f"{name} {i}",
+            "",
+            pk,
+            user_id,
+            type,
+            Decimal(cents).scaleb(-2),
+            rng.choice(dates),
+        )
+
+
+def insert_transactions(rows, batch_size):
+    """
+    Insert transaction tuples of ``generate_transactions`` in batches, one
+    database transaction each, and return their number.
+
+    The rows are inserted with ``executemany`` rather than ``bulk_create``,
+    which spends most of its time preparing the values of each model instance.
+    """
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(
+        quote_name(Transaction._meta.get_field(name).column) for name in INSERT_FIELDS
+    )
+    placeholders = ", ".join(["%s"] * len(INSERT_FIELDS))
+    sql = (
+        f"INSERT INTO {quote_name(Transaction._meta.db_table)} ({columns}) "
+        f"VALUES ({placeholders})"
+    )
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    created = 0
+    rows = iter(rows)
+    while batch := [(*row, now, now) for row in islice(rows, batch_size)]:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+        created += len(batch)
+    return created
+
+
+@dataclass(frozen=True)
+class GenerationTask:
+    """A chunk of the transactions of a user, generated by one worker."""
+
+    user_id: int
+    count: int
+    seed: str
+    start: date
+    end: date
+    batch_size: int
+
+
+def run_generation_task(task):
+    """Insert the transactions of ``task``, return how many."""
+    categories = list(
+        Category.objects.filter(user_id=task.user_id)
+        .order_by("pk")
+        .values_list("pk", "name", "type")
+    )
+    rows = generate_transactions(
+        task.user_id,
+        categories,
+        task.count,
+        random.Random(task.seed),
+        task.start,
+        task.end,
+    )
+    return insert_transactions(rows, task.batch_size)
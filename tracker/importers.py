@@ -0,0 +1,237 @@
+import codecs
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+
+from .archive import archive_ends
+from .cache import bump_statistics_version
+from .choices import TransactionTextChoices
+from .models import Category, MonthlyCategoryTotal, Transaction
+from .periods import get_month_range
+
+# accepted values of the type column, the exported labels or the stored codes
+TYPE_VALUES = {
+    **{value.casefold(): value for value in TransactionTextChoices.values},
+    **{label.casefold(): value for value, label in TransactionTextChoices.choices},
+}
+
+
+@dataclass
+class RowError:
+    line: int
+    messages: list
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)
+    seconds: float = 0
+
+    @property
+    def rows(self):
+        return self.created + len(self.errors)
+
+
+def _decode_lines(file):
+    """
+    Yield the lines of a binary UTF-8 file as text, the bytes that are not
+    UTF-8 decoded as lone surrogates, so that only their rows are invalid.
+    """
+    for number, line in enumerate(file):
+        if number == 0:
+            line = line.removeprefix(codecs.BOM_UTF8)
+        yield line.decode("utf-8", "surrogateescape")
+
+
+def _is_utf8(values):
+    try:
+        for value in values:
+            if isinstance(value, str):
+                value.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def read_csv(file):
+    """
+    Yield ``(line, row)`` pairs of a binary CSV file with a header row.
+
+    A row that can't be read is yielded as a ``ValidationError``, and a file
+    that can't be parsed any further ends with one.
+    """
+    reader = csv.DictReader(_decode_lines(file))
+    while True:
+        # a row that can't be read starts after the last line read
+        line = reader.line_num + 1
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            yield (
+                line,
+                ValidationError(
+                    f"Invalid CSV, the rest of the file was not read: {exc}"
+                ),
+            )
+            return
+        if not _is_utf8(reader.fieldnames):
+            yield reader.line_num, ValidationError("Invalid UTF-8 in the header.")
+            return
+        if not _is_utf8([*row.values(), *row.get(None, [])]):
+            yield reader.line_num, ValidationError("Invalid UTF-8.")
+            continue
+        yield reader.line_num, row
+
+
+def read_ndjson(file):
+    """Yield ``(line, row)`` pairs of a binary newline delimited JSON file."""
+    for line, text in enumerate(_decode_lines(file), 1):
+        if not text.strip():
+            continue
+        if not _is_utf8([text]):
+            yield line, ValidationError("Invalid UTF-8.")
+            continue
+        try:
+            row = json.loads(text)
+        except json.JSONDecodeError:
+            row = None
+        yield line, row if isinstance(row, dict) else None
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+class TransactionImporter:
+    """
+    Import transactions of a user from a file in the export format.
+
+    The file is read as a stream and the valid rows are inserted with
+    ``bulk_create``, one database transaction per batch. Invalid rows are
+    reported with their line number without stopping the import. Categories
+    are resolved by name and type from the user's categories, loaded once.
+    """
+
+    def __init__(self, user, batch_size=None):
+        self.user = user
+        self.batch_size = batch_size or settings.TRANSACTION_IMPORT_BATCH_SIZE
+        self.categories = {
+            (name.casefold(), type): pk
+            for pk, name, type in Category.objects.filter(user=user).values_list(
+                "pk", "name", "type"
+            )
+        }
+        self._first_date = self._last_date = None
+        # the totals of the archived months are kept by the rebuild, the rows
+        # imported into them are added to their totals one by one
+        self._archive_end = archive_ends([user.pk]).get(user.pk)
+        self._archived = []
+
+    def import_file(self, file, format):
+        return self.import_rows(READERS[format](file))
+
+    def import_rows(self, rows):
+        """Import ``(line, row)`` pairs, where ``row`` maps columns to values."""
+        start = time.perf_counter()
+        result = ImportResult()
+        batch = []
+        try:
+            for line, row in rows:
+                try:
+                    batch.append((line, self.build_transaction(row)))
+                except ValidationError as exc:
+                    result.errors.append(RowError(line, exc.messages))
+                    continue
+                if len(batch) >= self.batch_size:
+                    self._insert(batch, result)
+                    batch = []
+            if batch:
+                self._insert(batch, result)
+        finally:
+            # the batches are committed one by one, even when a later one fails
+            if result.created:
+                self._refresh_statistics()
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def _clean(self, row, name):
+        """Validate a column with the model field of the same name."""
+        value = row.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        try:
+            return Transaction._meta.get_field(name).clean(value, None)
+        except ValidationError as exc:
+            raise ValidationError([f"{name}: {message}" for message in exc.messages])
+
+    def build_transaction(self, row):
+        """Return an unsaved transaction from a row, or raise ValidationError."""
+        if isinstance(row, ValidationError):
+            raise row
+        if row is None:
+            raise ValidationError("Invalid row.")
+
+        values = {}
+        errors = []
+        for name in ("note", "description", "amount", "date"):
+            try:
+                values[name] = self._clean(row, name)
+            except ValidationError as exc:
+                errors += exc.messages
+        values["description"] = values.get("description") or ""
+        if values.get("amount") is not None and values["amount"] <= 0:
+            errors.append("amount: Amount must be a positive number.")
+
+        type = TYPE_VALUES.get(str(row.get("type") or "").strip().casefold())
+        category = str(row.get("category") or "").strip()
+        if type is None:
+            errors.append(f"type: Unknown transaction type {row.get('type')!r}.")
+        elif (category.casefold(), type) not in self.categories:
+            errors.append(f"category: Unknown category {category!r}.")
+        if errors:
+            raise ValidationError(errors)
+
+        return Transaction(
+            user=self.user,
+            type=type,
+            category_id=self.categories[(category.casefold(), type)],
+            **values,
+        )
+
+    def _insert(self, batch, result):
+        try:
+            with transaction.atomic():
+                Transaction.objects.bulk_create([t for _, t in batch])
+        except DatabaseError as exc:
+            result.errors += [RowError(line, [str(exc)]) for line, _ in batch]
+            return
+
+        result.created += len(batch)
+        if self._archive_end is not None:
+            self._archived += [t for _, t in batch if t.date < self._archive_end]
+        dates = [t.date for _, t in batch]
+        first, last = min(dates), max(dates)
+        if self._first_date is None or first < self._first_date:
+            self._first_date = first
+        if self._last_date is None or last > self._last_date:
+            self._last_date = last
+
+    def _refresh_statistics(self):
+        # bulk_create bypasses the signals maintaining the rollups
+        start = self._first_date.replace(day=1)
+        _, end = get_month_range(self._last_date.year, self._last_date.month)
+        MonthlyCategoryTotal.objects.filter(
+            user=self.user, month__gte=start, month__lt=end
+        ).rebuild(
+            Transaction.objects.filter(user=self.user, date__gte=start, date__lt=end)
+        )
+        for instance in self._archived:
+            MonthlyCategoryTotal.objects.add_transaction(instance)
+        bump_statistics_version(self.user.pk)
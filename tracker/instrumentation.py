@@ -0,0 +1,210 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# upper bounds of the histogram buckets, the last one is unbounded
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# histogram name -> (bucket bounds, record attribute)
+HISTOGRAMS = {
+    "latency_ms": (LATENCY_BUCKETS_MS, "latency_ms"),
+    "queries": (QUERY_BUCKETS, "query_count"),
+    "sql_ms": (LATENCY_BUCKETS_MS, "sql_ms"),
+}
+# longest logged statement
+MAX_SQL_LENGTH = 1000
+# cache key of the (kind, name) pairs with histograms
+NAMES_KEY = "tracker:metrics:names"
+
+
+class QueryRecorder:
+    """
+    Execute wrapper counting and timing the queries of a connection.
+
+    Install it with ``connection.execute_wrapper``, or on every connection
+    with ``record_queries``.
+    """
+
+    def __init__(self):
+        self.query_count = 0
+        self.sql_seconds = 0.0
+        self.slowest_sql = None
+        self.slowest_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - start
+            self.query_count += 1
+            self.sql_seconds += seconds
+            if seconds >= self.slowest_seconds:
+                self.slowest_seconds = seconds
+                self.slowest_sql = sql
+
+    @property
+    def sql_ms(self):
+        return round(self.sql_seconds * 1000, 2)
+
+    def as_dict(self):
+        return {
+            "query_count": self.query_count,
+            "sql_ms": self.sql_ms,
+            "slowest_sql": (self.slowest_sql or "")[:MAX_SQL_LENGTH],
+            "slowest_sql_ms": round(self.slowest_seconds * 1000, 2),
+        }
+
+
+@contextmanager
+def record_queries():
+    """Record the queries of every database connection of the block."""
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Metrics:
+    """
+    Histograms of the requests and tasks of this process, by view or task.
+
+    They are added to the histograms of all the processes, kept in the cache,
+    at most every ``INSTRUMENTATION_FLUSH_INTERVAL`` seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._last_flush = time.monotonic()
+
+    def observe(self, kind, name, record):
+        with self._lock:
+            histograms = self._histograms.setdefault(
+                (kind, name),
+                {key: Histogram(bounds) for key, (bounds, _) in HISTOGRAMS.items()},
+            )
+            for key, (_, attribute) in HISTOGRAMS.items():
+                histograms[key].observe(record[attribute])
+            due = (
+                time.monotonic() - self._last_flush
+                >= settings.INSTRUMENTATION_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+            self._last_flush = time.monotonic()
+        if not histograms:
+            return
+
+        names = cache.get(NAMES_KEY, set())
+        if not names >= histograms.keys():
+            # a name lost to a concurrent update is added again by the next flush
+            cache.set(NAMES_KEY, names | histograms.keys(), timeout=None)
+        for (kind, name), by_key in histograms.items():
+            for key, histogram in by_key.items():
+                counts = dict(enumerate(histogram.counts))
+                # cache backends like Redis only increment integers
+                counts["sum"] = round(histogram.sum)
+                for bucket, count in counts.items():
+                    if count:
+                        _incr(_bucket_key(kind, name, key, bucket), count)
+
+    def collect(self):
+        """Return the histograms of all the processes, by kind and name."""
+        names = sorted(cache.get(NAMES_KEY, set()))
+        keys = [
+            _bucket_key(kind, name, key, bucket)
+            for kind, name in names
+            for key, (bounds, _) in HISTOGRAMS.items()
+            for bucket in [*range(len(bounds) + 1), "sum"]
+        ]
+        values = cache.get_many(keys)
+
+        result = {}
+        for kind, name in names:
+            histograms = result.setdefault(kind, {}).setdefault(name, {})
+            for key, (bounds, _) in HISTOGRAMS.items():
+                counts = [
+                    values.get(_bucket_key(kind, name, key, bucket), 0)
+                    for bucket in range(len(bounds) + 1)
+                ]
+                histograms[key] = {
+                    "buckets": [*bounds, None],
+                    "counts": counts,
+                    "count": sum(counts),
+                    "sum": values.get(_bucket_key(kind, name, key, "sum"), 0),
+                }
+        return result
+
+
+def _bucket_key(kind, name, key, bucket):
+    return f"tracker:metrics:{kind}:{name}:{key}:{bucket}"
+
+
+def _incr(key, delta):
+    if not cache.add(key, delta, timeout=None):
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # evicted since it was added
+            cache.set(key, delta, timeout=None)
+
+
+metrics = Metrics()
+
+
+# task id -> (stack of the execute wrappers, recorder, start time)
+_task_recordings = {}
+
+
+def start_task_recording(task_id):
+    stack = ExitStack()
+    recorder = stack.enter_context(record_queries())
+    _task_recordings[task_id] = (stack, recorder, time.perf_counter())
+
+
+def finish_task_recording(task_id, name, state):
+    recording = _task_recordings.pop(task_id, None)
+    if recording is None:
+        return
+    stack, recorder, start = recording
+    stack.close()
+    log_record("task", name, time.perf_counter() - start, recorder, state=state)
+
+
+def log_record(kind, name, latency_seconds, recorder, **extra):
+    """Log the measurements of a request or a task and add them to the metrics."""
+    record = {
+        "kind": kind,
+        "name": name,
+        "latency_ms": round(latency_seconds * 1000, 2),
+        **recorder.as_dict(),
+        **extra,
+    }
+    logger.info(f"{kind} {name}", extra={"metrics": record})
+    metrics.observe(kind, name, record)
+    return record
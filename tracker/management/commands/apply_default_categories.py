@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.cache import bump_category_version, bump_statistics_version
+from tracker.models import Category
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Give existing users the default categories they do not have yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="emails",
+            metavar="EMAIL",
+            help="Only apply the default categories to this user. Can be repeated.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of users given their categories per query.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        users = User.objects.order_by("pk")
+        if options["emails"]:
+            users = users.filter(email__in=options["emails"])
+
+        user_ids = list(users.values_list("pk", flat=True))
+        batch_size = options["batch_size"]
+        before = Category.objects.filter(user__in=users).count()
+        for i in range(0, len(user_ids), batch_size):
+            batch = user_ids[i : i + batch_size]
+            Category.objects.create_defaults(User(pk=pk) for pk in batch)
+            for user_id in batch:
+                bump_category_version(user_id)
+                bump_statistics_version(user_id)
+        created = Category.objects.filter(user__in=users).count() - before
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} default categories for {len(user_ids)} users."
+            )
+        )
@@ -0,0 +1,55 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.archive import archive_horizon, archive_transactions
+from tracker.models import Transaction
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Move the old transactions to the archives of their users"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            metavar="YYYY-MM-DD",
+            help=(
+                "Archive the transactions before the month of this date. Defaults "
+                "to TRANSACTION_ARCHIVE_AFTER_MONTHS months ago."
+            ),
+        )
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="emails",
+            metavar="EMAIL",
+            help="Only archive the transactions of this user. Can be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        before = archive_horizon()
+        if options["before"]:
+            try:
+                before = date.fromisoformat(options["before"]).replace(day=1)
+            except ValueError:
+                raise CommandError("--before must be a date as YYYY-MM-DD.")
+
+        users = User.objects.order_by("pk")
+        if options["emails"]:
+            users = users.filter(email__in=options["emails"])
+        user_ids = list(
+            users.filter(
+                pk__in=Transaction.objects.filter(date__lt=before).values("user_id")
+            ).values_list("pk", flat=True)
+        )
+        archived = sum(archive_transactions(user_id, before) for user_id in user_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {archived} transactions dated before {before} "
+                f"for {len(user_ids)} users."
+            )
+        )
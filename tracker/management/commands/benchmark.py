@@ -0,0 +1,87 @@
+import json
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from tracker.benchmarks import SCENARIOS, compare
+
+
+class Command(BaseCommand):
+    help = "Run performance benchmarks against a temporary test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenarios",
+            nargs="*",
+            metavar="scenario",
+            help=f"Scenarios to run, all by default. One of: {', '.join(SCENARIOS)}.",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            nargs="+",
+            default=[10_000],
+            help="Number of transactions to seed. Several sizes can be given.",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--baseline",
+            help="Compare the results with those of this JSON file.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Fail if a metric is this fraction worse than the baseline.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["scenarios"] or list(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = []
+            for rows in options["rows"]:
+                for name in names:
+                    self.stdout.write(f"Running {name} with {rows} rows...")
+                    # every scenario starts from an empty database and cache
+                    call_command("flush", interactive=False, verbosity=0)
+                    cache.clear()
+                    results += SCENARIOS[name]({**options, "rows": rows})
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for result in results:
+            metrics = ", ".join(
+                f"{key}={value}" for key, value in result.items() if key != "name"
+            )
+            self.stdout.write(f"{result['name']}: {metrics}")
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(results, file, indent=2)
+            self.stdout.write(
+                self.style.SUCCESS(f"Results written to {options['output']}")
+            )
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options["threshold"])
+            if regressions:
+                raise CommandError(
+                    "Regressions from the baseline:\n" + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regression from the baseline."))
@@ -1,71 +1,144 @@
-import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
 
-from django.core.management.base import BaseCommand
-from faker import Faker
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
 
-from tracker.models import Category, Transaction, TransactionTextChoices, User
+from tracker.cache import bump_category_version, bump_statistics_version
+from tracker.generators import (
+    GenerationTask,
+    create_profile_categories,
+    run_generation_task,
+)
+from tracker.models import Category, MonthlyCategoryTotal, Transaction
+
+User = get_user_model()
+
+# transactions generated by one task of the process pool
+TASK_SIZE = 100_000
 
 
 class Command(BaseCommand):
-    help = "Create dummy transactions"
+    help = "Create dummy users and transactions"
 
-    def handle(self, *args, **kwargs):
-        fake = Faker()
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=1, help="Number of users to create."
+        )
+        parser.add_argument(
+            "--transactions",
+            type=int,
+            default=50,
+            help="Number of transactions of each user.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Spread the transactions over this many days before today.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of transactions inserted per query.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes generating the transactions.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the random generator."
+        )
+        parser.add_argument(
+            "--username-prefix",
+            default="user",
+            help="Users are named <prefix>1, <prefix>2, ...",
+        )
+        parser.add_argument(
+            "--password", default="password", help="Password of the created users."
+        )
 
-        # get the user
-        user = User.objects.filter(username="admin").first()
-        if not user:
-            user = User.objects.create_superuser(
-                username="admin", password="superadmin"
-            )
+    def handle(self, *args, **options):
+        for option in ("users", "batch_size", "workers", "days"):
+            if options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} must be positive.")
 
-        category_list = [
-            "Bills",
-            "Food",
-            "Clothes",
-            "Commissions",
-            "Medicine",
-            "Housing",
-            "Salary",
-            "Interest",
-            "Social",
-            "Transport",
-            "Vacation",
-        ]
-        for category_name in category_list:
-            category_type = (
-                TransactionTextChoices.INCOME
-                if category_name in ("Commissions", "Salary", "Interest")
-                else TransactionTextChoices.EXPENSE
+        start_time = time.perf_counter()
+        users = self.get_users(options)
+        create_profile_categories(users)
+
+        end = date.today()
+        start = end - timedelta(days=options["days"] - 1)
+        tasks = [
+            GenerationTask(
+                user_id=user.pk,
+                count=min(TASK_SIZE, options["transactions"] - offset),
+                seed=f"{options['seed']}:{index}:{offset}",
+                start=start,
+                end=end,
+                batch_size=options["batch_size"],
             )
-            category, created = Category.objects.get_or_create(
-                name=category_name, user=user, type=category_type
+            for index, user in enumerate(users)
+            for offset in range(0, options["transactions"], TASK_SIZE)
+        ]
+        created = self.run_tasks(tasks, options["workers"])
+
+        user_ids = [user.pk for user in users]
+        MonthlyCategoryTotal.objects.filter(user__in=user_ids).rebuild(
+            Transaction.objects.filter(user__in=user_ids)
+        )
+        for user_id in user_ids:
+            bump_category_version(user_id)
+            bump_statistics_version(user_id)
+
+        seconds = time.perf_counter() - start_time
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} transactions for {len(users)} users "
+                f"in {seconds:.1f}s ({created / seconds:.0f} rows/s)."
             )
-            if created:
-                self.stdout.write(
-                    self.style.SUCCESS(f"{category_name} category created.")
-                )
-            else:
-                self.stdout.write(
-                    self.style.WARNING(f"Category '{category_name}' already exists.")
-                )
+        )
 
-        categories = Category.objects.all()
-        income_categories = ["Salary", "Interest", "Commissions"]
+    def get_users(self, options):
+        """Return the generated users, creating the missing ones."""
+        prefix = options["username_prefix"]
+        usernames = [f"{prefix}{i}" for i in range(1, options["users"] + 1)]
+        existing = set(
+            User.objects.filter(username__in=usernames).values_list(
+                "username", flat=True
+            )
+        )
+        # hashed once, hashing a password per user takes longer than its data
+        password = make_password(options["password"])
+        User.objects.bulk_create(
+            User(username=username, email=f"{username}@example.com", password=password)
+            for username in usernames
+            if username not in existing
+        )
+        users = list(User.objects.filter(username__in=usernames).order_by("pk"))
+        # bulk_create sends no post_save signal to give them their categories
+        Category.objects.create_defaults(
+            user for user in users if user.username not in existing
+        )
+        return users
 
-        for i in range(50):
-            category = random.choice(categories)
-            if category.name in income_categories:
-                transaction_type = TransactionTextChoices.INCOME
-            else:
-                transaction_type = TransactionTextChoices.EXPENSE
-            # TODO: use bulk_create()
-            Transaction.objects.create(
-                note=fake.word(),
-                category=category,
-                user=user,
-                type=transaction_type,
-                amount=random.uniform(10, 2000),
-                date=fake.date_between(start_date="-1y", end_date="today"),
+    def run_tasks(self, tasks, workers):
+        if workers > 1 and connection.vendor == "sqlite":
+            self.stderr.write(
+                self.style.WARNING("SQLite allows a single writer, ignoring --workers.")
             )
-        self.stdout.write(self.style.SUCCESS("Transactions created successfully."))
+            workers = 1
+        if workers == 1:
+            return sum(map(run_generation_task, tasks))
+
+        # the processes open their own connections, the parent's can't be shared
+        connections.close_all()
+        with ProcessPoolExecutor(workers, initializer=django.setup) as executor:
+            return sum(executor.map(run_generation_task, tasks))
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from tracker.cache import bump_statistics_version
+from tracker.models import MonthlyCategoryTotal, Transaction
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly category totals from the transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="emails",
+            metavar="EMAIL",
+            help="Only rebuild the totals of this user. Can be repeated.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of users rebuilt per database transaction.",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("pk")
+        if options["emails"]:
+            users = users.filter(email__in=options["emails"])
+
+        user_ids = list(users.values_list("pk", flat=True))
+        batch_size = options["batch_size"]
+        rows = 0
+        for i in range(0, len(user_ids), batch_size):
+            batch = user_ids[i : i + batch_size]
+            totals = MonthlyCategoryTotal.objects.filter(user__in=batch).rebuild(
+                Transaction.objects.filter(user__in=batch)
+            )
+            rows += len(totals)
+            for user_id in batch:
+                bump_statistics_version(user_id)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows} monthly category totals for {len(user_ids)} users."
+            )
+        )
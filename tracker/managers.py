@@ -1,11 +1,78 @@
-from django.db import models
-from django.db.models import FloatField, Q, Sum
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, DecimalField, F, Q, When, Window
 from django.db.models.functions import TruncMonth
 
 from .choices import TransactionTextChoices
+from .money import MoneySum
+from .periods import get_period_range
+from .search import search_transactions
 
 
-class TransactionQuerySet(models.QuerySet):
+def signed_amount(field):
+    """The amount of ``field``, negative for the expenses."""
+    return Case(
+        When(type=TransactionTextChoices.EXPENSE, then=-F(field)), default=F(field)
+    )
+
+
+class CategoryBreakdownMixin:
+    def get_category_breakdown(self):
+        """
+        Returns the income and expense totals per category, largest first, as
+        ``{"income": [...], "expense": [...]}`` lists of dicts with the
+        ``category_id``, ``category`` name and ``total``.
+
+        Evaluates ``get_category_totals``, a single grouped query, so each
+        name stays paired with its total.
+        """
+        breakdown = {"income": [], "expense": []}
+        for row in self.get_category_totals():
+            key = (
+                "income" if row["type"] == TransactionTextChoices.INCOME else "expense"
+            )
+            breakdown[key].append(
+                {
+                    "category_id": row["category_id"],
+                    "category": row["category__name"],
+                    "total": row["total"],
+                }
+            )
+        return breakdown
+
+
+class CategoryQuerySet(models.QuerySet):
+    def create_defaults(self, users):
+        """
+        Give each user the ``DEFAULT_CATEGORIES`` they do not have yet, in a
+        single query.
+        """
+        self.bulk_create(
+            [
+                self.model(name=name, user=user, type=type)
+                for user in users
+                for name, type in settings.DEFAULT_CATEGORIES
+            ],
+            # skips those already created, by the unique_user_category_per_type
+            ignore_conflicts=True,
+        )
+
+
+class TransactionQuerySet(CategoryBreakdownMixin, models.QuerySet):
+    def in_period(self, year, month=None):
+        """
+        Filter transactions of a year, or of a single month of that year.
+
+        Uses a half-open date range instead of ``date__year``/``date__month``
+        so the ``(user, date)`` indexes can be used.
+        """
+        start, end = get_period_range(year, month)
+        return self.filter(date__gte=start, date__lt=end)
+
+    def search(self, text, rank=False):
+        """Full-text search of the notes and descriptions, see ``tracker.search``."""
+        return search_transactions(self, text, rank=rank)
+
     def get_income(self):
         return self.filter(type=TransactionTextChoices.INCOME)
 
@@ -15,21 +82,39 @@ class TransactionQuerySet(models.QuerySet):
     def get_total_income_and_expense(self):
         """Returns total sum of incomes and expenses"""
         totals = self.aggregate(
-            total_income=Sum(
+            total_income=MoneySum(
                 "amount",
                 filter=Q(type=TransactionTextChoices.INCOME),
-                output_field=FloatField(),
                 default=0,
             ),
-            total_expense=Sum(
+            total_expense=MoneySum(
                 "amount",
                 filter=Q(type=TransactionTextChoices.EXPENSE),
-                output_field=FloatField(),
                 default=0,
             ),
         )
         return totals
 
+    def with_totals(self):
+        """
+        Annotate each transaction with the total incomes and expenses of the
+        whole queryset, computed by window aggregates in the same query.
+
+        The totals are computed before any slicing, so the first page of a
+        list carries the totals of the list.
+        """
+
+        def total(type):
+            amount = Case(
+                When(type=type, then="amount"), default=0, output_field=DecimalField()
+            )
+            return Window(MoneySum(amount))
+
+        return self.annotate(
+            total_income=total(TransactionTextChoices.INCOME),
+            total_expense=total(TransactionTextChoices.EXPENSE),
+        )
+
     def get_net_income(self):
         totals = self.get_total_income_and_expense()
         total_incomes = totals["total_income"]
@@ -40,9 +125,28 @@ class TransactionQuerySet(models.QuerySet):
     def total_balance(self):
         """Returns total sum of transactions balance."""
 
-        return self.aggregate(
-            total=Sum("amount", output_field=FloatField(), default=0)
-        )["total"]
+        return self.aggregate(total=MoneySum("amount", default=0))["total"]
+
+    def get_daily_balances(self):
+        """
+        Returns the incomes less the expenses accumulated from the first day
+        of the queryset to the end of each day with transactions, by date.
+
+        The running sum is a window aggregate over the dates, whose peers are
+        all summed, so a single row is returned per day.
+        """
+
+        return (
+            self.annotate(
+                balance=Window(
+                    MoneySum(signed_amount("amount")),
+                    order_by=F("date").asc(),
+                )
+            )
+            .values_list("date", "balance")
+            .distinct()
+            .order_by("date")
+        )
 
     def get_monthly_totals(self):
         """
@@ -53,17 +157,158 @@ class TransactionQuerySet(models.QuerySet):
             self.annotate(month=TruncMonth("date"))
             .values("month")
             .annotate(
-                total_income=Sum(
+                total_income=MoneySum(
                     "amount",
                     filter=Q(type=TransactionTextChoices.INCOME),
-                    output_field=FloatField(),
                     default=0,
                 ),
-                total_expense=Sum(
+                total_expense=MoneySum(
                     "amount",
                     filter=Q(type=TransactionTextChoices.EXPENSE),
-                    output_field=FloatField(),
                     default=0,
                 ),
             )
         )
+
+    def get_category_totals(self):
+        """
+        Returns total sum per category and type, largest first.
+        """
+
+        return (
+            self.values("type", "category_id", "category__name")
+            .annotate(total=MoneySum("amount"))
+            .order_by("-total", "category__name")
+        )
+
+    def get_monthly_category_totals(self):
+        """
+        Returns total sum and count of transactions per user, month, category
+        and type, in the shape of the ``MonthlyCategoryTotal`` rows.
+        """
+
+        return (
+            self.annotate(month=TruncMonth("date"))
+            .values("user_id", "month", "category_id", "type")
+            .annotate(total=MoneySum("amount"), count=Count("id"))
+            .order_by()
+        )
+
+
+class MonthlyCategoryTotalQuerySet(CategoryBreakdownMixin, models.QuerySet):
+    def in_period(self, year, month=None):
+        start, end = get_period_range(year, month)
+        return self.filter(month__gte=start, month__lt=end)
+
+    def add_transaction(self, instance, sign=1):
+        """
+        Add a transaction to its monthly category total, or remove it when
+        ``sign`` is -1. Totals left without transactions are deleted.
+        """
+        date = self.model._meta.get_field("month").to_python(instance.date)
+        lookup = {
+            "user_id": instance.user_id,
+            "month": date.replace(day=1),
+            "category_id": instance.category_id,
+            "type": instance.type,
+        }
+        changes = {
+            "total": F("total") + instance.amount * sign,
+            "count": F("count") + sign,
+        }
+        with transaction.atomic():
+            updated = self.filter(**lookup).update(**changes)
+            if sign < 0:
+                self.filter(**lookup, count__lte=0).delete()
+            elif not updated:
+                try:
+                    with transaction.atomic():
+                        self.create(**lookup, total=instance.amount, count=1)
+                except IntegrityError:
+                    # created by a concurrent write in the meantime
+                    self.filter(**lookup).update(**changes)
+
+    def rebuild(self, transactions):
+        """
+        Replace the totals of this queryset with the totals aggregated from
+        ``transactions``, which should cover the same users and months.
+
+        The totals of the archived months are kept as they are, since their
+        transactions are no longer all in the table. Transactions added to
+        these months are added to their totals with ``add_transaction``.
+        """
+        # imported here, the archives import the models
+        from .archive import archive_ends, archived_before
+
+        users = self.model._meta.get_field("user").related_model.objects.filter(
+            Q(pk__in=self.values("user_id")) | Q(pk__in=transactions.values("user_id"))
+        )
+        ends = archive_ends(users.values("pk"))
+        transactions = transactions.exclude(archived_before(ends))
+        with transaction.atomic():
+            self.exclude(archived_before(ends, field="month")).delete()
+            return self.bulk_create(
+                [
+                    self.model(**row)
+                    for row in transactions.get_monthly_category_totals()
+                ],
+                batch_size=1000,
+            )
+
+    def get_total_income_and_expense(self):
+        """Returns total sum of incomes and expenses"""
+        return self.aggregate(
+            total_income=MoneySum(
+                "total",
+                filter=Q(type=TransactionTextChoices.INCOME),
+                default=0,
+            ),
+            total_expense=MoneySum(
+                "total",
+                filter=Q(type=TransactionTextChoices.EXPENSE),
+                default=0,
+            ),
+        )
+
+    def total_balance(self):
+        """Returns total sum of transactions balance."""
+
+        return self.aggregate(total=MoneySum("total", default=0))["total"]
+
+    def get_net_income(self):
+        """Returns the incomes less the expenses of the totals."""
+
+        return self.aggregate(net=MoneySum(signed_amount("total"), default=0))["net"]
+
+    def get_monthly_totals(self):
+        """
+        Returns total sum of incomes and expenses per month
+        """
+
+        return (
+            self.values("month")
+            .annotate(
+                total_income=MoneySum(
+                    "total",
+                    filter=Q(type=TransactionTextChoices.INCOME),
+                    default=0,
+                ),
+                total_expense=MoneySum(
+                    "total",
+                    filter=Q(type=TransactionTextChoices.EXPENSE),
+                    default=0,
+                ),
+            )
+            .order_by("month")
+        )
+
+    def get_category_totals(self):
+        """
+        Returns total sum per category and type, largest first.
+        """
+
+        return (
+            self.values("type", "category_id", "category__name")
+            .annotate(total=MoneySum("total"))
+            .order_by("-total", "category__name")
+        )
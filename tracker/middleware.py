@@ -0,0 +1,53 @@
+import time
+
+from .instrumentation import log_record, record_queries
+from .routers import pin_to_primary
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Log the latency and the SQL queries of each request.
+
+    Place it first, so that the queries of the other middleware are counted.
+    The queries of a streaming response run after it returns and are not.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        match = request.resolver_match
+        log_record(
+            "request",
+            match.view_name if match else "unresolved",
+            time.perf_counter() - start,
+            recorder,
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+            streaming=response.streaming,
+        )
+        return response
+
+
+class PrimaryPinMiddleware:
+    """
+    Pin the users of write requests to the default database for a while, so
+    they read their own writes rather than a lagging replica.
+
+    Place it after the authentication middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and request.user.is_authenticated:
+            pin_to_primary(request.user.pk)
+        return response
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_monthly_category_totals(apps, schema_editor):
+    Transaction = apps.get_model("tracker", "Transaction")
+    MonthlyCategoryTotal = apps.get_model("tracker", "MonthlyCategoryTotal")
+    totals = (
+        Transaction.objects.annotate(month=TruncMonth("date"))
+        .values("user_id", "month", "category_id", "type")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    MonthlyCategoryTotal.objects.bulk_create(
+        [MonthlyCategoryTotal(**row) for row in totals], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tracker", "0003_transaction_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyCategoryTotal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(help_text="First day of the month.")),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("INC", "Income"), ("EXP", "Expense")], max_length=3
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_totals",
+                        to="tracker.category",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_totals",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["month"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="monthlycategorytotal",
+            constraint=models.UniqueConstraint(
+                fields=("user", "month", "category", "type"),
+                name="unique_monthly_category_total",
+            ),
+        ),
+        migrations.RunPython(build_monthly_category_totals, migrations.RunPython.noop),
+    ]
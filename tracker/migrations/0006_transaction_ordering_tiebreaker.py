@@ -0,0 +1,16 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tracker", "0005_exportjob"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="transaction",
+            options={"ordering": ["-date", "-id"]},
+        ),
+    ]
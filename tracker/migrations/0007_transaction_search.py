@@ -0,0 +1,77 @@
+from django.db import migrations
+
+FTS_TABLE = "tracker_transaction_fts"
+SEARCH_INDEX_NAME = "transaction_search_idx"
+
+SQLITE_SEARCH_INDEX = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        note, description,
+        content='tracker_transaction', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON tracker_transaction BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, note, description)
+        VALUES (new.id, new.note, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON tracker_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, note, description)
+        VALUES ('delete', old.id, old.note, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF note, description ON tracker_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, note, description)
+        VALUES ('delete', old.id, old.note, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, note, description)
+        VALUES (new.id, new.note, new.description);
+    END
+    """,
+    # index the existing transactions
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for sql in SQLITE_SEARCH_INDEX:
+            schema_editor.execute(sql)
+    elif vendor == "postgresql":
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+
+        schema_editor.add_index(
+            apps.get_model("tracker", "Transaction"),
+            GinIndex(
+                SearchVector("note", "description", config="simple"),
+                name=SEARCH_INDEX_NAME,
+            ),
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for trigger in ("insert", "delete", "update"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tracker", "0006_transaction_ordering_tiebreaker"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
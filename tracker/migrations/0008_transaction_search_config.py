@@ -0,0 +1,56 @@
+from django.db import migrations
+
+SEARCH_CONFIG = "tracker_search"
+SEARCH_INDEX_NAME = "transaction_search_idx"
+
+
+def add_search_index(schema_editor, Transaction, config):
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    schema_editor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}")
+    schema_editor.add_index(
+        Transaction,
+        GinIndex(
+            SearchVector("note", "description", config=config),
+            name=SEARCH_INDEX_NAME,
+        ),
+    )
+
+
+def use_search_config(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'unaccent'")
+        unaccent = cursor.fetchone() is not None
+    schema_editor.execute(
+        f"CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = simple)"
+    )
+    if unaccent:
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        schema_editor.execute(
+            f"ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} "
+            "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple"
+        )
+    add_search_index(
+        schema_editor, apps.get_model("tracker", "Transaction"), SEARCH_CONFIG
+    )
+
+
+def use_simple_config(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}")
+    schema_editor.execute(f"DROP TEXT SEARCH CONFIGURATION IF EXISTS {SEARCH_CONFIG}")
+    add_search_index(schema_editor, apps.get_model("tracker", "Transaction"), "simple")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tracker", "0007_transaction_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(use_search_config, use_simple_config),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import tracker.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tracker", "0008_transaction_search_config"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                (
+                    "end",
+                    models.DateField(
+                        help_text="The transactions of the year before this date are archived."
+                    ),
+                ),
+                ("file", models.FileField(upload_to=tracker.models.archive_path)),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transaction_archives",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-year"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="transactionarchive",
+            constraint=models.UniqueConstraint(
+                fields=("user", "year"), name="unique_user_archive_year"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tracker", "0009_transactionarchive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionSearch",
+            fields=[
+                (
+                    "transaction",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_row",
+                        serialize=False,
+                        to="tracker.transaction",
+                    ),
+                ),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "tracker_transaction_fts",
+                "managed": False,
+            },
+        ),
+    ]
@@ -1,9 +1,13 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 
-from .choices import TransactionTextChoices
-from .managers import TransactionQuerySet
+from .choices import ExportJobStatusChoices, TransactionTextChoices
+from .managers import (
+    CategoryQuerySet,
+    MonthlyCategoryTotalQuerySet,
+    TransactionQuerySet,
+)
 
 
 class Category(models.Model):
@@ -15,6 +19,8 @@ class Category(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Category"
         verbose_name_plural = "Categories"
@@ -51,11 +57,148 @@ class Transaction(models.Model):
                 violation_error_message="Amount cannot be negative.",
             )
         ]
-        ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["user", "date"], name="transaction_user_date_idx"),
+            models.Index(
+                fields=["user", "type", "date"], name="transaction_user_type_date_idx"
+            ),
+        ]
+        ordering = ["-date", "-id"]
 
     def __str__(self):
         return self.note
 
+    def save(self, *args, **kwargs):
+        # the monthly category totals are updated by signals in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     def clean(self):
         if self.amount and self.amount < 0:
             raise ValidationError({"amount": "Amount cannot be negative."})
+
+
+class TransactionSearch(models.Model):
+    """
+    A row of the FTS5 table indexing the transactions on SQLite, to join it
+    to the transactions (see ``tracker.search``).
+    """
+
+    transaction = models.OneToOneField(
+        Transaction,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="search_row",
+    )
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "tracker_transaction_fts"
+
+
+class MonthlyCategoryTotal(models.Model):
+    """
+    Rollup of a user's transactions per month, category and type.
+
+    Kept up to date by the ``Transaction`` signals; writes that bypass them,
+    such as ``bulk_create`` or ``QuerySet.update``, must be followed by a
+    rebuild (see the ``rebuild_rollups`` command).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="monthly_totals",
+    )
+    month = models.DateField(help_text="First day of the month.")
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="monthly_totals"
+    )
+    type = models.CharField(max_length=3, choices=TransactionTextChoices.choices)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    objects = MonthlyCategoryTotalQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month", "category", "type"],
+                name="unique_monthly_category_total",
+            )
+        ]
+        ordering = ["month"]
+
+    def __str__(self):
+        return f"{self.category} ({self.month:%B %Y})"
+
+
+class ExportJob(models.Model):
+    """A transaction export built in the background by a Celery worker."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="export_jobs"
+    )
+    format = models.CharField(max_length=10, default="xlsx")
+    status = models.CharField(
+        max_length=3,
+        choices=ExportJobStatusChoices.choices,
+        default=ExportJobStatusChoices.PENDING,
+    )
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent done.")
+    file = models.FileField(upload_to="exports/%Y/%m/", blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.format.upper()} export of {self.user}"
+
+
+def archive_path(instance, filename):
+    return f"archives/{instance.user_id}/{filename}"
+
+
+class TransactionArchive(models.Model):
+    """
+    A user's transactions of a year moved out of the transaction table, as a
+    gzip compressed file of JSON lines, newest first.
+
+    Written and read by ``tracker.archive``. The monthly category totals of
+    the archived transactions stay in place.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="transaction_archives",
+    )
+    year = models.PositiveSmallIntegerField()
+    end = models.DateField(
+        help_text="The transactions of the year before this date are archived."
+    )
+    file = models.FileField(upload_to=archive_path)
+    count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "year"], name="unique_user_archive_year"
+            )
+        ]
+        ordering = ["-year"]
+
+    def __str__(self):
+        return f"{self.year} archive of {self.user}"
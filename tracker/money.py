@@ -0,0 +1,50 @@
+"""
+Exact sums of the money fields.
+
+The amounts are summed as integer cents, each rounded from the stored value,
+so the sums neither drift with the floats SQLite stores the decimals as nor
+with a cast of the sum to a float. They are read back as ``Decimal`` amounts
+with two decimal places.
+"""
+
+from decimal import Decimal
+
+from django.db.models import BigIntegerField, Func, Sum
+
+
+def to_cents(amount):
+    return int(amount.scaleb(2))
+
+
+def from_cents(cents):
+    return Decimal(int(cents)).scaleb(-2)
+
+
+class CentsField(BigIntegerField):
+    """A number of cents, read as an amount."""
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else from_cents(value)
+
+
+class Cents(Func):
+    """An amount, rounded to integer cents."""
+
+    template = "CAST((%(expressions)s) * 100 AS bigint)"
+    output_field = BigIntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # the decimals are stored as floats, whose cents are only close
+        return super().as_sql(
+            compiler,
+            connection,
+            template="CAST(ROUND((%(expressions)s) * 100) AS integer)",
+            **extra_context,
+        )
+
+
+class MoneySum(Sum):
+    """The exact sum of an amount, as a ``Decimal``."""
+
+    def __init__(self, expression, **extra):
+        super().__init__(Cents(expression), output_field=CentsField(), **extra)
@@ -0,0 +1,55 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date
+
+from django.db.models import Q
+
+
+def encode_cursor(transaction):
+    """Return an opaque cursor of the position after ``transaction``."""
+    value = json.dumps([transaction.date.isoformat(), transaction.pk])
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the ``(date, pk)`` of a cursor, or raise ValueError."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded))
+        return date.fromisoformat(value), int(pk)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor {cursor!r}.") from exc
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def paginate_transactions(queryset, cursor=None, page_size=50):
+    """
+    Return the page of ``queryset`` after ``cursor``, newest first.
+
+    Transactions are ordered by date and id, and a page starts after the last
+    row of the previous one rather than at an offset, so no page needs to
+    scan the rows before it.
+    """
+    queryset = queryset.order_by("-date", "-pk")
+    if cursor:
+        after_date, after_pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(date__lt=after_date) | Q(date=after_date, pk__lt=after_pk)
+        )
+    # one more row tells whether there is a next page
+    object_list = list(queryset[: page_size + 1])
+    next_cursor = None
+    if len(object_list) > page_size:
+        object_list = object_list[:page_size]
+        next_cursor = encode_cursor(object_list[-1])
+    return KeysetPage(object_list, next_cursor)
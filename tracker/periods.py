@@ -0,0 +1,22 @@
+from datetime import date
+
+
+def get_year_range(year):
+    """Return the half-open ``[start, end)`` date range covering a year."""
+    start = date(int(year), 1, 1)
+    return start, date(start.year + 1, 1, 1)
+
+
+def get_month_range(year, month):
+    """Return the half-open ``[start, end)`` date range covering a month."""
+    start = date(int(year), int(month), 1)
+    if start.month == 12:
+        return start, date(start.year + 1, 1, 1)
+    return start, date(start.year, start.month + 1, 1)
+
+
+def get_period_range(year, month=None):
+    """Return the date range of a month, or of the whole year without a month."""
+    if month:
+        return get_month_range(year, month)
+    return get_year_range(year)
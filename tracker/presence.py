@@ -0,0 +1,137 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+# gauges of the open notification websockets and of their users, by window
+CONNECTIONS_KEY = "tracker:presence:connections"
+USERS_KEY = "tracker:presence:users"
+
+
+def _user_key(user_id):
+    return f"tracker:presence:user:{user_id}"
+
+
+def _count_key(user_id, registration):
+    return f"tracker:presence:user:{user_id}:{registration}"
+
+
+def _add(key, delta, timeout):
+    """Add ``delta`` to the counter of ``key`` and return the new count."""
+    if cache.add(key, delta, timeout=timeout):
+        return delta
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # expired since it was added
+        cache.set(key, delta, timeout=timeout)
+        return delta
+
+
+def _window_seconds():
+    # every open connection reports at least once in a window
+    return 2 * settings.PRESENCE_HEARTBEAT_INTERVAL
+
+
+def _window():
+    return int(time.time() // _window_seconds())
+
+
+class Connection:
+    """
+    A notification connection of a user, registered in the cache.
+
+    The open connections of a user are counted in a registration of the user,
+    which expires ``PRESENCE_TIMEOUT`` seconds after the last heartbeat of
+    one of them. The connections still open once it expired, like after a
+    write to the cache was lost, count themselves again in a new registration
+    at their next heartbeat, so the count stays that of the open connections.
+    """
+
+    def __init__(self, user_id, name):
+        self.user_id = user_id
+        # unique among the open connections, like the channel name
+        self.name = name
+        self.registration = None
+
+    def open(self):
+        """Count the connection in the current registration of its user."""
+        key = _user_key(self.user_id)
+        cache.add(key, uuid.uuid4().hex, timeout=settings.PRESENCE_TIMEOUT)
+        registration = cache.get(key)
+        if registration is None:
+            # expired since it was added
+            registration = uuid.uuid4().hex
+            cache.set(key, registration, timeout=settings.PRESENCE_TIMEOUT)
+        count_key = _count_key(self.user_id, registration)
+        _add(count_key, 1, settings.PRESENCE_TIMEOUT)
+        # incrementing a counter does not extend its expiry
+        cache.touch(count_key, settings.PRESENCE_TIMEOUT)
+        self.registration = registration
+        self._report()
+
+    def close(self):
+        """Uncount the connection, the user goes offline with the last one."""
+        key = _user_key(self.user_id)
+        # a connection of an expired registration is not counted anymore
+        if self.registration is not None and cache.get(key) == self.registration:
+            count_key = _count_key(self.user_id, self.registration)
+            try:
+                count = cache.decr(count_key)
+            except ValueError:
+                count = 0
+            if count <= 0:
+                cache.delete_many([key, count_key])
+        self.registration = None
+
+    def heartbeat(self):
+        """
+        Keep the user online while the connection is open.
+
+        A user whose connections all closed without disconnecting, like those
+        of a killed server, goes offline ``PRESENCE_TIMEOUT`` seconds after
+        the last heartbeat.
+        """
+        key = _user_key(self.user_id)
+        if (
+            self.registration is not None
+            and cache.get(key) == self.registration
+            and cache.touch(
+                _count_key(self.user_id, self.registration),
+                settings.PRESENCE_TIMEOUT,
+            )
+        ):
+            cache.touch(key, settings.PRESENCE_TIMEOUT)
+            self._report()
+        else:
+            self.open()
+
+    def _report(self):
+        # counted once per window, in the gauges of the window, which expire
+        # on their own rather than being decremented by the disconnections
+        window = _window()
+        timeout = 2 * _window_seconds()
+        if cache.add(f"{CONNECTIONS_KEY}:{window}:{self.name}", 1, timeout):
+            _add(f"{CONNECTIONS_KEY}:{window}", 1, timeout)
+        if cache.add(f"{USERS_KEY}:{window}:{self.user_id}", 1, timeout):
+            _add(f"{USERS_KEY}:{window}", 1, timeout)
+
+
+def online_user_ids(user_ids):
+    """Return the set of the given users with an open connection."""
+    keys = {_user_key(user_id): user_id for user_id in user_ids}
+    return {keys[key] for key in cache.get_many(keys)}
+
+
+def presence_gauges():
+    """
+    Return the number of connections and of users open in the last complete
+    window of two heartbeat intervals.
+    """
+    window = _window() - 1
+    gauges = cache.get_many([f"{CONNECTIONS_KEY}:{window}", f"{USERS_KEY}:{window}"])
+    return {
+        "connections": gauges.get(f"{CONNECTIONS_KEY}:{window}", 0),
+        "users": gauges.get(f"{USERS_KEY}:{window}", 0),
+    }
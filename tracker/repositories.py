@@ -0,0 +1,50 @@
+from functools import cached_property
+
+from .cache import cached_categories, get_category_version
+from .models import Category
+
+
+class CategoryRepository:
+    """
+    The categories of a user, read at most once from the category cache.
+
+    Get the repository of a request with ``for_request`` to share it between
+    the forms and filters of the request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @classmethod
+    def for_request(cls, request):
+        repository = getattr(request, "_category_repository", None)
+        if repository is None:
+            repository = request._category_repository = cls(request.user)
+        return repository
+
+    @cached_property
+    def categories(self):
+        if self.user is None or not self.user.is_authenticated:
+            return []
+        version = get_category_version(self.user.pk)
+        categories = [
+            # the values in the order of the model fields
+            Category.from_db(
+                None,
+                ["id", "name", "user_id", "type"],
+                [category["id"], category["name"], self.user.pk, type],
+            )
+            for type, by_type in cached_categories(self.user.pk, version).items()
+            for category in by_type
+        ]
+        return sorted(categories, key=lambda category: category.name)
+
+    def of_type(self, type):
+        return [category for category in self.categories if category.type == type]
+
+    def exists(self, name, type, exclude=None):
+        """Return whether the user has another category of this name and type."""
+        return any(
+            category.name == name and category.type == type and category.pk != exclude
+            for category in self.categories
+        )
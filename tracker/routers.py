@@ -0,0 +1,66 @@
+"""
+Reads of the analytics views from the read replicas of the database.
+
+The reads of a ``read_from`` block go to the given database, all the other
+reads and every write to the default one. A user who just wrote is pinned to
+the default database for ``DATABASE_REPLICA_PIN_SECONDS``, so they read their
+own writes before the replicas catch up.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_KEY = "tracker:primary-pin:user:{}"
+
+_read_database = ContextVar("read_database", default=None)
+
+
+def pin_to_primary(user_id):
+    if settings.DATABASE_REPLICAS:
+        cache.set(PIN_KEY.format(user_id), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id):
+    return cache.get(PIN_KEY.format(user_id), False)
+
+
+def read_database_for(user):
+    """Return a replica for the reads of ``user``, or the default database."""
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas or is_pinned_to_primary(user.pk):
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+@contextmanager
+def read_from(database):
+    token = _read_database.set(database)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter:
+    """Route the reads of the tracker models in a ``read_from`` block."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == "tracker":
+            return _read_database.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # not the database of an instance read from a replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same rows as the default database
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
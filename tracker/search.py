@@ -0,0 +1,164 @@
+"""
+Full-text search over the note and description of the transactions.
+
+On SQLite the text is indexed by an FTS5 table kept in sync with the
+transactions by triggers, so raw inserts like those of the importer and the
+generator are indexed too. On PostgreSQL it is a GIN index of their tsvector,
+in a text search configuration ignoring the accents where the ``unaccent``
+extension is available.
+
+SQLite drops the triggers of a table it rebuilds, like for a migration
+altering a field of the transactions, so they are created again after every
+``migrate`` by ``restore_sqlite_search_triggers``. The migrations hold their
+own copy of the SQL, so that changes to this module don't change them.
+"""
+
+import re
+
+from django.db import connections, transaction
+from django.db.models import BooleanField, F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "tracker_transaction_fts"
+SEARCH_CONFIG = "tracker_search"
+
+
+SQLITE_SEARCH_TRIGGERS = {
+    f"{FTS_TABLE}_insert": f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON tracker_transaction BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, note, description)
+        VALUES (new.id, new.note, new.description);
+    END
+    """,
+    f"{FTS_TABLE}_delete": f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON tracker_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, note, description)
+        VALUES ('delete', old.id, old.note, old.description);
+    END
+    """,
+    f"{FTS_TABLE}_update": f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF note, description ON tracker_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, note, description)
+        VALUES ('delete', old.id, old.note, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, note, description)
+        VALUES (new.id, new.note, new.description);
+    END
+    """,
+}
+
+
+def restore_sqlite_search_triggers(using):
+    """
+    Create the missing triggers of the FTS5 table on a SQLite database, and
+    index again the transactions written without them.
+
+    Return the names of the triggers created.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return []
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master WHERE name = %s OR tbl_name = %s",
+            [FTS_TABLE, "tracker_transaction"],
+        )
+        names = {name for kind, name in cursor.fetchall() if kind != "index"}
+        if FTS_TABLE not in names:
+            # before the 0007_transaction_search migration
+            return []
+        missing = [name for name in SQLITE_SEARCH_TRIGGERS if name not in names]
+        for name in missing:
+            cursor.execute(SQLITE_SEARCH_TRIGGERS[name])
+        if missing:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return missing
+
+
+def connect_sqlite_search_index(connection):
+    """
+    Connect the FTS5 table to a new SQLite connection.
+
+    The first statement of a connection using the table reads its
+    configuration, and inside a write transaction that read makes SQLite fail
+    with "database is locked" rather than wait for a concurrent writer.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+        if cursor.fetchone() is not None:
+            cursor.execute(f"SELECT 1 FROM {FTS_TABLE} LIMIT 0")
+
+
+def search_vector(config=SEARCH_CONFIG):
+    # needs psycopg, only imported on PostgreSQL
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector("note", "description", config=config)
+
+
+def search_terms(text):
+    """Return the words of a search, each matched as a prefix."""
+    return re.findall(r"\w+", text)
+
+
+def search_transactions(queryset, text, rank=False):
+    """
+    Filter ``queryset`` to the transactions whose note or description has
+    words starting with every word of ``text``.
+
+    With ``rank``, the transactions are annotated with their ``search_rank``,
+    higher for better matches, and ordered by it.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        if rank:
+            # a join, so the index is searched once for all the transactions
+            # rather than once per transaction for its rank
+            return (
+                queryset.filter(search_row__isnull=False)
+                .filter(
+                    RawSQL(
+                        f"{FTS_TABLE} MATCH %s", [match], output_field=BooleanField()
+                    )
+                )
+                .annotate(search_rank=-F("search_row__rank"))
+                .order_by("-search_rank", "-date", "-pk")
+            )
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+            )
+        )
+
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            search_type="raw",
+            config=SEARCH_CONFIG,
+        )
+        # the expression of the GIN index
+        queryset = queryset.annotate(search_vector=search_vector()).filter(
+            search_vector=query
+        )
+        search_rank = SearchRank(search_vector(), query)
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= Q(note__icontains=term) | Q(description__icontains=term)
+        queryset = queryset.filter(condition)
+        search_rank = Value(0.0, output_field=FloatField())
+
+    if rank:
+        queryset = queryset.annotate(search_rank=search_rank).order_by(
+            "-search_rank", "-date", "-pk"
+        )
+    return queryset
@@ -1,9 +1,16 @@
+from celery.signals import task_postrun, task_prerun
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
 from django.dispatch import receiver
 
-from .choices import TransactionTextChoices
-from .models import Category
+from . import analytics
+from .cache import bump_category_version, bump_statistics_version
+from .instrumentation import finish_task_recording, start_task_recording
+from .models import Category, MonthlyCategoryTotal, Transaction, TransactionArchive
+from .search import restore_sqlite_search_triggers
+from .sqlite import tune_connection
 
 
 @receiver(post_save, sender=get_user_model())
@@ -12,23 +19,106 @@ def create_default_categories_for_user(sender, instance, created, **kwargs):
     Create default categories for new registered user
     """
     if created:
-        # income categories
-        Category.objects.create(
-            name="Salary", user=instance, type=TransactionTextChoices.INCOME
-        )
-        Category.objects.create(
-            name="Parents", user=instance, type=TransactionTextChoices.INCOME
-        )
-        Category.objects.create(
-            name="Investment", user=instance, type=TransactionTextChoices.INCOME
-        )
-        # expense categories
-        Category.objects.create(
-            name="Foods", user=instance, type=TransactionTextChoices.EXPENSE
-        )
-        Category.objects.create(
-            name="Rent", user=instance, type=TransactionTextChoices.EXPENSE
-        )
-        Category.objects.create(
-            name="Groceries", user=instance, type=TransactionTextChoices.EXPENSE
-        )
+        Category.objects.create_defaults([instance])
+        # bulk_create sends no post_save signal to invalidate the categories
+        bump_category_version(instance.pk)
+
+
+@receiver(pre_save, sender=Transaction)
+def store_previous_transaction(sender, instance, raw, **kwargs):
+    """
+    Keep the stored state of an updated transaction to move it out of its
+    previous monthly category total.
+    """
+    instance._previous_state = None
+    if not raw and instance.pk is not None:
+        instance._previous_state = Transaction.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Transaction)
+def update_monthly_category_totals(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_state", None)
+    with transaction.atomic():
+        if previous is not None:
+            MonthlyCategoryTotal.objects.add_transaction(previous, sign=-1)
+        MonthlyCategoryTotal.objects.add_transaction(instance)
+
+
+@receiver(post_delete, sender=Transaction)
+def remove_from_monthly_category_totals(sender, instance, origin=None, **kwargs):
+    # totals of a deleted category or user are removed by the cascade itself
+    if isinstance(origin, (Category, get_user_model())):
+        return
+    MonthlyCategoryTotal.objects.add_transaction(instance, sign=-1)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_statistics_cache(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    user_id = instance.user_id
+    bump_statistics_version(user_id)
+    # bump again once committed, so statistics computed by other requests
+    # before the commit are not served for the new version
+    transaction.on_commit(lambda: bump_statistics_version(user_id))
+
+
+@receiver(post_save, sender=Transaction)
+def add_to_analytics(sender, instance, raw, **kwargs):
+    # after invalidate_statistics_cache, which bumps the version it checks
+    if not raw and analytics.is_enabled():
+        analytics.record_save(instance)
+
+
+@receiver(post_delete, sender=Transaction)
+def remove_from_analytics(sender, instance, **kwargs):
+    if analytics.is_enabled():
+        analytics.record_delete(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    user_id = instance.user_id
+    bump_category_version(user_id)
+    transaction.on_commit(lambda: bump_category_version(user_id))
+
+
+@receiver(post_delete, sender=TransactionArchive)
+def delete_archive_file(sender, instance, **kwargs):
+    # only once committed, the deletion of the row may be rolled back
+    name, storage = instance.file.name, instance.file.storage
+    if name:
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+@task_prerun.connect
+def start_task_instrumentation(task_id, task, **kwargs):
+    start_task_recording(task_id)
+
+
+@task_postrun.connect
+def finish_task_instrumentation(task_id, task, state=None, **kwargs):
+    finish_task_recording(task_id, task.name, state)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    tune_connection(connection)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, app_config, using, **kwargs):
+    """
+    Create again the search triggers SQLite dropped with the transaction
+    table, when a migration rebuilt it.
+    """
+    if app_config.name == "tracker":
+        restore_sqlite_search_triggers(using)
@@ -0,0 +1,62 @@
+"""
+Tuning of SQLite for single-node deployments.
+
+With ``SQLITE_TUNING`` set, every new SQLite connection gets the
+``SQLITE_PRAGMAS``, and the ``optimize_sqlite_database`` task keeps the
+statistics of the query planner up to date and returns the free pages of the
+database file to the file system.
+"""
+
+from django.conf import settings
+
+from .search import connect_sqlite_search_index
+
+# PRAGMA auto_vacuum value of a database freeing its pages on incremental_vacuum
+INCREMENTAL_VACUUM = 2
+
+
+def is_tuned(connection):
+    return connection.vendor == "sqlite" and settings.SQLITE_TUNING
+
+
+def apply_pragmas(connection, pragmas):
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def tune_connection(connection):
+    """Apply the ``SQLITE_PRAGMAS`` to a new connection if tuning is enabled."""
+    if is_tuned(connection):
+        apply_pragmas(connection, settings.SQLITE_PRAGMAS)
+        connect_sqlite_search_index(connection)
+
+
+def get_pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def optimize_database(connection, analyze=False, vacuum_pages=None):
+    """
+    Update the statistics of the query planner, with ``PRAGMA optimize`` or
+    a full ``ANALYZE``, and free up to ``vacuum_pages`` unused pages of the
+    database file, all of them by default.
+
+    The free pages are only returned to the file system by a database
+    created, or vacuumed, with ``auto_vacuum = incremental``.
+
+    Return the number of pages freed.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE" if analyze else "PRAGMA optimize")
+    if get_pragma(connection, "auto_vacuum") != INCREMENTAL_VACUUM:
+        return 0
+    free_pages = get_pragma(connection, "freelist_count")
+    # the statement frees a page per step, and a cursor only steps once
+    # through a statement without results, unlike a script
+    connection.connection.executescript(
+        f"PRAGMA incremental_vacuum({vacuum_pages or 0})"
+    )
+    return free_pages - get_pragma(connection, "freelist_count")
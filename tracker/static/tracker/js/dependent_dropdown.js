@@ -3,17 +3,27 @@ const typeField = document.getElementById("id_type");
 const categoryField = document.getElementById("id_category");
 const url = form.getAttribute("data-url");
 
-typeField.addEventListener("change", async function () {
-  let type = typeField.value;
+// the categories of both types, fetched once for the page
+let categoriesByType = null;
 
-  try {
-    const response = await fetch(`${url}?type=${type}`);
+async function loadCategories() {
+  if (categoriesByType === null) {
+    const response = await fetch(`${url}?type=all`);
 
     if (!response.ok) {
       throw new Error(`Response status: ${response.status}`);
     }
 
-    const data = await response.json();
+    categoriesByType = await response.json();
+  }
+  return categoriesByType;
+}
+
+typeField.addEventListener("change", async function () {
+  let type = typeField.value;
+
+  try {
+    const data = (await loadCategories())[type] || [];
     categoryField.innerHTML = '<option value="">Select Category</option>';
     data.forEach((item) => {
       const option = document.createElement("option");
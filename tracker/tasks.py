@@ -1,14 +1,186 @@
+import logging
+import tempfile
+import time
+from itertools import islice
+
+from asgiref.sync import async_to_sync
 from celery import shared_task
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
 
-from .consumers import notify_user
+from .archive import archive_horizon, archive_transactions, archived_transactions
+from .choices import ExportJobStatusChoices
+from .consumers import notify_user, notify_users
+from .exports import EXPORT_FIELDS, export_rows
+from .models import ExportJob, Transaction, TransactionArchive
+from .presence import online_user_ids
+from .sqlite import is_tuned, optimize_database
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# minimum progress, in percent, between two progress notifications
+EXPORT_PROGRESS_STEP = 10
+
+
+DAILY_NOTIFICATION_MESSAGE = "Have you recorded your transactions today?"
 
 
 @shared_task
 def send_daily_notifications():
-    users = User.objects.all()
-    for user in users:
-        message = "Have you recorded your transactions today?"
-        notify_user(user_id=user.id, message=message)
+    """
+    Remind the active users to record their transactions.
+
+    The user ids are streamed and split into batches of
+    ``NOTIFICATION_BATCH_SIZE``, each sent by a ``send_notification_batch``
+    task, so the notifications are spread over the workers.
+    """
+    start = time.perf_counter()
+    user_ids = (
+        User.objects.filter(is_active=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .iterator(chunk_size=settings.NOTIFICATION_BATCH_SIZE)
+    )
+    users = batches = 0
+    while batch := list(islice(user_ids, settings.NOTIFICATION_BATCH_SIZE)):
+        send_notification_batch.delay(batch, DAILY_NOTIFICATION_MESSAGE)
+        users += len(batch)
+        batches += 1
+
+    result = {
+        "users": users,
+        "batches": batches,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    logger.info(f"Daily notifications queued for {users} users in {batches} batches")
+    return result
+
+
+@shared_task
+def send_notification_batch(user_ids, message):
+    """
+    Send a notification to the connected users, concurrently in one event loop.
+
+    Users without an open notification connection are skipped, nobody would
+    receive their notification.
+    """
+    start = time.perf_counter()
+    connected = online_user_ids(user_ids)
+    online = [user_id for user_id in user_ids if user_id in connected]
+    sent, failed = async_to_sync(notify_users)(
+        online, message, settings.NOTIFICATION_CONCURRENCY
+    )
+    result = {
+        "sent": sent,
+        "failed": failed,
+        "skipped": len(user_ids) - len(online),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    if failed:
+        logger.warning(f"{failed} of {len(user_ids)} notifications failed")
+    logger.info(f"Sent {sent} notifications in {result['duration_ms']}ms")
+    return result
+
+
+def _notify_export_progress(job, message):
+    export = {"id": job.pk, "status": job.status, "progress": job.progress}
+    if job.status == ExportJobStatusChoices.DONE:
+        export["download_url"] = reverse(
+            "tracker:export_job_download", kwargs={"pk": job.pk}
+        )
+    notify_user(user_id=job.user_id, message=message, export=export)
+
+
+@shared_task
+def export_transactions_xlsx(job_id):
+    """
+    Write the user's transactions to an XLSX file of the export job.
+
+    The workbook is written in openpyxl's write-only mode from streamed rows,
+    so memory use does not grow with the number of transactions. Progress is
+    pushed to the user over the notifications websocket.
+    """
+    job = ExportJob.objects.get(pk=job_id)
+    job.status = ExportJobStatusChoices.RUNNING
+    job.save(update_fields=["status"])
+
+    try:
+        queryset = Transaction.objects.filter(user_id=job.user_id)
+        archives = TransactionArchive.objects.filter(user_id=job.user_id)
+        total = queryset.count() + sum(archives.values_list("count", flat=True))
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Transactions")
+        sheet.append(list(EXPORT_FIELDS))
+        for count, row in enumerate(
+            export_rows(queryset, archived_transactions(job.user_id)), 1
+        ):
+            sheet.append(row)
+            progress = count * 100 // total
+            if progress >= job.progress + EXPORT_PROGRESS_STEP and progress < 100:
+                job.progress = progress
+                job.save(update_fields=["progress"])
+                _notify_export_progress(job, f"Export {progress}% done.")
+
+        with tempfile.TemporaryFile() as file:
+            workbook.save(file)
+            file.seek(0)
+            filename = f"Transaction-{timezone.localdate()}.xlsx"
+            job.file.save(filename, File(file), save=False)
+    except Exception as exc:
+        logger.exception(f"Export job {job.pk} failed")
+        job.status = ExportJobStatusChoices.FAILED
+        job.error = str(exc)
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at"])
+        _notify_export_progress(job, "Your export failed.")
+        raise
+
+    job.status = ExportJobStatusChoices.DONE
+    job.progress = 100
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file", "status", "progress", "finished_at"])
+    _notify_export_progress(job, "Your export is ready to download.")
+
+
+@shared_task
+def optimize_sqlite_database(analyze=False):
+    """
+    Maintain a tuned SQLite database: update the statistics of the query
+    planner, with a full ``ANALYZE`` if ``analyze`` is set, and free its
+    unused pages.
+    """
+    if not is_tuned(connection):
+        return {"skipped": True}
+    start = time.perf_counter()
+    freed_pages = optimize_database(connection, analyze=analyze)
+    result = {
+        "analyzed": analyze,
+        "freed_pages": freed_pages,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    logger.info(f"Optimized the SQLite database in {result['duration_ms']}ms")
+    return result
+
+
+@shared_task
+def archive_old_transactions():
+    """
+    Move the transactions older than ``TRANSACTION_ARCHIVE_AFTER_MONTHS`` of
+    every user to their archives.
+    """
+    before = archive_horizon()
+    user_ids = (
+        Transaction.objects.filter(date__lt=before)
+        .order_by()
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+    archived = sum(archive_transactions(user_id, before) for user_id in user_ids)
+    logger.info(f"Archived {archived} transactions dated before {before}")
+    return archived
@@ -0,0 +1,155 @@
+from datetime import date
+from decimal import Decimal
+from unittest import skipIf
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from tracker import analytics
+from tracker.balances import get_daily_balances
+from tracker.cache import bump_statistics_version
+from tracker.choices import TransactionTextChoices
+from tracker.models import Category, MonthlyCategoryTotal, Transaction
+from tracker.tests.factories import TransactionFactory
+from tracker.views import TransactionTotalStatisticsView
+from users.factories import UserFactory
+
+INCOME = TransactionTextChoices.INCOME
+EXPENSE = TransactionTextChoices.EXPENSE
+
+
+@skipIf(analytics.np is None, "numpy is not installed")
+@override_settings(ANALYTICS_ENGINE=True)
+class AnalyticsEngineTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        analytics.engine.clear()
+        self.user = UserFactory()
+        self.salary = Category.objects.get(user=self.user, name="Salary")
+        self.foods = Category.objects.get(user=self.user, name="Foods")
+        self.rent = Category.objects.get(user=self.user, name="Rent")
+        # 2024-01-01 was a Monday
+        self.create_transaction(self.salary, "1000.10", date(2024, 1, 1))
+        self.create_transaction(self.foods, "20.25", date(2024, 1, 1))
+        self.create_transaction(self.foods, "30.50", date(2024, 1, 3))
+        self.create_transaction(self.rent, "400", date(2024, 2, 10))
+        self.create_transaction(self.salary, "50", date(2023, 12, 31))
+        TransactionFactory(date=date(2024, 1, 1))
+
+    def tearDown(self):
+        analytics.engine.clear()
+
+    def create_transaction(self, category, amount, day):
+        return TransactionFactory(
+            user=self.user,
+            category=category,
+            type=category.type,
+            amount=Decimal(amount),
+            date=day,
+        )
+
+    def test_statistics_match_the_monthly_totals(self):
+        columns = analytics.get_columns(self.user.pk)
+        for year, month in ((2024, None), (2024, 1), (2023, None), (2022, None)):
+            with self.subTest(year=year, month=month):
+                totals = MonthlyCategoryTotal.objects.filter(user=self.user).in_period(
+                    year, month
+                )
+                period = columns.in_period(year, month)
+                self.assertEqual(
+                    period.get_category_breakdown(), totals.get_category_breakdown()
+                )
+                self.assertEqual(
+                    period.get_total_income_and_expense(),
+                    totals.get_total_income_and_expense(),
+                )
+                self.assertEqual(period.total_balance(), totals.total_balance())
+                self.assertEqual(
+                    period.get_monthly_totals(), list(totals.get_monthly_totals())
+                )
+        self.assertEqual(
+            columns.get_daily_balances(date(2024, 1, 1), date(2024, 3, 1)),
+            get_daily_balances(self.user.pk, date(2024, 1, 1), date(2024, 3, 1)),
+        )
+
+    def test_group_sums(self):
+        columns = analytics.get_columns(self.user.pk)
+        self.assertEqual(
+            columns.group_sums("weekday", "type"),
+            {
+                (0, INCOME): 100010,
+                (0, EXPENSE): 2025,
+                (2, EXPENSE): 3050,
+                (5, EXPENSE): 40000,
+                (6, INCOME): 5000,
+            },
+        )
+        self.assertEqual(
+            columns.in_period(2024, 1).group_sums("category"),
+            {(self.salary.pk,): 100010, (self.foods.pk,): 5075},
+        )
+        self.assertEqual(columns.in_period(2020).group_sums("day"), {})
+
+    def test_loaded_once(self):
+        analytics.get_columns(self.user.pk)
+        with self.assertNumQueries(0):
+            analytics.get_columns(self.user.pk)
+
+    def test_writes_update_the_columns(self):
+        analytics.get_columns(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction = self.create_transaction(self.foods, "5", date(2024, 1, 3))
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.amount = Decimal("7.5")
+            transaction.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.get(user=self.user, amount=400).delete()
+
+        with self.assertNumQueries(0):
+            columns = analytics.get_columns(self.user.pk)
+        self.assertEqual(len(columns), 5)
+        self.assertEqual(
+            columns.in_period(2024).group_sums("type"),
+            {(INCOME,): 100010, (EXPENSE,): 5825},
+        )
+
+    def test_writes_not_seen_load_the_columns_again(self):
+        analytics.get_columns(self.user.pk)
+        # like a write of another process
+        Transaction.objects.filter(user=self.user).update(amount=1)
+        bump_statistics_version(self.user.pk)
+
+        columns = analytics.get_columns(self.user.pk)
+        self.assertEqual(columns.group_sums(), {(): 500})
+
+    @override_settings(ANALYTICS_MEMORY_BUDGET=200)
+    def test_least_recently_used_evicted(self):
+        other = UserFactory()
+        TransactionFactory.create_batch(5, user=other)
+        analytics.get_columns(self.user.pk)
+        analytics.get_columns(other.pk)
+        self.assertNotIn(self.user.pk, analytics.engine)
+        self.assertIn(other.pk, analytics.engine)
+
+    def test_total_statistics_view(self):
+        request = RequestFactory().get("/?year=2024")
+        request.user = self.user
+        view = TransactionTotalStatisticsView()
+        view.setup(request)
+        statistics = view.get_statistics(2024)
+
+        with self.settings(ANALYTICS_ENGINE=False):
+            self.assertEqual(view.get_statistics(2024), statistics)
+
+    def test_cached_statistics_do_not_load_the_columns(self):
+        self.client.login(email=self.user.email, password="testpassword")
+        for name in ("transaction_statistics", "transaction_total_statistics"):
+            with self.subTest(name=name):
+                url = reverse(f"tracker:{name}")
+                self.client.get(url, {"year": 2024, "month": 1})
+                analytics.engine.clear()
+
+                response = self.client.get(url, {"year": 2024, "month": 1})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn(self.user.pk, analytics.engine)
@@ -0,0 +1,201 @@
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tracker.archive import (
+    archive_horizon,
+    archive_transactions,
+    archived_transactions,
+)
+from tracker.choices import TransactionTextChoices
+from tracker.exports import stream_csv
+from tracker.models import (
+    Category,
+    MonthlyCategoryTotal,
+    Transaction,
+    TransactionArchive,
+)
+from tracker.tasks import archive_old_transactions
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+EXPENSE = TransactionTextChoices.EXPENSE
+PASSWORD = "testpassword"
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ArchiveTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.foods = Category.objects.get(user=self.user, name="Foods")
+        self.rent = Category.objects.get(user=self.user, name="Rent")
+        for day in (date(2022, 3, 5), date(2022, 11, 20), date(2023, 2, 1)):
+            TransactionFactory(
+                user=self.user, category=self.foods, type=EXPENSE, date=day
+            )
+        TransactionFactory(
+            user=self.user, category=self.rent, type=EXPENSE, date=date(2023, 6, 1)
+        )
+        self.recent = TransactionFactory(
+            user=self.user, category=self.foods, type=EXPENSE, date=date(2024, 1, 1)
+        )
+
+    def get_totals(self):
+        return list(
+            MonthlyCategoryTotal.objects.filter(user=self.user)
+            .order_by("month", "category__name")
+            .values_list("month", "category__name", "total", "count")
+        )
+
+    def export(self):
+        return "".join(stream_csv(Transaction.objects.filter(user=self.user)))
+
+    def test_archive_horizon(self):
+        with self.settings(TRANSACTION_ARCHIVE_AFTER_MONTHS=24):
+            self.assertEqual(archive_horizon(date(2024, 1, 15)), date(2022, 1, 1))
+        with self.settings(TRANSACTION_ARCHIVE_AFTER_MONTHS=3):
+            self.assertEqual(archive_horizon(date(2024, 2, 29)), date(2023, 11, 1))
+
+    def test_archive_transactions(self):
+        exported = self.export()
+        totals = self.get_totals()
+
+        # archived up to the month of the date
+        self.assertEqual(archive_transactions(self.user.pk, date(2023, 6, 15)), 3)
+
+        self.assertEqual(
+            list(Transaction.objects.filter(user=self.user).values_list("date")),
+            [(date(2024, 1, 1),), (date(2023, 6, 1),)],
+        )
+        archives = TransactionArchive.objects.filter(user=self.user)
+        self.assertEqual(
+            list(archives.values_list("year", "end", "count")),
+            [(2023, date(2023, 6, 1), 1), (2022, date(2023, 1, 1), 2)],
+        )
+        # the totals still cover the archived months
+        self.assertEqual(self.get_totals(), totals)
+
+        archived = list(archived_transactions(self.user.pk))
+        self.assertEqual(
+            [transaction.date for transaction in archived],
+            [date(2023, 2, 1), date(2022, 11, 20), date(2022, 3, 5)],
+        )
+        self.assertEqual(archived[0].category, self.foods)
+        self.assertIsInstance(archived[0].amount, Decimal)
+
+        # the export reads the archives back
+        self.assertEqual(
+            "".join(
+                stream_csv(
+                    Transaction.objects.filter(user=self.user),
+                    archived_transactions(self.user.pk),
+                )
+            ),
+            exported,
+        )
+
+    def test_archive_again_merges_the_year(self):
+        archive_transactions(self.user.pk, date(2023, 1, 1))
+        # backdated into an archived year
+        TransactionFactory(
+            user=self.user, category=self.foods, type=EXPENSE, date=date(2022, 6, 1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(archive_transactions(self.user.pk, date(2024, 1, 1)), 3)
+
+        self.assertEqual(
+            list(
+                TransactionArchive.objects.filter(user=self.user).values_list(
+                    "year", "count"
+                )
+            ),
+            [(2023, 2), (2022, 3)],
+        )
+        self.assertEqual(
+            [transaction.date for transaction in archived_transactions(self.user.pk)],
+            [
+                date(2023, 6, 1),
+                date(2023, 2, 1),
+                date(2022, 11, 20),
+                date(2022, 6, 1),
+                date(2022, 3, 5),
+            ],
+        )
+        self.assertEqual(
+            [
+                transaction.date
+                for transaction in archived_transactions(
+                    self.user.pk, start=date(2022, 6, 1), end=date(2023, 2, 1)
+                )
+            ],
+            [date(2022, 11, 20), date(2022, 6, 1)],
+        )
+
+    def test_transactions_of_deleted_categories_are_left_out(self):
+        archive_transactions(self.user.pk, date(2024, 1, 1))
+        self.rent.delete()
+        self.assertEqual(
+            [
+                transaction.category
+                for transaction in archived_transactions(self.user.pk)
+            ],
+            [self.foods] * 3,
+        )
+
+    def test_delete_archive_deletes_its_file(self):
+        archive_transactions(self.user.pk, date(2024, 1, 1))
+        archive = TransactionArchive.objects.get(user=self.user, year=2022)
+        storage, name = archive.file.storage, archive.file.name
+        self.assertTrue(storage.exists(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            archive.delete()
+        self.assertFalse(storage.exists(name))
+
+    def test_export_view_includes_archived_transactions(self):
+        exported = self.export()
+        archive_transactions(self.user.pk, date(2024, 1, 1))
+        self.client.login(email=self.user.email, password=PASSWORD)
+        response = self.client.get(
+            reverse("tracker:transaction_export"), {"format": "csv"}
+        )
+        self.assertEqual(b"".join(response.streaming_content).decode(), exported)
+
+    def test_rebuild_rollups_keeps_archived_totals(self):
+        totals = self.get_totals()
+        archive_transactions(self.user.pk, date(2024, 1, 1))
+        call_command("rebuild_rollups", stdout=StringIO())
+        self.assertEqual(self.get_totals(), totals)
+
+    def test_archive_transactions_command(self):
+        other = UserFactory()
+        TransactionFactory(user=other, date=date(2022, 1, 1))
+
+        out = StringIO()
+        call_command(
+            "archive_transactions",
+            "--before=2023-01-31",
+            f"--user={self.user.email}",
+            stdout=out,
+        )
+        self.assertIn(
+            "Archived 2 transactions dated before 2023-01-01 for 1 users.",
+            out.getvalue(),
+        )
+        self.assertFalse(TransactionArchive.objects.filter(user=other).exists())
+
+    @override_settings(TRANSACTION_ARCHIVE_AFTER_MONTHS=0)
+    def test_archive_old_transactions_task(self):
+        self.assertEqual(archive_old_transactions(), 5)
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
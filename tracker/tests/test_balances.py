@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+from datetime import date
+
+from django.test import TestCase, override_settings
+
+from tracker.archive import archive_transactions
+from tracker.balances import get_daily_balances
+from tracker.choices import TransactionTextChoices
+from tracker.models import Category
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+INCOME = TransactionTextChoices.INCOME
+EXPENSE = TransactionTextChoices.EXPENSE
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class DailyBalancesTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.salary = Category.objects.get(user=self.user, name="Salary")
+        self.foods = Category.objects.get(user=self.user, name="Foods")
+        # before the range, only read from the monthly totals
+        self.create_transaction(INCOME, 1000, date(2023, 12, 31))
+        self.create_transaction(EXPENSE, 100, date(2023, 11, 2))
+        self.create_transaction(INCOME, 500, date(2024, 1, 2))
+        self.create_transaction(EXPENSE, 20, date(2024, 1, 2))
+        self.create_transaction(EXPENSE, 30, date(2024, 1, 4))
+        # after the range
+        self.create_transaction(EXPENSE, 70, date(2024, 1, 6))
+        # of another user
+        TransactionFactory(type=INCOME, amount=5, date=date(2024, 1, 3))
+
+    def create_transaction(self, type, amount, day):
+        category = self.salary if type == INCOME else self.foods
+        return TransactionFactory(
+            user=self.user, category=category, type=type, amount=amount, date=day
+        )
+
+    def test_daily_balances(self):
+        self.assertEqual(
+            get_daily_balances(self.user.pk, date(2024, 1, 1), date(2024, 1, 6)),
+            [
+                (date(2024, 1, 1), 900),
+                (date(2024, 1, 2), 1380),
+                (date(2024, 1, 3), 1380),
+                (date(2024, 1, 4), 1350),
+                (date(2024, 1, 5), 1350),
+            ],
+        )
+
+    def test_queries_do_not_depend_on_the_history(self):
+        TransactionFactory.create_batch(
+            20, user=self.user, category=self.salary, date=date(2022, 5, 1)
+        )
+        # opening balance, running sums, archives and their categories
+        with self.assertNumQueries(4):
+            get_daily_balances(self.user.pk, date(2024, 1, 1), date(2025, 1, 1))
+
+    def test_daily_balances_of_archived_transactions(self):
+        expected = get_daily_balances(self.user.pk, date(2024, 1, 1), date(2024, 2, 1))
+        archive_transactions(self.user.pk, date(2024, 2, 1))
+        self.assertEqual(
+            get_daily_balances(self.user.pk, date(2024, 1, 1), date(2024, 2, 1)),
+            expected,
+        )
@@ -0,0 +1,55 @@
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, tag
+
+from tracker.benchmarks import SCENARIOS, compare
+
+
+class CompareTest(SimpleTestCase):
+    def setUp(self):
+        self.baseline = [
+            {"name": "view", "rows": 10, "seconds": 1.0, "queries": 3},
+            {"name": "view", "rows": 100, "seconds": 2.0, "queries": 3},
+            {"name": "fast", "rows": 10, "seconds": 0.001, "queries": 1},
+        ]
+
+    def test_no_regression(self):
+        results = [
+            {"name": "view", "rows": 10, "seconds": 1.1, "queries": 2},
+            {"name": "fast", "rows": 10, "seconds": 0.005, "queries": 1},
+            {"name": "new", "rows": 10, "seconds": 9.0, "queries": 9},
+        ]
+        self.assertEqual(compare(results, self.baseline, 0.2), [])
+
+    def test_regressions(self):
+        results = [
+            {"name": "view", "rows": 10, "seconds": 1.5, "queries": 3},
+            {"name": "view", "rows": 100, "seconds": 2.0, "queries": 4},
+        ]
+        self.assertEqual(
+            compare(results, self.baseline, 0.2),
+            [
+                "view (10 rows): seconds 1.0 -> 1.5",
+                "view (100 rows): queries 3 -> 4",
+            ],
+        )
+
+
+@tag("benchmark")
+class BenchmarkScenariosTest(TestCase):
+    """Run every scenario on a small dataset."""
+
+    def test_scenarios(self):
+        for name, scenario in SCENARIOS.items():
+            with self.subTest(scenario=name), transaction.atomic():
+                results = scenario({"rows": 20})
+                # every scenario seeds its own users
+                transaction.set_rollback(True)
+                if name == "concurrency" and connection.vendor != "sqlite":
+                    # only SQLite is benchmarked
+                    self.assertEqual(results, [])
+                    continue
+                self.assertTrue(results)
+                for result in results:
+                    self.assertEqual(result["rows"], 20)
+                    self.assertIn("seconds", result)
+                    self.assertIn("queries", result)
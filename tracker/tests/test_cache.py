@@ -0,0 +1,135 @@
+import threading
+import time
+from datetime import date
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from tracker.cache import (
+    bump_statistics_version,
+    cached_statistics,
+    get_statistics_version,
+)
+from tracker.checks import check_shared_cache
+from tracker.choices import TransactionTextChoices
+from tracker.models import Category
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+INCOME = TransactionTextChoices.INCOME
+PASSWORD = "testpassword"
+
+
+class StatisticsCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+
+    def test_cached_statistics_reuses_value(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(cached_statistics(self.user.pk, ("totals",), compute), 1)
+        self.assertEqual(cached_statistics(self.user.pk, ("totals",), compute), 1)
+        self.assertEqual(len(calls), 1)
+
+    def test_bump_version_invalidates(self):
+        cached_statistics(self.user.pk, ("totals",), lambda: "old")
+        bump_statistics_version(self.user.pk)
+        value = cached_statistics(self.user.pk, ("totals",), lambda: "new")
+        self.assertEqual(value, "new")
+
+    def test_bump_version_after_eviction(self):
+        version = get_statistics_version(self.user.pk)
+        cache.clear()
+        bump_statistics_version(self.user.pk)
+        self.assertNotEqual(get_statistics_version(self.user.pk), version)
+
+    def test_transaction_and_category_writes_bump_version(self):
+        version = get_statistics_version(self.user.pk)
+        transaction = TransactionFactory(user=self.user)
+        self.assertNotEqual(get_statistics_version(self.user.pk), version)
+
+        version = get_statistics_version(self.user.pk)
+        transaction.delete()
+        self.assertNotEqual(get_statistics_version(self.user.pk), version)
+
+        version = get_statistics_version(self.user.pk)
+        Category.objects.create(name="Bonus", user=self.user, type=INCOME)
+        self.assertNotEqual(get_statistics_version(self.user.pk), version)
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        def worker():
+            results.append(cached_statistics(self.user.pk, ("slow",), compute))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+
+
+class TransactionListViewCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.client.login(email=self.user.email, password=PASSWORD)
+        self.category = Category.objects.get(user=self.user, name="Salary")
+        self.url = reverse("tracker:transaction_list") + "?year=2024&month=5"
+
+    def test_totals_follow_writes(self):
+        TransactionFactory(
+            user=self.user,
+            category=self.category,
+            type=INCOME,
+            amount=100,
+            date=date(2024, 5, 1),
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["total_incomes"], 100)
+
+        # served from the cache
+        with self.assertNumQueries(0):
+            cached_statistics(self.user.pk, ("totals", 2024, 5), list)
+
+        TransactionFactory(
+            user=self.user,
+            category=self.category,
+            type=INCOME,
+            amount=50,
+            date=date(2024, 5, 2),
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["total_incomes"], 150)
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    def test_per_process_cache_is_reported(self):
+        errors = check_shared_cache(None)
+        self.assertEqual([error.id for error in errors], ["tracker.W001"])
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://127.0.0.1:6379/2",
+            }
+        }
+    )
+    def test_shared_cache_is_not_reported(self):
+        self.assertEqual(check_shared_cache(None), [])
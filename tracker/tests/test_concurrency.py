@@ -0,0 +1,69 @@
+import threading
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection, connections, transaction
+from django.test import TransactionTestCase
+
+from tracker.choices import TransactionTextChoices
+from tracker.models import Category, MonthlyCategoryTotal, Transaction
+from users.factories import UserFactory
+
+EXPENSE = TransactionTextChoices.EXPENSE
+
+
+@skipUnless(connection.vendor == "postgresql", "SQLite has a single writer")
+class ConcurrentWritersTest(TransactionTestCase):
+    def create_transaction(self, user, amount="10.00"):
+        return Transaction.objects.create(
+            user=user,
+            category=Category.objects.get(user=user, name="Foods"),
+            type=EXPENSE,
+            amount=Decimal(amount),
+            date=date(2024, 1, 15),
+            note="Lunch",
+        )
+
+    def run_writers(self, writers):
+        errors = []
+
+        def run(writer):
+            try:
+                writer()
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=(writer,)) for writer in writers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_writers_do_not_wait_for_each_other(self):
+        users = [UserFactory() for _ in range(4)]
+        barrier = threading.Barrier(len(users), timeout=10)
+
+        def writer(user):
+            def write():
+                with transaction.atomic():
+                    self.create_transaction(user)
+                    # every transaction is still open here, so none of the
+                    # writers waited for another to commit
+                    barrier.wait()
+
+            return write
+
+        self.run_writers([writer(user) for user in users])
+        self.assertEqual(Transaction.objects.count(), len(users))
+
+    def test_concurrent_writes_to_a_monthly_total(self):
+        user = UserFactory()
+        self.run_writers([lambda: self.create_transaction(user)] * 8)
+
+        total = MonthlyCategoryTotal.objects.get(user=user)
+        self.assertEqual(total.count, 8)
+        self.assertEqual(total.total, Decimal("80.00"))
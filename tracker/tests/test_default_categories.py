@@ -0,0 +1,56 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from tracker.models import Category
+from users.factories import UserFactory
+
+
+def category_pairs(user):
+    return set(Category.objects.filter(user=user).values_list("name", "type"))
+
+
+class DefaultCategoriesTest(TestCase):
+    def test_created_on_signup_in_one_query(self):
+        user = UserFactory.build()
+        # the user insert and the categories insert
+        with self.assertNumQueries(2):
+            user.save()
+        self.assertEqual(category_pairs(user), set(settings.DEFAULT_CATEGORIES))
+
+    def test_existing_categories_are_kept(self):
+        user = UserFactory()
+        Category.objects.filter(user=user, name="Rent").delete()
+        Category.objects.create_defaults([user, user])
+        self.assertEqual(category_pairs(user), set(settings.DEFAULT_CATEGORIES))
+
+
+class ApplyDefaultCategoriesCommandTest(TestCase):
+    def test_command(self):
+        users = UserFactory.create_batch(3)
+        Category.objects.filter(user=users[0]).delete()
+        Category.objects.filter(user=users[1], name="Salary").delete()
+        # 6 + 1 missing categories, and the new one for each user
+
+        out = StringIO()
+        with override_settings(
+            DEFAULT_CATEGORIES=[*settings.DEFAULT_CATEGORIES, ("Travel", "EXP")]
+        ):
+            call_command("apply_default_categories", "--batch-size", "2", stdout=out)
+
+        self.assertIn("Created 10 default categories for 3 users.", out.getvalue())
+        for user in users:
+            self.assertEqual(len(category_pairs(user)), 7)
+
+    def test_command_for_one_user(self):
+        users = UserFactory.create_batch(2)
+        Category.objects.all().delete()
+
+        call_command(
+            "apply_default_categories", "--user", users[0].email, stdout=StringIO()
+        )
+
+        self.assertEqual(category_pairs(users[0]), set(settings.DEFAULT_CATEGORIES))
+        self.assertEqual(category_pairs(users[1]), set())
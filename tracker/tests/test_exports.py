@@ -0,0 +1,71 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from tracker.exports import stream_csv, stream_json, stream_ndjson
+from tracker.models import Transaction
+from tracker.resources import TransactionResource
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+PASSWORD = "testpassword"
+
+
+class StreamingExportTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        TransactionFactory.create_batch(3, user=self.user)
+        TransactionFactory(user=self.user, note='Quoted, "note"', description=None)
+        self.queryset = Transaction.objects.filter(user=self.user)
+        self.dataset = TransactionResource().export(
+            self.queryset.select_related("category")
+        )
+
+    def test_stream_csv_matches_resource_export(self):
+        self.assertEqual("".join(stream_csv(self.queryset)), self.dataset.csv)
+
+    def test_stream_json_matches_resource_export(self):
+        content = "".join(stream_json(self.queryset))
+        self.assertEqual(json.loads(content), json.loads(self.dataset.json))
+
+    def test_stream_json_empty(self):
+        content = "".join(stream_json(Transaction.objects.none()))
+        self.assertEqual(json.loads(content), [])
+
+    def test_stream_ndjson(self):
+        lines = "".join(stream_ndjson(self.queryset)).splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines], json.loads(self.dataset.json)
+        )
+
+
+class TransactionExportViewTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        TransactionFactory.create_batch(2, user=self.user)
+        TransactionFactory()
+        self.url = reverse("tracker:transaction_export")
+        self.client.login(email=self.user.email, password=PASSWORD)
+
+    def test_streaming_formats(self):
+        for format, content_type in (
+            ("csv", "text/csv"),
+            ("json", "application/json"),
+            ("ndjson", "application/x-ndjson"),
+        ):
+            with self.subTest(format=format):
+                response = self.client.get(self.url, {"format": format})
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.streaming)
+                self.assertEqual(response["Content-Type"], content_type)
+                self.assertIn(f'.{format}"', response["Content-Disposition"])
+
+    def test_export_only_contains_user_transactions(self):
+        response = self.client.get(self.url, {"format": "ndjson"})
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(len(content.splitlines()), 2)
+
+    def test_unsupported_format(self):
+        response = self.client.get(self.url, {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
@@ -2,7 +2,9 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase
 
 from tracker.choices import TransactionTextChoices
-from tracker.forms import CategoryForm
+from tracker.forms import CategoryForm, TransactionForm
+from tracker.models import Category
+from tracker.repositories import CategoryRepository
 
 INCOME = TransactionTextChoices.INCOME
 EXPENSE = TransactionTextChoices.EXPENSE
@@ -29,3 +31,55 @@ class CategoryFormTest(TestCase):
         form = CategoryForm(data=form_data)
         self.assertTrue(form.is_valid())
         self.assertEqual(form.cleaned_data["name"], "Salary")
+
+    def test_duplicate_category(self):
+        form = CategoryForm(data={"name": "salary", "type": INCOME}, user=self.user)
+        self.assertFalse(form.is_valid())
+        self.assertIn("already exists", str(form.errors))
+
+        # the category itself is no duplicate
+        salary = Category.objects.get(user=self.user, name="Salary")
+        form = CategoryForm(
+            data={"name": "salary", "type": INCOME}, user=self.user, instance=salary
+        )
+        self.assertTrue(form.is_valid())
+
+
+class TransactionFormTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="john", email="john@example.com", password="lorempass"
+        )
+        self.categories = CategoryRepository(self.user)
+
+    def get_form(self, type, category_name):
+        category = Category.objects.get(user=self.user, name=category_name)
+        data = {
+            "note": "Pay",
+            "type": type,
+            "category": category.pk,
+            "amount": "10",
+            "date": "2024-01-31",
+        }
+        return TransactionForm(data=data, user=self.user, categories=self.categories)
+
+    def test_category_of_type(self):
+        form = self.get_form(INCOME, "Salary")
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["category"].name, "Salary")
+        self.assertEqual(
+            [label for _, label in form.fields["category"].choices],
+            ["---------", "Investment", "Parents", "Salary"],
+        )
+
+    def test_category_of_other_type(self):
+        form = self.get_form(EXPENSE, "Salary")
+        self.assertFalse(form.is_valid())
+        self.assertIn("category", form.errors)
+
+    def test_categories_are_read_once(self):
+        self.get_form(INCOME, "Salary").is_valid()
+        form = self.get_form(EXPENSE, "Rent")
+        # only the category and the amount checks of the model validation
+        with self.assertNumQueries(2):
+            self.assertTrue(form.is_valid())
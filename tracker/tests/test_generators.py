@@ -0,0 +1,83 @@
+import random
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from tracker.generators import CATEGORY_PROFILES, generate_transactions
+from tracker.models import Category, MonthlyCategoryTotal, Transaction
+
+User = get_user_model()
+
+
+def generate(*args):
+    call_command("generate_transactions", *args, stdout=StringIO())
+
+
+class GenerateTransactionsTest(TestCase):
+    def test_generate_transactions(self):
+        rows = list(
+            generate_transactions(
+                1,
+                [(1, "Salary", "INC"), (2, "Foods", "EXP"), (3, "Other", "EXP")],
+                500,
+                random.Random(0),
+                date(2024, 1, 1),
+                date(2024, 1, 31),
+            )
+        )
+
+        self.assertEqual(len(rows), 500)
+        for note, description, category, user, type, amount, day in rows:
+            self.assertEqual(user, 1)
+            self.assertEqual(type, "INC" if category == 1 else "EXP")
+            self.assertGreater(amount, 0)
+            self.assertEqual(amount.as_tuple().exponent, -2)
+            self.assertTrue(date(2024, 1, 1) <= day <= date(2024, 1, 31))
+        # foods are bought far more often than salaries are paid
+        counts = [sum(row[2] == pk for row in rows) for pk in (1, 2, 3)]
+        self.assertGreater(counts[1], counts[0] * 5)
+
+
+class GenerateTransactionsCommandTest(TestCase):
+    def test_command(self):
+        generate("--users", "3", "--transactions", "40", "--batch-size", "15")
+
+        users = User.objects.filter(username__startswith="user")
+        self.assertEqual(users.count(), 3)
+        for user in users:
+            self.assertEqual(Transaction.objects.filter(user=user).count(), 40)
+            self.assertTrue(
+                set(CATEGORY_PROFILES)
+                <= set(
+                    Category.objects.filter(user=user).values_list("name", flat=True)
+                )
+            )
+            self.assertTrue(user.check_password("password"))
+        # the rollups are rebuilt after the inserts
+        self.assertEqual(
+            MonthlyCategoryTotal.objects.aggregate(Sum("count"))["count__sum"], 120
+        )
+
+    def test_existing_users_are_reused(self):
+        generate("--transactions", "5")
+        generate("--transactions", "5")
+
+        self.assertEqual(User.objects.filter(username="user1").count(), 1)
+        self.assertEqual(Transaction.objects.count(), 10)
+
+    def test_seed_is_reproducible(self):
+        generate("--username-prefix", "a", "--seed", "7", "--transactions", "20")
+        generate("--username-prefix", "b", "--seed", "7", "--transactions", "20")
+
+        def rows(username):
+            return list(
+                Transaction.objects.filter(user__username=username)
+                .order_by("pk")
+                .values_list("category__name", "amount", "date")
+            )
+
+        self.assertEqual(rows("a1"), rows("b1"))
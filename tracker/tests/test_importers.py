@@ -0,0 +1,223 @@
+import csv
+import io
+import json
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tracker.archive import archive_transactions
+from tracker.exports import stream_csv
+from tracker.importers import TransactionImporter
+from tracker.models import Category, MonthlyCategoryTotal, Transaction
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+PASSWORD = "testpassword"
+MEDIA_ROOT = tempfile.mkdtemp()
+
+HEADER = "note,description,category,type,amount,date\n"
+
+
+def csv_file(*lines):
+    return io.BytesIO((HEADER + "".join(lines)).encode())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TransactionImporterTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = UserFactory()
+
+    def test_import_csv(self):
+        file = csv_file(
+            "Pay,,Salary,Income,1500.00,2024-01-31\n",
+            "Lunch,Sandwich,foods,EXP,7.50,2024-02-01\n",
+        )
+        result = TransactionImporter(self.user).import_file(file, "csv")
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.errors, [])
+        lunch = Transaction.objects.get(user=self.user, note="Lunch")
+        self.assertEqual(lunch.category.name, "Foods")
+        self.assertEqual(lunch.amount, Decimal("7.50"))
+        self.assertEqual(lunch.description, "Sandwich")
+
+    def test_import_ndjson(self):
+        rows = [
+            {"note": "Pay", "category": "Salary", "type": "Income", "amount": "10"},
+            {"note": "Tea", "category": "Foods", "type": "Expense", "amount": "2"},
+        ]
+        for row in rows:
+            row["date"] = "2024-03-01"
+        file = io.BytesIO("".join(json.dumps(row) + "\n" for row in rows).encode())
+
+        result = TransactionImporter(self.user).import_file(file, "ndjson")
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+    def test_invalid_rows_are_reported(self):
+        file = csv_file(
+            "Pay,,Salary,Income,1500.00,2024-01-31\n",
+            "Lunch,,Unknown,Expense,7.50,2024-02-01\n",
+            "Lunch,,Foods,Expense,abc,2024-02-01\n",
+            "Lunch,,Foods,Transfer,7.50,2024-02-01\n",
+            "Lunch,,Foods,Expense,-1,not a date\n",
+        )
+        result = TransactionImporter(self.user).import_file(file, "csv")
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([error.line for error in result.errors], [3, 4, 5, 6])
+        self.assertIn("category", result.errors[0].messages[0])
+        self.assertIn("amount", result.errors[1].messages[0])
+        self.assertIn("type", result.errors[2].messages[0])
+        self.assertEqual(len(result.errors[3].messages), 2)
+
+    def test_import_in_batches(self):
+        file = csv_file(
+            *(f"Lunch {i},,Foods,Expense,1.00,2024-02-0{i}\n" for i in range(1, 6))
+        )
+        importer = TransactionImporter(self.user, batch_size=2)
+
+        # one insert per batch, then the rollups of the imported month
+        with self.assertNumQueries(3 * 3 + 6):
+            result = importer.import_file(file, "csv")
+
+        self.assertEqual(result.created, 5)
+
+    def test_import_rebuilds_rollups(self):
+        TransactionFactory(
+            user=self.user,
+            category=Category.objects.get(user=self.user, name="Foods"),
+            type="EXP",
+            amount=Decimal("2.50"),
+            date="2024-02-10",
+        )
+        file = csv_file("Lunch,,Foods,Expense,7.50,2024-02-01\n")
+        TransactionImporter(self.user).import_file(file, "csv")
+
+        total = MonthlyCategoryTotal.objects.get(user=self.user)
+        self.assertEqual(total.total, Decimal("10.00"))
+        self.assertEqual(total.count, 2)
+
+    def test_import_into_archived_month(self):
+        salary = Category.objects.get(user=self.user, name="Salary")
+        for day in ("2020-03-01", "2020-03-20", "2020-05-01"):
+            TransactionFactory(
+                user=self.user,
+                category=salary,
+                type="INC",
+                amount=Decimal("100"),
+                date=day,
+            )
+        archive_transactions(self.user.pk, date(2022, 1, 1))
+        file = csv_file("Pay,,Salary,Income,5.00,2020-03-10\n")
+        TransactionImporter(self.user).import_file(file, "csv")
+
+        self.assertEqual(
+            list(
+                MonthlyCategoryTotal.objects.filter(user=self.user)
+                .order_by("month")
+                .values_list("month", "total", "count")
+            ),
+            [
+                (date(2020, 3, 1), Decimal("205.00"), 3),
+                (date(2020, 5, 1), Decimal("100.00"), 1),
+            ],
+        )
+
+    def test_invalid_bytes_and_csv_are_reported(self):
+        file = io.BytesIO(
+            HEADER.encode()
+            + b"Pay,,Salary,Income,10,2024-01-31\n"
+            + b"Caf\xe9,,Foods,Expense,2,2024-02-01\n"
+            + b"Tea,,Foods,Expense,1,2024-02-01\n"
+            + b'"Lunch,,Foods,Expense,'
+            + b"x" * csv.field_size_limit()
+            + b"\n"
+        )
+        result = TransactionImporter(self.user).import_file(file, "csv")
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([error.line for error in result.errors], [3, 5])
+        self.assertEqual(result.errors[0].messages, ["Invalid UTF-8."])
+        self.assertIn("Invalid CSV", result.errors[1].messages[0])
+
+    def test_invalid_bytes_in_ndjson_are_reported(self):
+        file = io.BytesIO(
+            b'{"note": "Caf\xe9", "category": "Foods", "type": "Expense",'
+            b' "amount": "2", "date": "2024-02-01"}\n'
+            b'{"note": "Tea", "category": "Foods", "type": "Expense",'
+            b' "amount": "1", "date": "2024-02-01"}\n'
+        )
+        result = TransactionImporter(self.user).import_file(file, "ndjson")
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([error.line for error in result.errors], [1])
+
+    def test_import_export_round_trip(self):
+        for category in Category.objects.filter(user=self.user):
+            TransactionFactory(user=self.user, category=category, type=category.type)
+        transactions = Transaction.objects.filter(user=self.user)
+        exported = "".join(stream_csv(transactions))
+        other = UserFactory()
+
+        result = TransactionImporter(other).import_file(
+            io.BytesIO(exported.encode()), "csv"
+        )
+
+        self.assertEqual(result.created, transactions.count())
+        self.assertEqual(result.errors, [])
+
+
+class TransactionImportViewTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.url = reverse("tracker:transaction_import")
+        self.client.login(email=self.user.email, password=PASSWORD)
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "tracker/transaction_import.html")
+
+    def test_post(self):
+        file = SimpleUploadedFile(
+            "transactions.csv",
+            (HEADER + "Pay,,Salary,Income,10,2024-01-31\n,,,,,\n").encode(),
+            content_type="text/csv",
+        )
+        response = self.client.post(self.url, {"file": file, "format": "csv"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["result"].created, 1)
+        self.assertEqual(len(response.context["errors"]), 1)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+    @override_settings(TRANSACTION_IMPORT_BATCH_SIZE=2)
+    def test_post_with_invalid_bytes_after_a_batch(self):
+        file = SimpleUploadedFile(
+            "transactions.csv",
+            (
+                HEADER.encode()
+                + b"Lunch,,Foods,Expense,7.50,2024-02-01\n" * 3
+                + b"Caf\xe9,,Foods,Expense,2,2024-02-01\n"
+            ),
+            content_type="text/csv",
+        )
+        response = self.client.post(self.url, {"file": file, "format": "csv"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["result"].created, 3)
+        self.assertEqual([error.line for error in response.context["errors"]], [5])
+        total = MonthlyCategoryTotal.objects.get(user=self.user)
+        self.assertEqual((total.total, total.count), (Decimal("22.50"), 3))
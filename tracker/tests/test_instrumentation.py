@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tracker.instrumentation import (
+    Metrics,
+    finish_task_recording,
+    record_queries,
+    start_task_recording,
+)
+from tracker.models import Transaction
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+PASSWORD = "testpassword"
+
+
+class RecordQueriesTest(TestCase):
+    def test_record_queries(self):
+        TransactionFactory.create_batch(2)
+
+        with self.assertNumQueries(2), record_queries() as recorder:
+            list(Transaction.objects.all())
+            Transaction.objects.count()
+
+        self.assertEqual(recorder.query_count, 2)
+        self.assertGreater(recorder.sql_seconds, 0)
+        self.assertIn("tracker_transaction", recorder.slowest_sql)
+        self.assertLessEqual(recorder.slowest_seconds, recorder.sql_seconds)
+
+    def test_record_task(self):
+        with self.assertLogs("tracker.instrumentation") as logs:
+            start_task_recording("task-id")
+            Transaction.objects.count()
+            finish_task_recording("task-id", "tracker.tasks.example", "SUCCESS")
+
+        record = logs.records[0].metrics
+        self.assertEqual(record["kind"], "task")
+        self.assertEqual(record["name"], "tracker.tasks.example")
+        self.assertEqual(record["state"], "SUCCESS")
+        self.assertEqual(record["query_count"], 1)
+
+
+class QueryInstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        TransactionFactory.create_batch(3, user=self.user)
+        self.client.login(email=self.user.email, password=PASSWORD)
+
+    def test_request_is_logged(self):
+        with (
+            self.assertLogs("tracker.instrumentation") as logs,
+            CaptureQueriesContext(connection) as queries,
+        ):
+            self.client.get(reverse("tracker:transaction_list"))
+
+        record = logs.records[0].metrics
+        self.assertEqual(record["kind"], "request")
+        self.assertEqual(record["name"], "tracker:transaction_list")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["query_count"], len(queries))
+        self.assertGreaterEqual(record["latency_ms"], record["sql_ms"])
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def record(self, latency_ms, query_count):
+        return {"latency_ms": latency_ms, "query_count": query_count, "sql_ms": 1}
+
+    def test_flush_and_collect(self):
+        # two processes
+        first, second = Metrics(), Metrics()
+        first.observe("request", "view", self.record(3, 2))
+        first.observe("request", "view", self.record(30, 12))
+        second.observe("request", "view", self.record(7000, 2))
+        second.observe("task", "task", self.record(1, 0))
+        first.flush()
+        second.flush()
+
+        histograms = first.collect()
+        latency = histograms["request"]["view"]["latency_ms"]
+        self.assertEqual(latency["count"], 3)
+        self.assertEqual(latency["sum"], 7033)
+        self.assertEqual(latency["counts"][0], 1)
+        self.assertEqual(latency["counts"][3], 1)
+        self.assertEqual(latency["counts"][-1], 1)
+        queries = histograms["request"]["view"]["queries"]
+        self.assertEqual(queries["counts"][2], 2)
+        self.assertEqual(queries["counts"][5], 1)
+        self.assertEqual(histograms["task"]["task"]["queries"]["counts"][0], 1)
+
+    def test_metrics_view(self):
+        user = UserFactory()
+        self.client.login(email=user.email, password=PASSWORD)
+        url = reverse("tracker:metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        user.is_staff = True
+        user.save()
+        self.client.get(reverse("tracker:transaction_list"))
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("tracker:transaction_list", response.json()["request"])
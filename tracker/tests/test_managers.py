@@ -1,8 +1,13 @@
+from datetime import date
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
 
 from tracker.choices import TransactionTextChoices
-from tracker.models import Transaction
+from tracker.models import Category, MonthlyCategoryTotal, Transaction
 from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
 
 INCOME = TransactionTextChoices.INCOME
 EXPENSE = TransactionTextChoices.EXPENSE
@@ -30,6 +35,14 @@ class TransactionQuerySetTest(TestCase):
         self.assertEqual(total_incomes, 900)
         self.assertEqual(total_expenses, 600)
     
+    def test_with_totals(self):
+        # the totals cover the whole queryset, not only the sliced rows
+        transactions = list(Transaction.objects.with_totals()[:2])
+        self.assertEqual(len(transactions), 2)
+        for transaction in transactions:
+            self.assertEqual(transaction.total_income, 900)
+            self.assertEqual(transaction.total_expense, 600)
+
     def test_get_net_income(self):
         totals = Transaction.objects.get_total_income_and_expense()
         total_incomes = totals["total_income"]
@@ -40,3 +53,101 @@ class TransactionQuerySetTest(TestCase):
 
         net_income = Transaction.objects.get_net_income()
         self.assertEqual(net_income, expected_net_income)
+
+    def test_in_period_month(self):
+        user = UserFactory()
+        transaction = TransactionFactory(user=user, date=date(2024, 2, 29))
+        TransactionFactory(user=user, date=date(2024, 3, 1))
+        TransactionFactory(user=user, date=date(2024, 1, 31))
+        qs = Transaction.objects.filter(user=user).in_period(2024, 2)
+        self.assertQuerySetEqual(qs, [transaction])
+
+    def test_in_period_year(self):
+        user = UserFactory()
+        transaction = TransactionFactory(user=user, date=date(2024, 12, 31))
+        TransactionFactory(user=user, date=date(2025, 1, 1))
+        qs = Transaction.objects.filter(user=user).in_period("2024")
+        self.assertQuerySetEqual(qs, [transaction])
+
+    def test_get_category_breakdown(self):
+        user = UserFactory()
+        salary = Category.objects.get(user=user, name="Salary")
+        foods = Category.objects.get(user=user, name="Foods")
+        rent = Category.objects.get(user=user, name="Rent")
+        for category, amount in ((foods, 10), (rent, 900), (foods, 30), (salary, 5)):
+            TransactionFactory(
+                user=user, category=category, type=category.type, amount=amount
+            )
+        transactions = Transaction.objects.filter(user=user)
+
+        with self.assertNumQueries(1):
+            breakdown = transactions.get_category_breakdown()
+
+        self.assertEqual(
+            breakdown,
+            {
+                "income": [
+                    {"category_id": salary.pk, "category": "Salary", "total": 5},
+                ],
+                "expense": [
+                    {"category_id": rent.pk, "category": "Rent", "total": 900},
+                    {"category_id": foods.pk, "category": "Foods", "total": 40},
+                ],
+            },
+        )
+        # the rollups give the same breakdown
+        self.assertEqual(
+            MonthlyCategoryTotal.objects.filter(user=user).get_category_breakdown(),
+            breakdown,
+        )
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN output is SQLite specific")
+class TransactionQueryPlanTest(TestCase):
+    """Period queries must use an index range scan on large tables."""
+
+    ROWS = 100_000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        other_user = UserFactory()
+        # seed in a single statement, the ORM is too slow for this many rows
+        with connection.cursor() as cursor:
+            for user in (cls.user, other_user):
+                category = Category.objects.filter(user=user).first()
+                cursor.execute(
+                    """
+                    WITH RECURSIVE seq(n) AS (
+                        SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s
+                    )
+                    INSERT INTO tracker_transaction
+                        (note, description, category_id, user_id, type, amount,
+                         date, created_at, updated_at)
+                    SELECT 'transaction', '', %s, %s, %s, abs(random() %% 5000) + 1,
+                        date('2020-01-01', '+' || abs(random() %% 1825) || ' days'),
+                        datetime('now'), datetime('now')
+                    FROM seq
+                    """,
+                    [cls.ROWS // 2, category.pk, user.pk, category.type],
+                )
+            cursor.execute("ANALYZE")
+
+    def assertIndexRangeScan(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f"INDEX {index_name} (user_id=? AND ", plan)
+        self.assertIn("date>? AND date<?)", plan)
+        self.assertNotIn("SCAN tracker_transaction", plan)
+
+    def test_month_filter_uses_user_date_index(self):
+        self.assertEqual(Transaction.objects.count(), self.ROWS)
+        qs = Transaction.objects.filter(user=self.user).in_period(2023, 6)
+        self.assertIndexRangeScan(qs, "transaction_user_date_idx")
+
+    def test_year_filter_uses_user_date_index(self):
+        qs = Transaction.objects.filter(user=self.user).in_period(2023)
+        self.assertIndexRangeScan(qs.get_monthly_totals(), "transaction_user_date_idx")
+
+    def test_type_filter_uses_user_type_date_index(self):
+        qs = Transaction.objects.filter(user=self.user).in_period(2023, 6).get_income()
+        self.assertIndexRangeScan(qs, "transaction_user_type_date_idx")
@@ -72,7 +72,7 @@ class TransactionTests(TestCase):
 
     def test_ordering_meta_option(self):
         ordering = Transaction._meta.ordering
-        self.assertEqual(ordering, ["-date"])
+        self.assertEqual(ordering, ["-date", "-id"])
 
     def test_string_representation_method(self):
         self.assertEqual(str(self.transaction), "Maintain transaction")
@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from tracker.choices import TransactionTextChoices
+from tracker.models import Category, MonthlyCategoryTotal, Transaction
+from tracker.money import MoneySum
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+INCOME = TransactionTextChoices.INCOME
+EXPENSE = TransactionTextChoices.EXPENSE
+
+
+class MoneySumTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.salary = Category.objects.get(user=self.user, name="Salary")
+        self.foods = Category.objects.get(user=self.user, name="Foods")
+        TransactionFactory.create_batch(
+            30,
+            user=self.user,
+            category=self.salary,
+            type=INCOME,
+            amount=Decimal("0.10"),
+            date=date(2024, 1, 1),
+        )
+        TransactionFactory(
+            user=self.user,
+            category=self.foods,
+            type=EXPENSE,
+            amount=Decimal("1234567.89"),
+            date=date(2024, 1, 2),
+        )
+        self.transactions = Transaction.objects.filter(user=self.user)
+
+    def test_exact_sum(self):
+        total = self.transactions.filter(type=INCOME).aggregate(
+            total=MoneySum("amount")
+        )["total"]
+        # 30 times 0.1 as floats is 3.0000000000000004
+        self.assertEqual(str(total), "3.00")
+
+    def test_empty_sum(self):
+        total = Transaction.objects.none().aggregate(
+            total=MoneySum("amount"), default=MoneySum("amount", default=0)
+        )
+        self.assertEqual(total, {"total": None, "default": Decimal("0.00")})
+
+    def test_aggregates_are_exact(self):
+        self.assertEqual(
+            self.transactions.get_total_income_and_expense(),
+            {"total_income": Decimal("3.00"), "total_expense": Decimal("1234567.89")},
+        )
+        self.assertEqual(self.transactions.total_balance(), Decimal("1234570.89"))
+        self.assertEqual(
+            list(self.transactions.get_monthly_totals()),
+            [
+                {
+                    "month": date(2024, 1, 1),
+                    "total_income": Decimal("3.00"),
+                    "total_expense": Decimal("1234567.89"),
+                }
+            ],
+        )
+        first = self.transactions.with_totals().first()
+        self.assertEqual(first.total_income, Decimal("3.00"))
+        self.assertEqual(first.total_expense, Decimal("1234567.89"))
+
+        totals = MonthlyCategoryTotal.objects.filter(user=self.user)
+        self.assertEqual(totals.get_net_income(), Decimal("-1234564.89"))
@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.test import SimpleTestCase, TestCase
+
+from tracker.models import Transaction
+from tracker.pagination import decode_cursor, encode_cursor, paginate_transactions
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+
+class CursorTest(SimpleTestCase):
+    def test_round_trip(self):
+        transaction = Transaction(pk=42, date=date(2024, 2, 29))
+        cursor = encode_cursor(transaction)
+        self.assertEqual(decode_cursor(cursor), (date(2024, 2, 29), 42))
+
+    def test_invalid_cursor(self):
+        # not base64, not a list, not two values, not a date
+        for cursor in ("~", "e30", "WyJ4Il0", "WyJ4IiwgMV0"):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+class PaginateTransactionsTest(TestCase):
+    def setUp(self):
+        user = UserFactory()
+        for day in (3, 1, 2, 2, 2, 1):
+            TransactionFactory(user=user, date=date(2024, 1, day))
+        self.queryset = Transaction.objects.filter(user=user)
+
+    def test_pages(self):
+        expected = list(self.queryset.order_by("-date", "-pk"))
+        pages = []
+        cursor = None
+        while True:
+            page = paginate_transactions(self.queryset, cursor, page_size=4)
+            pages.append(page.object_list)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual([len(page) for page in pages], [4, 2])
+        self.assertEqual(pages[0] + pages[1], expected)
+
+    def test_page_does_not_use_offset(self):
+        page = paginate_transactions(self.queryset, page_size=2)
+        with self.assertNumQueries(1) as queries:
+            paginate_transactions(self.queryset, page.next_cursor, page_size=2)
+        self.assertNotIn("OFFSET", queries.captured_queries[0]["sql"])
+
+    def test_exact_page(self):
+        page = paginate_transactions(self.queryset, page_size=6)
+        self.assertEqual(len(page.object_list), 6)
+        self.assertFalse(page.has_next)
@@ -0,0 +1,132 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from tracker import presence
+from tracker.consumers import NotificationConsumer
+from tracker.tasks import send_notification_batch
+from users.factories import UserFactory
+
+IN_MEMORY_CHANNEL_LAYERS = {
+    "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"},
+}
+
+
+class PresenceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_connection_counts(self):
+        connections = [
+            presence.Connection(1, "a"),
+            presence.Connection(1, "b"),
+            presence.Connection(2, "c"),
+        ]
+        for connection in connections:
+            connection.open()
+        self.assertEqual(presence.online_user_ids([1, 2, 3]), {1, 2})
+
+        # the user stays online while a connection is open
+        connections[0].close()
+        self.assertEqual(presence.online_user_ids([1, 2, 3]), {1, 2})
+        connections[1].close()
+        connections[2].close()
+        self.assertEqual(presence.online_user_ids([1, 2, 3]), set())
+
+    @override_settings(PRESENCE_TIMEOUT=1)
+    def test_user_goes_offline_without_heartbeat(self):
+        connection = presence.Connection(1, "a")
+        connection.open()
+        # expired, as if its server was killed
+        cache.touch(presence._user_key(1), -1)
+        self.assertEqual(presence.online_user_ids([1]), set())
+
+        connection.heartbeat()
+        self.assertEqual(presence.online_user_ids([1]), {1})
+
+    def test_open_connections_are_counted_again_once_expired(self):
+        connections = [presence.Connection(1, "a"), presence.Connection(1, "b")]
+        for connection in connections:
+            connection.open()
+        cache.delete(presence._user_key(1))
+
+        for connection in connections:
+            connection.heartbeat()
+        connections[0].close()
+        self.assertEqual(presence.online_user_ids([1]), {1})
+        connections[1].close()
+        self.assertEqual(presence.online_user_ids([1]), set())
+
+    def test_gauges_count_the_connections_of_the_last_window(self):
+        with mock.patch.object(presence, "_window", return_value=10):
+            connections = [
+                presence.Connection(1, "a"),
+                presence.Connection(1, "b"),
+                presence.Connection(2, "c"),
+            ]
+            for connection in connections:
+                connection.open()
+                connection.heartbeat()
+        with mock.patch.object(presence, "_window", return_value=11):
+            self.assertEqual(presence.presence_gauges(), {"connections": 3, "users": 2})
+            # closed or gone without closing, like those of a killed server
+            connections[0].close()
+            connections[1].heartbeat()
+        with mock.patch.object(presence, "_window", return_value=12):
+            self.assertEqual(presence.presence_gauges(), {"connections": 1, "users": 1})
+
+
+# channels closes the database connections around a consumer, which would
+# close the connection of a TestCase in its transaction
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class NotificationConsumerPresenceTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(), "/ws/notifications/"
+        )
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        online = await sync_to_async(presence.online_user_ids)([user.pk])
+        await communicator.disconnect()
+        return connected, online
+
+    def test_connections_are_registered(self):
+        user = UserFactory()
+        connected, online = async_to_sync(self.connect)(user)
+        self.assertTrue(connected)
+        self.assertEqual(online, {user.pk})
+        # and unregistered once closed
+        self.assertEqual(presence.online_user_ids([user.pk]), set())
+
+    async def notify(self, user, other):
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(), "/ws/notifications/"
+        )
+        communicator.scope["user"] = user
+        await communicator.connect()
+        # like the Celery task, from the registry written by the consumer
+        result = await sync_to_async(send_notification_batch)(
+            [user.pk, other.pk], "Hello"
+        )
+        message = await communicator.receive_json_from()
+        await communicator.disconnect()
+        return result, message
+
+    def test_notifications_are_sent_to_connected_users(self):
+        user, other = UserFactory(), UserFactory()
+        result, message = async_to_sync(self.notify)(user, other)
+        self.assertEqual((result["sent"], result["skipped"]), (1, 1))
+        self.assertEqual(message, {"message": "Hello"})
+
+    def test_anonymous_user_is_rejected(self):
+        connected, online = async_to_sync(self.connect)(AnonymousUser())
+        self.assertFalse(connected)
+        self.assertEqual(online, set())
+        self.assertEqual(presence.presence_gauges(), {"connections": 0, "users": 0})
@@ -0,0 +1,103 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from tracker.choices import TransactionTextChoices
+from tracker.models import Category, MonthlyCategoryTotal, Transaction
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+INCOME = TransactionTextChoices.INCOME
+EXPENSE = TransactionTextChoices.EXPENSE
+
+
+class MonthlyCategoryTotalSignalsTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.salary = Category.objects.get(user=self.user, name="Salary")
+        self.investment = Category.objects.get(user=self.user, name="Investment")
+
+    def create_transaction(self, **kwargs):
+        data = {
+            "user": self.user,
+            "category": self.salary,
+            "type": INCOME,
+            "amount": Decimal("100.00"),
+            "date": date(2024, 5, 10),
+        }
+        data.update(kwargs)
+        return TransactionFactory(**data)
+
+    def get_totals(self):
+        return list(
+            MonthlyCategoryTotal.objects.filter(user=self.user)
+            .order_by("month", "category__name")
+            .values_list("month", "category__name", "total", "count")
+        )
+
+    def test_create_adds_to_total(self):
+        self.create_transaction()
+        self.create_transaction(amount=Decimal("50.25"), date=date(2024, 5, 31))
+        self.assertEqual(
+            self.get_totals(), [(date(2024, 5, 1), "Salary", Decimal("150.25"), 2)]
+        )
+
+    def test_update_amount(self):
+        transaction = self.create_transaction()
+        transaction.amount = Decimal("80.00")
+        transaction.save()
+        self.assertEqual(
+            self.get_totals(), [(date(2024, 5, 1), "Salary", Decimal("80.00"), 1)]
+        )
+
+    def test_update_moves_between_months_and_categories(self):
+        self.create_transaction()
+        transaction = self.create_transaction(amount=Decimal("20.00"))
+        transaction.date = date(2024, 6, 1)
+        transaction.category = self.investment
+        transaction.save()
+        self.assertEqual(
+            self.get_totals(),
+            [
+                (date(2024, 5, 1), "Salary", Decimal("100.00"), 1),
+                (date(2024, 6, 1), "Investment", Decimal("20.00"), 1),
+            ],
+        )
+
+    def test_delete_removes_empty_total(self):
+        transaction = self.create_transaction()
+        transaction.delete()
+        self.assertEqual(self.get_totals(), [])
+
+    def test_delete_category_removes_totals(self):
+        self.create_transaction()
+        self.salary.delete()
+        self.assertEqual(self.get_totals(), [])
+
+
+class RebuildRollupsCommandTest(TestCase):
+    def test_rebuild_rollups(self):
+        user = UserFactory()
+        category = Category.objects.get(user=user, name="Foods")
+        TransactionFactory.create_batch(
+            3,
+            user=user,
+            category=category,
+            type=EXPENSE,
+            amount=10,
+            date=date(2024, 1, 5),
+        )
+        # bulk writes bypass the signals
+        Transaction.objects.filter(user=user).update(amount=20)
+        MonthlyCategoryTotal.objects.filter(user=user).update(total=0)
+
+        out = StringIO()
+        call_command("rebuild_rollups", stdout=out)
+        self.assertIn("Rebuilt 1 monthly category totals for 1 users.", out.getvalue())
+        total = MonthlyCategoryTotal.objects.get(user=user)
+        self.assertEqual(total.month, date(2024, 1, 1))
+        self.assertEqual(total.total, Decimal("60.00"))
+        self.assertEqual(total.count, 3)
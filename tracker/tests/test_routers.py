@@ -0,0 +1,110 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, router
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tracker.choices import TransactionTextChoices
+from tracker.models import Category, Transaction
+from tracker.routers import (
+    is_pinned_to_primary,
+    pin_to_primary,
+    read_database_for,
+    read_from,
+)
+from users.factories import UserFactory
+
+EXPENSE = TransactionTextChoices.EXPENSE
+PASSWORD = "testpassword"
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTest(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+
+    def test_reads_of_a_block(self):
+        self.assertEqual(Transaction.objects.all().db, "default")
+        with read_from("replica"):
+            self.assertEqual(Transaction.objects.all().db, "replica")
+            # only the tracker models, not the users or the sessions
+            self.assertEqual(User.objects.all().db, "default")
+        self.assertEqual(Transaction.objects.all().db, "default")
+
+    def test_writes_go_to_the_default_database(self):
+        category = Category.objects.filter(user=self.user).first()
+        category._state.db = "replica"
+        with read_from("replica"):
+            self.assertEqual(
+                router.db_for_write(Category, instance=category), "default"
+            )
+
+    def test_pinned_after_a_write(self):
+        self.assertEqual(read_database_for(self.user), "replica")
+        pin_to_primary(self.user.pk)
+        self.assertEqual(read_database_for(self.user), "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        pin_to_primary(self.user.pk)
+        self.assertFalse(is_pinned_to_primary(self.user.pk))
+        self.assertEqual(read_database_for(self.user), "default")
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaReadViewTest(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.client.login(email=self.user.email, password=PASSWORD)
+
+    def get_tracker_reads(self, url, params=None):
+        """Return the databases of the tracker tables read by a GET of ``url``."""
+        with CaptureQueriesContext(connections["default"]) as default:
+            with CaptureQueriesContext(connections["replica"]) as replica:
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+        return {
+            alias
+            for alias, queries in (("default", default), ("replica", replica))
+            if any("tracker_" in query["sql"] for query in queries)
+        }
+
+    def test_analytics_read_from_the_replica(self):
+        for url, params in (
+            (reverse("tracker:transaction_statistics"), None),
+            (reverse("tracker:transaction_total_statistics"), None),
+            (reverse("tracker:transaction_export"), {"format": "csv"}),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.get_tracker_reads(url, params), {"replica"})
+
+    def test_read_your_writes(self):
+        url = reverse("tracker:transaction_total_statistics")
+        response = self.client.post(
+            reverse("tracker:transaction_create"),
+            {
+                "note": "Lunch",
+                "type": EXPENSE,
+                "category": Category.objects.get(user=self.user, name="Foods").pk,
+                "amount": "10",
+                "date": date.today(),
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.get_tracker_reads(url), {"default"})
+
+        # back to the replica once the pin expires
+        cache.clear()
+        self.assertEqual(self.get_tracker_reads(url), {"replica"})
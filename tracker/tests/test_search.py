@@ -0,0 +1,163 @@
+from datetime import date
+from unittest import skipUnless
+
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection, models
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from tracker.choices import TransactionTextChoices
+from tracker.generators import insert_transactions
+from tracker.models import Category, Transaction
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+INCOME = TransactionTextChoices.INCOME
+EXPENSE = TransactionTextChoices.EXPENSE
+PASSWORD = "testpassword"
+
+
+class TransactionSearchTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.foods = Category.objects.get(user=self.user, name="Foods")
+        self.rent = Category.objects.get(user=self.user, name="Rent")
+        self.pizza = self.create("Pizza with friends", "Dinner at Café Roma")
+        self.groceries = self.create("Groceries", "Pizza dough and tomatoes")
+        self.apartment = self.create("Apartment rent", "", category=self.rent)
+
+    def create(self, note, description, category=None):
+        return TransactionFactory(
+            user=self.user,
+            note=note,
+            description=description,
+            category=category or self.foods,
+            type=EXPENSE,
+        )
+
+    def search(self, text, **kwargs):
+        return list(Transaction.objects.search(text, **kwargs))
+
+    def test_note_and_description(self):
+        self.assertCountEqual(self.search("pizza"), [self.pizza, self.groceries])
+        self.assertEqual(self.search("tomatoes"), [self.groceries])
+
+    def test_prefix_and_every_word(self):
+        self.assertCountEqual(self.search("piz"), [self.pizza, self.groceries])
+        self.assertEqual(self.search("piz friend"), [self.pizza])
+        self.assertEqual(self.search("?!"), [])
+
+    def test_accents_are_ignored(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'unaccent'")
+                if cursor.fetchone() is None:
+                    self.skipTest("the unaccent extension isn't installed")
+        self.assertEqual(self.search("cafe"), [self.pizza])
+
+    def test_ranked(self):
+        self.create("Pizza", "Pizza pizza pizza")
+        results = self.search("pizza", rank=True)
+        self.assertEqual(results[0].note, "Pizza")
+        self.assertEqual(
+            [t.search_rank for t in results],
+            sorted((t.search_rank for t in results), reverse=True),
+        )
+
+    def test_index_follows_writes(self):
+        self.apartment.note = "Flat rent"
+        self.apartment.save()
+        self.assertEqual(self.search("flat"), [self.apartment])
+        self.assertEqual(self.search("apartment"), [])
+
+        self.pizza.delete()
+        self.assertEqual(self.search("friends"), [])
+
+        # raw inserts are indexed too
+        insert_transactions(
+            [
+                (
+                    "Cinema",
+                    "",
+                    self.foods.pk,
+                    self.user.pk,
+                    EXPENSE,
+                    "12.00",
+                    date(2024, 1, 1),
+                )
+            ],
+            batch_size=10,
+        )
+        self.assertEqual([t.note for t in self.search("cinema")], ["Cinema"])
+
+
+class TransactionListSearchTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.login(email=self.user.email, password=PASSWORD)
+        today = date.today()
+        for name, type, note in (
+            ("Foods", EXPENSE, "Pizza"),
+            ("Groceries", EXPENSE, "Pizza dough"),
+            ("Salary", INCOME, "Pizza shop salary"),
+        ):
+            TransactionFactory(
+                user=self.user,
+                category=Category.objects.get(user=self.user, name=name),
+                type=type,
+                note=note,
+                date=today,
+            )
+        # other users' transactions are never found
+        TransactionFactory(note="Pizza", date=today)
+
+    def test_search_with_filters(self):
+        url = reverse("tracker:transaction_list")
+        response = self.client.get(url, {"search": "pizza"})
+        self.assertEqual(len(response.context["transactions"]), 3)
+
+        response = self.client.get(
+            url, {"search": "pizza", "transaction_type": EXPENSE}
+        )
+        self.assertCountEqual(
+            [t.note for t in response.context["transactions"]],
+            ["Pizza", "Pizza dough"],
+        )
+        self.assertEqual(
+            response.context["total_expenses"],
+            sum(t.amount for t in response.context["transactions"]),
+        )
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite only")
+class SearchTriggersAfterMigrationTest(TransactionTestCase):
+    def alter_note(self, max_length):
+        # rebuilds the transaction table on SQLite, without its triggers
+        old_field = Transaction._meta.get_field("note")
+        new_field = models.CharField(max_length=max_length)
+        new_field.set_attributes_from_name("note")
+        with connection.schema_editor() as schema_editor:
+            schema_editor.alter_field(Transaction, old_field, new_field)
+        self.addCleanup(self.restore, new_field, old_field)
+
+    def restore(self, field, old_field):
+        with connection.schema_editor() as schema_editor:
+            schema_editor.alter_field(Transaction, field, old_field)
+        emit_post_migrate_signal(verbosity=0, interactive=False, db="default")
+
+    def test_triggers_are_restored_after_migrate(self):
+        user = UserFactory()
+        TransactionFactory(user=user, note="Pizza")
+        self.alter_note(200)
+        # written while the triggers are missing
+        TransactionFactory(user=user, note="Pizza dough")
+        self.assertEqual(
+            [t.note for t in Transaction.objects.search("pizza")], ["Pizza"]
+        )
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db="default")
+        TransactionFactory(user=user, note="Pizza shop")
+        self.assertCountEqual(
+            [t.note for t in Transaction.objects.search("pizza")],
+            ["Pizza", "Pizza dough", "Pizza shop"],
+        )
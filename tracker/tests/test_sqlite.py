@@ -0,0 +1,62 @@
+import os
+import tempfile
+from unittest import skipUnless
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TestCase, override_settings
+
+from tracker.sqlite import get_pragma, optimize_database
+from tracker.tasks import optimize_sqlite_database
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite only")
+class SQLiteTuningTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "db.sqlite3")
+
+    def connect(self):
+        """Open a new connection to a database file, like a new process would."""
+        file_connection = connections[DEFAULT_DB_ALIAS].copy("file")
+        file_connection.settings_dict["NAME"] = self.path
+        file_connection.ensure_connection()
+        self.addCleanup(file_connection.close)
+        return file_connection
+
+    def test_default_profile(self):
+        file_connection = self.connect()
+        self.assertEqual(get_pragma(file_connection, "journal_mode"), "delete")
+
+    @override_settings(SQLITE_TUNING=True)
+    def test_tuned_profile(self):
+        file_connection = self.connect()
+        self.assertEqual(get_pragma(file_connection, "journal_mode"), "wal")
+        # NORMAL
+        self.assertEqual(get_pragma(file_connection, "synchronous"), 1)
+        self.assertEqual(get_pragma(file_connection, "busy_timeout"), 5000)
+        self.assertEqual(get_pragma(file_connection, "cache_size"), -64 * 1024)
+
+    @override_settings(SQLITE_TUNING=True)
+    def test_optimize_frees_pages(self):
+        file_connection = self.connect()
+        with file_connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE note (text TEXT)")
+            cursor.executemany("INSERT INTO note VALUES (%s)", [("x" * 1000,)] * 100)
+            cursor.execute("DELETE FROM note")
+        self.assertGreater(get_pragma(file_connection, "freelist_count"), 0)
+
+        self.assertGreater(optimize_database(file_connection, analyze=True), 0)
+        self.assertEqual(get_pragma(file_connection, "freelist_count"), 0)
+
+
+class OptimizeSQLiteDatabaseTaskTest(TestCase):
+    def test_skipped_unless_tuned(self):
+        self.assertEqual(optimize_sqlite_database(), {"skipped": True})
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite only")
+    @override_settings(SQLITE_TUNING=True)
+    def test_optimize(self):
+        result = optimize_sqlite_database(analyze=True)
+        self.assertTrue(result["analyzed"])
+        self.assertEqual(result["freed_pages"], 0)
@@ -0,0 +1,195 @@
+import asyncio
+import shutil
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from tracker.choices import ExportJobStatusChoices
+from tracker.exports import EXPORT_FIELDS
+from tracker.models import ExportJob
+from tracker.presence import Connection
+from tracker.tasks import (
+    DAILY_NOTIFICATION_MESSAGE,
+    export_transactions_xlsx,
+    send_daily_notifications,
+    send_notification_batch,
+)
+from tracker.tests.factories import TransactionFactory
+from users.factories import UserFactory
+
+PASSWORD = "testpassword"
+MEDIA_ROOT = tempfile.mkdtemp()
+IN_MEMORY_CHANNEL_LAYERS = {
+    "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"},
+}
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class ExportTransactionsXlsxTaskTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = UserFactory()
+        TransactionFactory.create_batch(25, user=self.user)
+        self.job = ExportJob.objects.create(user=self.user)
+        self.channel_layer = get_channel_layer()
+        self.channel_name = async_to_sync(self.channel_layer.new_channel)()
+        async_to_sync(self.channel_layer.group_add)(
+            f"user_notifications_{self.user.pk}", self.channel_name
+        )
+
+    def receive(self):
+        return async_to_sync(self.channel_layer.receive)(self.channel_name)
+
+    def test_export_writes_workbook(self):
+        export_transactions_xlsx(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ExportJobStatusChoices.DONE)
+        self.assertEqual(self.job.progress, 100)
+        self.assertIsNotNone(self.job.finished_at)
+        with self.job.file.open("rb") as file:
+            rows = list(load_workbook(file, read_only=True).active.values)
+        self.assertEqual(list(rows[0]), list(EXPORT_FIELDS))
+        self.assertEqual(len(rows), 26)
+
+    def test_export_reports_progress(self):
+        export_transactions_xlsx(self.job.pk)
+
+        progress = []
+        while True:
+            event = self.receive()
+            progress.append(event["export"]["progress"])
+            if event["export"]["status"] == ExportJobStatusChoices.DONE:
+                break
+        # every 3 of the 25 rows, once at least 10% more is done
+        self.assertEqual(progress, [12, 24, 36, 48, 60, 72, 84, 96, 100])
+        self.assertEqual(
+            event["export"]["download_url"],
+            reverse("tracker:export_job_download", kwargs={"pk": self.job.pk}),
+        )
+
+    def test_export_failure(self):
+        with mock.patch("tracker.tasks.Workbook", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                export_transactions_xlsx(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ExportJobStatusChoices.FAILED)
+        self.assertEqual(self.job.error, "boom")
+        self.assertEqual(self.receive()["export"]["status"], "FAI")
+
+
+@override_settings(
+    CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS,
+    NOTIFICATION_BATCH_SIZE=2,
+    NOTIFICATION_CONCURRENCY=2,
+)
+class DailyNotificationsTaskTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = UserFactory.create_batch(5)
+        self.inactive_user = UserFactory(is_active=False)
+        self.channel_layer = get_channel_layer()
+        self.channels = {}
+        for user in self.users:
+            channel_name = async_to_sync(self.channel_layer.new_channel)()
+            async_to_sync(self.channel_layer.group_add)(
+                f"user_notifications_{user.pk}", channel_name
+            )
+            self.channels[user.pk] = channel_name
+            Connection(user.pk, channel_name).open()
+
+    def receive(self, user):
+        receive = self.channel_layer.receive(self.channels[user.pk])
+        return async_to_sync(asyncio.wait_for)(receive, timeout=1)
+
+    @mock.patch.object(send_notification_batch, "delay")
+    def test_active_users_are_split_in_batches(self, delay):
+        result = send_daily_notifications()
+
+        self.assertEqual(result["users"], 5)
+        self.assertEqual(result["batches"], 3)
+        batches = [call.args[0] for call in delay.call_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(
+            sorted(pk for batch in batches for pk in batch),
+            sorted(user.pk for user in self.users),
+        )
+
+    def test_batch_notifies_users(self):
+        user_ids = [user.pk for user in self.users]
+        result = send_notification_batch(user_ids, DAILY_NOTIFICATION_MESSAGE)
+
+        self.assertEqual((result["sent"], result["failed"]), (5, 0))
+        for user in self.users:
+            message = self.receive(user)
+            self.assertEqual(message["message"], DAILY_NOTIFICATION_MESSAGE)
+
+    def test_batch_skips_offline_users(self):
+        offline_user = UserFactory()
+        user_ids = [offline_user.pk, self.users[0].pk]
+        result = send_notification_batch(user_ids, DAILY_NOTIFICATION_MESSAGE)
+
+        self.assertEqual((result["sent"], result["skipped"]), (1, 1))
+        self.assertEqual(
+            self.receive(self.users[0])["message"], DAILY_NOTIFICATION_MESSAGE
+        )
+
+    def test_batch_counts_failures(self):
+        group_send = self.channel_layer.group_send
+        failing_group = f"user_notifications_{self.users[0].pk}"
+
+        async def flaky_group_send(group, message):
+            if group == failing_group:
+                raise ConnectionError("redis is down")
+            await group_send(group, message)
+
+        user_ids = [user.pk for user in self.users]
+        with mock.patch.object(self.channel_layer, "group_send", flaky_group_send):
+            result = send_notification_batch(user_ids, DAILY_NOTIFICATION_MESSAGE)
+        self.assertEqual((result["sent"], result["failed"]), (4, 1))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class ExportJobViewsTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.login(email=self.user.email, password=PASSWORD)
+
+    @mock.patch("tracker.views.export_transactions_xlsx.delay")
+    def test_xlsx_export_starts_job(self, delay):
+        response = self.client.get(
+            reverse("tracker:transaction_export"), {"format": "xlsx"}
+        )
+        job = ExportJob.objects.get(user=self.user)
+        delay.assert_called_once_with(job.pk)
+        self.assertRedirects(response, reverse("tracker:export_job_list"))
+
+    def test_download_finished_job(self):
+        job = ExportJob.objects.create(user=self.user)
+        export_transactions_xlsx(job.pk)
+        url = reverse("tracker:export_job_download", kwargs={"pk": job.pk})
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment", response["Content-Disposition"])
+
+        # other users cannot download it
+        other_user = UserFactory()
+        self.client.login(email=other_user.email, password=PASSWORD)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_download_pending_job(self):
+        job = ExportJob.objects.create(user=self.user)
+        url = reverse("tracker:export_job_download", kwargs={"pk": job.pk})
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -1,8 +1,12 @@
 from datetime import date, datetime
 from decimal import Decimal
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from tracker.choices import TransactionTextChoices
@@ -12,6 +16,8 @@ from tracker.views import (
     CategoryDeleteView,
     CategoryUpdateView,
     TransactionDeleteView,
+    TransactionListView,
+    TransactionStatisticsView,
     TransactionTotalStatisticsView,
     TransactionUpdateView,
 )
@@ -64,11 +70,86 @@ class TransactionListViewTest(TestCase):
         response = self.client.get(self.name_url)
         self.assertTemplateUsed(response, "tracker/transaction_list.html")
 
+    def test_out_of_range_period(self):
+        TransactionFactory(user=self.user, date=date.today())
+        for params in ({"month": 13}, {"month": 0}, {"year": 0}, {"year": 9999}):
+            with self.subTest(params=params):
+                response = self.client.get(self.name_url, params)
+                # not a choice of the filter form, nothing is listed
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(list(response.context["transactions"]), [])
+
+    @mock.patch.object(TransactionListView, "page_size", 2)
+    def test_pages_are_loaded_on_scroll(self):
+        today = date.today()
+        transactions = [
+            TransactionFactory(user=self.user, date=today.replace(day=day))
+            for day in (1, 1, 1, 2, 2)
+        ]
+        expected = sorted(transactions, key=lambda t: (t.date, t.pk), reverse=True)
+
+        response = self.client.get(self.name_url)
+        first_page = response
+        pages = [response.context["transactions"]]
+        while "next_page_url" in response.context:
+            response = self.client.get(
+                response.context["next_page_url"], HTTP_HX_REQUEST="true"
+            )
+            self.assertTemplateUsed(response, "tracker/partials/transaction_rows.html")
+            pages.append(response.context["transactions"])
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual([t for page in pages for t in page], expected)
+        # the totals are those of the whole period, and not rendered again
+        total = sum(t.amount for t in transactions if t.type == INCOME)
+        self.assertEqual(first_page.context["total_incomes"], total)
+        self.assertNotIn("total_incomes", response.context)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.name_url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_totals_follow_filters(self):
+        today = date.today()
+        income = CategoryFactory(user=self.user, type=INCOME)
+        expense = CategoryFactory(user=self.user, type=EXPENSE)
+        for category, amount in ((income, 10), (income, 20), (expense, 5)):
+            TransactionFactory(
+                user=self.user,
+                category=category,
+                type=category.type,
+                amount=Decimal(amount),
+                date=today,
+            )
+
+        response = self.client.get(self.name_url)
+        self.assertEqual(response.context["total_incomes"], 30)
+        self.assertEqual(response.context["total_expenses"], 5)
+
+        response = self.client.get(self.name_url, {"transaction_type": EXPENSE})
+        self.assertEqual(response.context["total_incomes"], 0)
+        self.assertEqual(response.context["total_expenses"], 5)
+        self.assertEqual(len(response.context["transactions"]), 1)
+
+    def test_totals_are_read_with_the_first_page(self):
+        TransactionFactory.create_batch(3, user=self.user, date=date.today())
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.name_url)
+        transaction_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "tracker_transaction"' in query["sql"]
+        ]
+        self.assertEqual(len(transaction_queries), 1)
+        self.assertIn(" OVER ", transaction_queries[0])
+        total = response.context["total_incomes"] + response.context["total_expenses"]
+        self.assertEqual(total, sum(t.amount for t in response.context["transactions"]))
+
 
 class TransactionCreateViewTest(TestCase):
     def setUp(self):
         self.user = UserFactory()
-        self.category = CategoryFactory(user=self.user)
+        self.category = CategoryFactory(user=self.user, type=INCOME)
         self.name_url = reverse("tracker:transaction_create")
         self.success_url = reverse("tracker:transaction_list")
         self.client.login(email=self.user.email, password=PASSWORD)
@@ -100,6 +181,66 @@ class TransactionCreateViewTest(TestCase):
         self.assertEqual(transaction.user, self.user)
 
 
+class FormQueryBudgetTest(TestCase):
+    """The form views read the user's categories at most once per request."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.client.login(email=self.user.email, password=PASSWORD)
+        self.salary = Category.objects.get(user=self.user, name="Salary")
+        self.transaction = TransactionFactory(
+            user=self.user, category=self.salary, type=INCOME, date=date.today()
+        )
+        self.data = {
+            "note": "new transaction",
+            "type": INCOME,
+            "category": self.salary.pk,
+            "amount": "10",
+            "date": date.today(),
+        }
+
+    def assertQueryBudget(self, budget, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data)
+        self.assertIn(response.status_code, (200, 302))
+        statements = [
+            query["sql"]
+            for query in queries.captured_queries
+            # the savepoints of the nested atomic blocks
+            if "SAVEPOINT" not in query["sql"]
+        ]
+        self.assertLessEqual(len(statements), budget, "\n".join(statements))
+        category_list_reads = [
+            sql
+            for sql in statements
+            if 'FROM "tracker_category" WHERE "tracker_category"."user_id"' in sql
+        ]
+        self.assertLessEqual(len(category_list_reads), 1)
+
+    def test_transaction_create(self):
+        url = reverse("tracker:transaction_create")
+        self.assertQueryBudget(2, "get", url)
+        # session, user, categories, category exists, amount check, insert and
+        # the monthly total upsert
+        self.assertQueryBudget(7, "post", url, self.data)
+
+    def test_transaction_update(self):
+        url = reverse("tracker:transaction_update", kwargs={"pk": self.transaction.pk})
+        self.assertQueryBudget(4, "get", url)
+        # and the previous state of the transaction, to move it out of its
+        # monthly total
+        self.assertQueryBudget(11, "post", url, self.data)
+
+    def test_category_create_and_update(self):
+        url = reverse("tracker:category_create")
+        self.assertQueryBudget(4, "post", url, {"name": "Bonus", "type": INCOME})
+        url = reverse("tracker:category_update", kwargs={"pk": self.salary.pk})
+        self.assertQueryBudget(5, "post", url, {"name": "Salary", "type": INCOME})
+        self.salary.refresh_from_db()
+        self.assertEqual(self.salary.name, "Salary")
+
+
 class TransactionUpdateViewTest(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
@@ -177,19 +318,92 @@ class TransactionDeleteViewTest(TestCase):
 
         self.assertFalse(view.test_func())
 
+
 class TransactionStatisticsViewTest(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
         self.user = UserFactory()
-        self.name_url = reverse('tracker:transaction_statistics')
+        self.name_url = reverse("tracker:transaction_statistics")
+        self.client.login(email=self.user.email, password=PASSWORD)
 
         self.current_year = datetime.now().year
         self.current_month = datetime.now().month
-        self.transactions = TransactionFactory(user=self.user).create_batch(5)
-    
+        self.salary = Category.objects.get(user=self.user, name="Salary")
+        self.foods = Category.objects.get(user=self.user, name="Foods")
+        self.rent = Category.objects.get(user=self.user, name="Rent")
+        today = date.today()
+        for category, amount in (
+            (self.salary, 1000),
+            (self.foods, 20),
+            (self.rent, 500),
+            (self.foods, 30),
+        ):
+            TransactionFactory(
+                user=self.user,
+                category=category,
+                type=category.type,
+                amount=amount,
+                date=today,
+            )
+        # another month and another user
+        TransactionFactory(
+            user=self.user,
+            category=self.foods,
+            type=EXPENSE,
+            date=date(self.current_year - 1, 1, 1),
+        )
+        TransactionFactory(date=today)
+
     def test_get_queryset(self):
-        for t in self.transactions:
-            print(f"{t}: {t.date}")
+        request = self.factory.get(self.name_url)
+        request.user = self.user
+
+        view = TransactionStatisticsView()
+        view.request = request
+
+        queryset = view.get_queryset()
+        self.assertEqual(queryset.count(), 4)
+        self.assertTrue(all(t.user == self.user for t in queryset))
+
+    def test_get_context_data(self):
+        response = self.client.get(self.name_url)
+
+        self.assertEqual(
+            [
+                (row["category"], row["total"])
+                for row in response.context["income_data"]
+            ],
+            [("Salary", 1000)],
+        )
+        self.assertEqual(
+            [
+                (row["category"], row["total"])
+                for row in response.context["expense_data"]
+            ],
+            [("Rent", 500), ("Foods", 50)],
+        )
+        self.assertEqual(
+            response.context["chart_data"]["expense"],
+            {"labels": ["Rent", "Foods"], "totals": [500.0, 50.0]},
+        )
+
+    def test_out_of_range_month_selects_the_current_month(self):
+        response = self.client.get(self.name_url, {"month": 13})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["expense_data"]), 2)
+
+    def test_htmx_renders_chart_container(self):
+        response = self.client.get(
+            self.name_url,
+            {"year": self.current_year - 1, "month": 1},
+            HTTP_HX_REQUEST="true",
+        )
+
+        self.assertTemplateUsed(response, "tracker/partials/chart_container.html")
+        self.assertTemplateNotUsed(response, "tracker/transaction_statistics.html")
+        self.assertEqual(response.context["income_data"], [])
+        self.assertEqual(len(response.context["expense_data"]), 1)
 
 
 
@@ -235,7 +449,79 @@ class TransactionTotalStatisticsViewTest(TestCase):
         self.assertNotIn(self.transaction_other_user, queryset)
 
     def test_get_context_data(self):
-        pass
+        request = self.factory.get(f"{self.name_url}?year=2024")
+        request.user = self.user
+
+        view = TransactionTotalStatisticsView()
+        view.setup(request)
+        view.object_list = view.get_queryset()
+
+        context = view.get_context_data()
+        amount = self.transaction_year_2024.amount
+        total_incomes_per_month = context["total_incomes_per_month"]
+        total_expenses_per_month = context["total_expenses_per_month"]
+        self.assertEqual(context["total_yearly_balance"], amount)
+        self.assertEqual(len(total_incomes_per_month), 12)
+        self.assertEqual(len(total_expenses_per_month), 12)
+        self.assertEqual(
+            total_incomes_per_month[0] + total_expenses_per_month[0], amount
+        )
+        self.assertEqual(sum(total_incomes_per_month[1:]), 0)
+        self.assertEqual(sum(total_expenses_per_month[1:]), 0)
+        # a balance for every day of the year
+        daily_balances = context["daily_balances"]
+        self.assertEqual(len(daily_balances), 366)
+        self.assertEqual(daily_balances[0][0], date(2024, 1, 1))
+        self.assertEqual(daily_balances[-1][0], date(2024, 12, 31))
+
+
+class LoadCategoriesViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.url = reverse("tracker:load_categories")
+        self.client.login(email=self.user.email, password=PASSWORD)
+
+    def names(self, categories):
+        return [category["name"] for category in categories]
+
+    def test_redirect_if_not_logged_in(self):
+        self.client.logout()
+        response = self.client.get(self.url, {"type": INCOME})
+        self.assertEqual(response.status_code, 302)
+
+    def test_categories_of_type(self):
+        response = self.client.get(self.url, {"type": INCOME})
+        self.assertEqual(
+            self.names(response.json()), ["Investment", "Parents", "Salary"]
+        )
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_categories_of_both_types(self):
+        response = self.client.get(self.url, {"type": "all"})
+        categories = response.json()
+        self.assertEqual(
+            self.names(categories[INCOME]), ["Investment", "Parents", "Salary"]
+        )
+        self.assertEqual(
+            self.names(categories[EXPENSE]), ["Foods", "Groceries", "Rent"]
+        )
+
+    def test_conditional_request(self):
+        etag = self.client.get(self.url, {"type": INCOME})["ETag"]
+
+        # only the session and the user are read
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.url, {"type": INCOME}, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+        Category.objects.create(name="Bonus", user=self.user, type=INCOME)
+        response = self.client.get(self.url, {"type": INCOME}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Bonus", self.names(response.json()))
 
 
 class CategoryCreateViewTest(TestCase):
@@ -39,6 +39,18 @@ urlpatterns = [
         views.TransactionExportView.as_view(),
         name="transaction_export",
     ),
+    path(
+        "transactions/import/",
+        views.TransactionImportView.as_view(),
+        name="transaction_import",
+    ),
+    path("exports/", views.ExportJobListView.as_view(), name="export_job_list"),
+    path(
+        "exports/<int:pk>/download/",
+        views.ExportJobDownloadView.as_view(),
+        name="export_job_download",
+    ),
+    path("metrics/", views.MetricsView.as_view(), name="metrics"),
     path("categories/new/", views.CategoryCreateView.as_view(), name="category_create"),
     path(
         "categories/<int:pk>/edit/",
@@ -1,25 +1,62 @@
 import logging
-from datetime import datetime
+import os
+from datetime import MAXYEAR, MINYEAR, datetime, timedelta
+from functools import partial
 
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.http import HttpResponse, JsonResponse
-from django.shortcuts import render
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
 from django.views.generic.base import TemplateView, View
-from django.views.generic.edit import CreateView, DeleteView, UpdateView
+from django.views.generic.edit import CreateView, DeleteView, FormView, UpdateView
+from django.views.generic.list import ListView
 from django_filters.views import FilterView
 
+from . import analytics
+from .archive import archived_transactions
+from .balances import get_daily_balances
+from .cache import cached_categories, cached_statistics, get_category_version
+from .choices import ExportJobStatusChoices
+from .exports import STREAMING_FORMATS
 from .filters import (
     TransactionFilter,
     TransactionStasticsFilter,
     TransactionTotalStasticsFilter,
 )
-from .forms import CategoryForm, TransactionExportFormatForm, TransactionForm
-from .models import Category, Transaction, TransactionTextChoices
-from .resources import TransactionResource
-from .utils import get_transaction_chart_data
+from .forms import (
+    CategoryForm,
+    TransactionExportFormatForm,
+    TransactionForm,
+    TransactionImportForm,
+)
+from .importers import TransactionImporter
+from .instrumentation import metrics
+from .models import (
+    Category,
+    ExportJob,
+    MonthlyCategoryTotal,
+    Transaction,
+    TransactionTextChoices,
+)
+from .pagination import paginate_transactions
+from .periods import get_year_range
+from .presence import presence_gauges
+from .repositories import CategoryRepository
+from .routers import read_database_for, read_from
+from .tasks import export_transactions_xlsx
 
 logger = logging.getLogger(__name__)
 
@@ -28,35 +65,134 @@ class IndexView(TemplateView):
     template_name = "tracker/index.html"
 
 
-class TransactionListView(LoginRequiredMixin, FilterView):
+class OwnerRequiredMixin(UserPassesTestMixin):
+    """Only allow the owner of the object, which is fetched once."""
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, "_object"):
+            self._object = super().get_object(queryset)
+        return self._object
+
+    def test_func(self):
+        return self.get_object().user_id == self.request.user.pk
+
+
+class ReplicaReadMixin:
+    """
+    Read the tracker models from a read replica, see ``tracker.routers``.
+
+    The template response is rendered in the view, so its lazy querysets are
+    read from the replica too. Querysets read after the view returns, like
+    those of a streaming response, must use ``read_database`` themselves.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        self.read_database = read_database_for(request.user)
+        with read_from(self.read_database):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+        return response
+
+
+class SelectedPeriodMixin:
+    """Read the year and month selected in the filter form."""
+
+    # whether the period is a single month or the whole year
+    period_has_month = True
+
+    def get_selected_period(self):
+        # default to the current year and month
+        now = datetime.now()
+        try:
+            year = int(self.request.GET.get("year", now.year))
+            month = int(self.request.GET.get("month", now.month))
+        except ValueError:
+            year, month = now.year, now.month
+        # the dates of the period range must exist
+        if not MINYEAR <= year < MAXYEAR:
+            year = now.year
+        if not 1 <= month <= 12:
+            month = now.month
+        if not self.period_has_month:
+            return year, None
+        return year, month
+
+
+class TransactionListView(LoginRequiredMixin, SelectedPeriodMixin, FilterView):
     """List all transaction of the request user."""
 
     model = Transaction
     context_object_name = "transactions"
     filterset_class = TransactionFilter
     template_name = "tracker/transaction_list.html"
+    # transactions per page, further pages are loaded on scroll
+    page_size = 50
 
     def get_queryset(self):
         user = self.request.user
-        # get query parameters, default to current year and month
-        selected_year = self.request.GET.get("year", datetime.now().year)
-        selected_month = self.request.GET.get("month", datetime.now().month)
+        selected_year, selected_month = self.get_selected_period()
 
         return (
             super()
             .get_queryset()
-            .filter(user=user, date__year=selected_year, date__month=selected_month)
+            .filter(user=user)
+            .in_period(selected_year, selected_month)
             .select_related("category")
         )
 
+    def get_filter_values(self):
+        """Return the submitted value of each filter, to key cached results."""
+        return [self.request.GET.get(name, "") for name in self.filterset.filters]
+
     def get_template_names(self):
+        if self.request.htmx and "cursor" in self.request.GET:
+            return ["tracker/partials/transaction_rows.html"]
         if self.request.htmx:
             return ["tracker/partials/transaction_container.html"]
         return self.template_name
 
     def get_context_data(self, **kwargs):
+        queryset = kwargs.get("object_list", self.object_list)
+        cursor = self.request.GET.get("cursor")
+        page = None
+
+        def compute_totals():
+            nonlocal page
+            if cursor:
+                return queryset.get_total_income_and_expense()
+            # one query for the first page and the totals of the whole list
+            page = paginate_transactions(queryset.with_totals(), None, self.page_size)
+            first = page.object_list[0] if page.object_list else None
+            return {
+                "total_income": first.total_income if first else 0,
+                "total_expense": first.total_expense if first else 0,
+            }
+
+        totals = None
+        # the rows of a next page are displayed without the totals
+        if not (self.request.htmx and cursor):
+            # totals of the filtered list, not only of the displayed page
+            totals = cached_statistics(
+                self.request.user.pk,
+                ("totals", *self.get_selected_period(), *self.get_filter_values()),
+                compute_totals,
+            )
+        if page is None:
+            try:
+                page = paginate_transactions(queryset, cursor, self.page_size)
+            except ValueError:
+                raise Http404("Invalid cursor.")
+
+        kwargs["object_list"] = page.object_list
         context = super().get_context_data(**kwargs)
-        totals = self.get_queryset().get_total_income_and_expense()
+        if page.has_next:
+            query = self.request.GET.copy()
+            query["cursor"] = page.next_cursor
+            context["next_page_url"] = f"{self.request.path}?{query.urlencode()}"
+        if totals is None:
+            return context
+
         total_incomes = totals["total_income"]
         total_expenses = totals["total_expense"]
         net_income = total_incomes - total_expenses
@@ -76,9 +212,8 @@ class TransactionCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView)
     template_name = "tracker/transaction_form.html"
 
     def form_valid(self, form):
-        transaction = form.save(commit=False)
-        transaction.user = self.request.user
-        transaction.save()
+        # saved once, by the parent
+        form.instance.user = self.request.user
         return super().form_valid(form)
 
     def get_context_data(self, **kwargs):
@@ -90,11 +225,12 @@ class TransactionCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView)
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs["user"] = self.request.user
+        kwargs["categories"] = CategoryRepository.for_request(self.request)
         return kwargs
 
 
 class TransactionUpdateView(
-    LoginRequiredMixin, UserPassesTestMixin, SuccessMessageMixin, UpdateView
+    LoginRequiredMixin, OwnerRequiredMixin, SuccessMessageMixin, UpdateView
 ):
     model = Transaction
     context_object_name = "transaction"
@@ -103,9 +239,6 @@ class TransactionUpdateView(
     success_message = "Transaction updated successfully."
     template_name = "tracker/transaction_form.html"
 
-    def get_queryset(self):
-        return super().get_queryset().select_related("user")
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         transaction = self.object
@@ -118,15 +251,12 @@ class TransactionUpdateView(
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs["user"] = self.request.user
+        kwargs["categories"] = CategoryRepository.for_request(self.request)
         return kwargs
 
-    def test_func(self):
-        obj = self.get_object()
-        return obj.user == self.request.user
-
 
 class TransactionDeleteView(
-    LoginRequiredMixin, UserPassesTestMixin, SuccessMessageMixin, DeleteView
+    LoginRequiredMixin, OwnerRequiredMixin, SuccessMessageMixin, DeleteView
 ):
     model = Transaction
     context_object_name = "transaction"
@@ -134,12 +264,10 @@ class TransactionDeleteView(
     success_message = "Transaction deleted successfully."
     template_name = "tracker/transaction_delete.html"
 
-    def test_func(self):
-        obj = self.get_object()
-        return obj.user == self.request.user
 
-
-class TransactionStatisticsView(LoginRequiredMixin, FilterView):
+class TransactionStatisticsView(
+    LoginRequiredMixin, ReplicaReadMixin, SelectedPeriodMixin, FilterView
+):
     """Display monthly transaction chart stats."""
 
     model = Transaction
@@ -148,14 +276,13 @@ class TransactionStatisticsView(LoginRequiredMixin, FilterView):
 
     def get_queryset(self):
         user = self.request.user
-        # Retrieve query parameters, default to current year and month
-        selected_year = self.request.GET.get("year", datetime.now().year)
-        selected_month = self.request.GET.get("month", datetime.now().month)
+        selected_year, selected_month = self.get_selected_period()
 
         return (
             super()
             .get_queryset()
-            .filter(user=user, date__year=selected_year, date__month=selected_month)
+            .filter(user=user)
+            .in_period(selected_year, selected_month)
             .select_related("category")
         )
 
@@ -166,88 +293,207 @@ class TransactionStatisticsView(LoginRequiredMixin, FilterView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        transactions = self.get_queryset()
-        income_categories, income_totals = get_transaction_chart_data(
-            transactions.filter(type="INC"),
-        )
-        expense_categories, expense_totals = get_transaction_chart_data(
-            transactions.filter(type="EXP"),
+        user = self.request.user
+        selected_year, selected_month = self.get_selected_period()
+        breakdown = cached_statistics(
+            user.pk,
+            ("category-breakdown", selected_year, selected_month),
+            lambda: self.get_category_breakdown(selected_year, selected_month),
         )
-        income_data = [
-            {"category": cat, "amount": amt}
-            for cat, amt in zip(income_categories, income_totals)
-        ]
-        expense_data = [
-            {"category": cat, "amount": amt}
-            for cat, amt in zip(expense_categories, expense_totals)
-        ]
-
-        context["income_categories"] = income_categories
-        context["income_totals"] = income_totals
-        context["expense_categories"] = expense_categories
-        context["expense_totals"] = expense_totals
-        context["income_data"] = income_data
-        context["expense_data"] = expense_data
+        context["income_data"] = breakdown["income"]
+        context["expense_data"] = breakdown["expense"]
+        context["chart_data"] = {
+            key: {
+                "labels": [row["category"] for row in rows],
+                "totals": [float(row["total"]) for row in rows],
+            }
+            for key, rows in breakdown.items()
+        }
         return context
 
+    def get_category_breakdown(self, year, month):
+        user = self.request.user
+        if analytics.is_enabled():
+            totals = analytics.get_columns(user.pk)
+        else:
+            totals = MonthlyCategoryTotal.objects.filter(user=user)
+        return totals.in_period(year, month).get_category_breakdown()
 
-class TransactionTotalStatisticsView(LoginRequiredMixin, FilterView):
+
+class TransactionTotalStatisticsView(
+    LoginRequiredMixin, ReplicaReadMixin, SelectedPeriodMixin, FilterView
+):
     """Display total yearly transaction chart stats."""
 
     filterset_class = TransactionTotalStasticsFilter
     template_name = "tracker/transaction_total_statistics.html"
+    period_has_month = False
 
     def get_queryset(self):
         user = self.request.user
-        # get query parameters, default to current year
-        year = self.request.GET.get("year", datetime.now().year)
-        return Transaction.objects.filter(user=user, date__year=year)
+        year, _ = self.get_selected_period()
+        return Transaction.objects.filter(user=user).in_period(year)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        queryset = self.get_queryset()
+        year, _ = self.get_selected_period()
+        statistics = cached_statistics(
+            self.request.user.pk,
+            ("total-statistics", year),
+            lambda: self.get_statistics(year),
+        )
+        context.update(statistics)
+        return context
 
-        total_yearly_balance = queryset.total_balance()
-        yearly_totals = queryset.get_total_income_and_expense()
+    def get_statistics(self, year):
+        user = self.request.user
+        if analytics.is_enabled():
+            columns = analytics.get_columns(user.pk)
+            totals = columns.in_period(year)
+            balances = columns.get_daily_balances
+        else:
+            totals = MonthlyCategoryTotal.objects.filter(user=user).in_period(year)
+            balances = partial(get_daily_balances, user.pk)
+
+        total_yearly_balance = totals.total_balance()
+        yearly_totals = totals.get_total_income_and_expense()
         total_yearly_incomes = yearly_totals["total_income"]
         total_yearly_expenses = yearly_totals["total_expense"]
-        monthly_totals = queryset.get_monthly_totals()
-        total_incomes_per_month = monthly_totals.values_list("total_income", flat=True)
-        total_expenses_per_month = monthly_totals.values_list(
-            "total_expense", flat=True
-        )
-
-        context["total_yearly_balance"] = total_yearly_balance
-        context["total_yearly_incomes"] = total_yearly_incomes
-        context["total_yearly_expenses"] = total_yearly_expenses
-        context["total_incomes_per_month"] = total_incomes_per_month
-        context["total_expenses_per_month"] = total_expenses_per_month
-        return context
+        # one entry per month of the year, months without transactions are zero
+        monthly_totals = {
+            row["month"].month: row for row in totals.get_monthly_totals()
+        }
+        total_incomes_per_month = [
+            monthly_totals[month]["total_income"] if month in monthly_totals else 0
+            for month in range(1, 13)
+        ]
+        total_expenses_per_month = [
+            monthly_totals[month]["total_expense"] if month in monthly_totals else 0
+            for month in range(1, 13)
+        ]
+        # up to today in the current year
+        start, end = get_year_range(year)
+        end = min(end, timezone.localdate() + timedelta(days=1))
+        daily_balances = balances(start, end)
+
+        return {
+            "total_yearly_balance": total_yearly_balance,
+            "total_yearly_incomes": total_yearly_incomes,
+            "total_yearly_expenses": total_yearly_expenses,
+            "total_incomes_per_month": total_incomes_per_month,
+            "total_expenses_per_month": total_expenses_per_month,
+            "daily_balances": daily_balances,
+        }
 
 
-class TransactionExportView(LoginRequiredMixin, View):
+class TransactionExportView(LoginRequiredMixin, ReplicaReadMixin, View):
     def get(self, request, *args, **kwargs):
         user = self.request.user
-        qs = Transaction.objects.filter(user=user).select_related("category")
+        # streamed after the view returns
+        qs = Transaction.objects.using(self.read_database).filter(user=user)
 
-        dataset = TransactionResource().export(qs)
         format = request.GET.get("format")
-        if format == "csv":
-            ds = dataset.csv
-        elif format == "json":
-            ds = dataset.json
+        if format in STREAMING_FORMATS:
+            # stream the rows instead of building the whole file in memory
+            stream, content_type = STREAMING_FORMATS[format]
+            archived = archived_transactions(user.pk, using=self.read_database)
+            response = StreamingHttpResponse(
+                stream(qs, archived), content_type=content_type
+            )
         elif format == "xlsx":
-            ds = dataset.xlsx
+            # built in the background, the user downloads it once it is ready
+            job = ExportJob.objects.create(user=user, format=format)
+            export_transactions_xlsx.delay(job.pk)
+            messages.info(
+                request, "Your export is being prepared, you will be notified."
+            )
+            return redirect("tracker:export_job_list")
+        else:
+            return HttpResponseBadRequest("Unsupported export format.")
 
         now = timezone.now()
         date = now.date()
-        response = HttpResponse(ds, content_type=f"{format}")
         response["Content-Disposition"] = (
             f'attachment; filename="Transaction-{str(date)}.{format}"'
         )
         return response
 
 
+class TransactionImportView(LoginRequiredMixin, FormView):
+    """Import transactions of the request user from a file."""
+
+    form_class = TransactionImportForm
+    template_name = "tracker/transaction_import.html"
+    # number of row errors displayed
+    max_errors = 100
+
+    def form_valid(self, form):
+        importer = TransactionImporter(self.request.user)
+        result = importer.import_file(
+            form.cleaned_data["file"], form.cleaned_data["format"]
+        )
+        logger.info(
+            f"Imported {result.created} of {result.rows} transactions "
+            f"for user {self.request.user} in {result.seconds:.2f}s"
+        )
+        if result.created:
+            messages.success(
+                self.request, f"{result.created} transactions imported successfully."
+            )
+        if result.errors:
+            messages.warning(
+                self.request, f"{len(result.errors)} rows could not be imported."
+            )
+        context = self.get_context_data(
+            form=form,
+            result=result,
+            errors=result.errors[: self.max_errors],
+        )
+        return self.render_to_response(context)
+
+
+class ExportJobListView(LoginRequiredMixin, ListView):
+    """List the background exports of the request user."""
+
+    model = ExportJob
+    context_object_name = "export_jobs"
+    paginate_by = 20
+    template_name = "tracker/export_job_list.html"
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+
+class ExportJobDownloadView(LoginRequiredMixin, View):
+    def get(self, request, pk, *args, **kwargs):
+        job = get_object_or_404(
+            ExportJob,
+            pk=pk,
+            user=request.user,
+            status=ExportJobStatusChoices.DONE,
+        )
+        return FileResponse(
+            job.file.open("rb"),
+            as_attachment=True,
+            filename=os.path.basename(job.file.name),
+        )
+
+
+class MetricsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Return the latency and SQL histograms of the views and Celery tasks, and
+    the notification connection gauges.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        # include the requests of this process not flushed yet
+        metrics.flush()
+        return JsonResponse({**metrics.collect(), "presence": presence_gauges()})
+
+
 class ManageView(LoginRequiredMixin, View):
     template_name = "tracker/manage.html"
 
@@ -287,9 +533,8 @@ class CategoryCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
     template_name = "tracker/category_form.html"
 
     def form_valid(self, form):
-        category = form.save(commit=False)
-        category.user = self.request.user
-        category.save()
+        # saved once, by the parent
+        form.instance.user = self.request.user
         return super().form_valid(form)
 
     def get_context_data(self, **kwargs):
@@ -301,11 +546,12 @@ class CategoryCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs["user"] = self.request.user
+        kwargs["categories"] = CategoryRepository.for_request(self.request)
         return kwargs
 
 
 class CategoryUpdateView(
-    LoginRequiredMixin, UserPassesTestMixin, SuccessMessageMixin, UpdateView
+    LoginRequiredMixin, OwnerRequiredMixin, SuccessMessageMixin, UpdateView
 ):
     model = Category
     context_object_name = "category"
@@ -324,15 +570,12 @@ class CategoryUpdateView(
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs["user"] = self.request.user
+        kwargs["categories"] = CategoryRepository.for_request(self.request)
         return kwargs
 
-    def test_func(self):
-        obj = self.get_object()
-        return obj.user == self.request.user
-
 
 class CategoryDeleteView(
-    LoginRequiredMixin, UserPassesTestMixin, SuccessMessageMixin, DeleteView
+    LoginRequiredMixin, OwnerRequiredMixin, SuccessMessageMixin, DeleteView
 ):
     model = Category
     context_object_name = "category"
@@ -340,16 +583,28 @@ class CategoryDeleteView(
     success_message = "Category deleted successfully."
     template_name = "tracker/category_delete.html"
 
-    def test_func(self):
-        obj = self.get_object()
-        return obj.user == self.request.user
-
 
+@login_required
+@require_GET
 def load_categories(request):
-    """Return list of categories of the user based on the transaction type."""
-    user = request.user
+    """
+    Return list of categories of the user based on the transaction type, or
+    the categories of both types by type with ``type=all``.
+
+    The response carries an ETag of the version of the user's categories, so
+    an unchanged list is answered with 304 Not Modified.
+    """
     transaction_type = request.GET.get("type")
-    categories = Category.objects.filter(user=user, type=transaction_type).values(
-        "id", "name"
-    )
-    return JsonResponse(list(categories), safe=False)
+    version = get_category_version(request.user.pk)
+    etag = quote_etag(f"categories-{version}-{transaction_type}")
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        categories = cached_categories(request.user.pk, version)
+        if transaction_type == "all":
+            response = JsonResponse(categories)
+        else:
+            response = JsonResponse(categories.get(transaction_type, []), safe=False)
+    response["ETag"] = etag
+    # revalidated on every use, the list changes whenever a category does
+    patch_cache_control(response, private=True, no_cache=True)
+    return response